@@ -0,0 +1,51 @@
+"""
+Measure append throughput: add_expense per row vs one add_expenses batch.
+
+Usage:
+    python benchmarks/bench_add_expenses.py [rows ...]
+"""
+import contextlib
+import io
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import iter_rows, write_ledger
+from expense import add_expense, add_expenses
+
+FIELDS = ["Date", "Expense Name", "Category", "Amount"]
+
+
+def make_rows(count, seed=7):
+    lines = itertools.chain.from_iterable(iter_rows(count, seed))
+    return [dict(zip(FIELDS, line.rstrip("\n").split(","))) for line in lines]
+
+
+def run(rows):
+    batch = make_rows(rows)
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        # Untimed warm-up: the first batch pays for importing pandas and the validator
+        warm_up = os.path.join(tmp, "warm-up.csv")
+        add_expenses(warm_up, make_rows(10))
+        add_expense(warm_up, "2024-01-01", "warm-up", "Food", "1.00")
+        results = {}
+        for label, func in [
+            ("add_expense loop", lambda path: [add_expense(path, r["Date"], r["Expense Name"], r["Category"], r["Amount"]) for r in batch]),
+            ("add_expenses", lambda path: add_expenses(path, batch)),
+            ("add_expenses+fsync", lambda path: add_expenses(path, batch, fsync=True)),
+        ]:
+            path = os.path.join(tmp, f"{len(results)}.csv")
+            write_ledger(path, 0)
+            started = time.perf_counter()
+            func(path)
+            results[label] = rows / (time.perf_counter() - started)
+    print(f"{rows:>10} rows: " + "   ".join(f"{label} {rate:12,.0f} rows/s" for label, rate in results.items()))
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]:
+        run(rows)
@@ -0,0 +1,48 @@
+"""
+Compare cold parses against ledger cache hits (in-process and on disk).
+
+Usage:
+    python benchmarks/bench_cache.py [rows ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from expense_table import ExpenseTable
+from ledger_cache import LedgerCache
+
+FILES = 4
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [write_ledger(os.path.join(tmp, f"ledger{index}.csv"), rows // FILES, seed=index)
+                 for index in range(FILES)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, parse = timed(lambda: [ExpenseTable.from_csv(path) for path in paths])
+
+            cache = LedgerCache(disk_dir=os.path.join(tmp, "cache"))
+            _, first = timed(cache.tables, paths)
+            _, memory_hit = timed(cache.tables, paths)
+            cache.clear()
+            _, disk_hit = timed(cache.tables, paths)
+
+    print(f"{rows:>10} rows in {FILES} files: parse {parse * 1000:8.1f} ms   first load {first * 1000:8.1f} ms"
+          f"   disk hit {disk_hit * 1000:7.1f} ms   memory hit {memory_hit * 1e6:6.1f} us")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        run(rows)
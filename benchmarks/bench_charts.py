@@ -0,0 +1,71 @@
+"""
+Compare a clear-and-redraw chart refresh with ExpenseCharts' in-place update.
+
+Renders off-screen with the Agg backend; each step adds one expense to the totals.
+
+Usage:
+    python benchmarks/bench_charts.py [steps]
+"""
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import CATEGORY_PROFILES
+from chart_engine import ExpenseCharts
+
+CATEGORIES = list(CATEGORY_PROFILES)
+MONTHS = [f"2024-{month:02d}" for month in range(1, 13)]
+
+
+def redraw(ax_pie, ax_bar, fig_pie, fig_bar, categories, months):
+    ax_pie.clear()
+    ax_bar.clear()
+    ax_pie.pie([cents / 100 for cents in categories.values()], labels=list(categories), autopct='%1.1f%%', startangle=140)
+    ax_bar.bar(list(months), [cents / 100 for cents in months.values()])
+    fig_pie.canvas.draw()
+    fig_bar.canvas.draw()
+
+
+def run(steps):
+    categories = {category: 10_000 for category in CATEGORIES}
+    months = {month: 5_000 for month in MONTHS}
+
+    fig_pie, ax_pie = plt.subplots(figsize=(6, 5))
+    fig_bar, ax_bar = plt.subplots(figsize=(6, 5))
+    started = time.perf_counter()
+    for step in range(steps):
+        categories[CATEGORIES[step % len(CATEGORIES)]] += 1_000
+        months[MONTHS[step % len(MONTHS)]] += 1_000
+        redraw(ax_pie, ax_bar, fig_pie, fig_bar, categories, months)
+    redraw_ms = (time.perf_counter() - started) / steps * 1000
+
+    class Canvas:
+        def __init__(self, figure):
+            self.figure = figure
+
+        def draw_idle(self):
+            # Agg has no event loop; render synchronously so the cost is measured
+            self.figure.canvas.draw()
+
+    fig_pie, ax_pie = plt.subplots(figsize=(6, 5))
+    fig_bar, ax_bar = plt.subplots(figsize=(6, 5))
+    charts = ExpenseCharts(ax_pie, ax_bar, Canvas(fig_pie), Canvas(fig_bar), lambda ms, func: func(), max_fps=1_000_000)
+    charts.update(categories, months)
+    started = time.perf_counter()
+    for step in range(steps):
+        categories[CATEGORIES[step % len(CATEGORIES)]] += 1_000
+        months[MONTHS[step % len(MONTHS)]] += 1_000
+        charts.update(dict(categories), dict(months))
+    engine_ms = (time.perf_counter() - started) / steps * 1000
+
+    print(f"clear-and-redraw {redraw_ms:7.2f} ms/update   in-place {engine_ms:7.2f} ms/update")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
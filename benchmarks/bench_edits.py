@@ -0,0 +1,56 @@
+"""
+Compare editing one row by rewriting the CSV with pandas against a journal entry.
+
+Usage:
+    python benchmarks/bench_edits.py [rows ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from expense_table import IncrementalExpenseLoader
+from journal import EditJournal
+from rollup import ExpenseRollup
+
+EDITS = 20
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "expense.csv")
+        write_ledger(file_path, rows)
+
+        started = time.perf_counter()
+        for edit in range(EDITS):
+            df = pd.read_csv(file_path, dtype=str)
+            df.loc[edit, "Amount"] = "1.00"
+            df.to_csv(file_path, index=False)
+        rewrite = (time.perf_counter() - started) / EDITS
+
+        ExpenseRollup.load(file_path)
+        loader = IncrementalExpenseLoader(file_path)
+        table = loader.refresh()
+        journal = EditJournal(file_path)
+        started = time.perf_counter()
+        for edit in range(EDITS):
+            old = table[table.find(edit)]
+            journal.amend(edit, old, {**old, "Amount": "2.00"}, table.base)
+            table = loader.refresh()
+        journaled = (time.perf_counter() - started) / EDITS
+
+        started = time.perf_counter()
+        journal.compact()
+        compact = time.perf_counter() - started
+    print(f"{rows:>10} rows: rewrite {rewrite * 1000:9.2f} ms/edit   journal+refresh {journaled * 1000:7.2f} ms/edit"
+          f"   compact {compact * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]:
+        run(rows)
@@ -0,0 +1,39 @@
+"""
+Compare the in-memory exporter with the write-only streaming exporter.
+
+Usage:
+    python benchmarks/bench_excel_export.py [rows ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure
+from benchmarks.generator import write_ledger
+from excel_exporter import export_expenses_streaming, export_expenses_to_excel
+from expense import load_expenses
+from expense_table import iter_expense_chunks
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "expense.csv")
+        write_ledger(csv_path, rows)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, classic_seconds, classic_peak = measure(
+                lambda: export_expenses_to_excel(load_expenses(csv_path), os.path.join(tmp, "classic.xlsx")))
+            _, stream_seconds, stream_peak = measure(
+                export_expenses_streaming, iter_expense_chunks(csv_path), os.path.join(tmp, "stream.xlsx"))
+
+        print(f"{rows:>10} rows: in-memory {classic_seconds:7.2f}s {classic_peak / 2**20:8.1f} MiB peak"
+              f"   streaming {stream_seconds:7.2f}s {stream_peak / 2**20:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]:
+        run(rows)
@@ -0,0 +1,43 @@
+"""
+Compare ExpenseTable.from_csv against the list-of-dict expense.load_expenses.
+
+Usage:
+    python benchmarks/bench_expense_table.py [rows ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure
+from benchmarks.generator import write_ledger
+from expense import load_expenses
+from expense_table import ExpenseTable
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "expense.csv")
+        write_ledger(file_path, rows)
+
+        dicts, dict_seconds, dict_peak = measure(load_expenses, file_path)
+        table, table_seconds, table_peak = measure(ExpenseTable.from_csv, file_path)
+
+        started = time.perf_counter()
+        float_total = sum(float(exp["Amount"]) for exp in dicts)
+        dict_sum_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        cents_total = table.total_cents()
+        table_sum_seconds = time.perf_counter() - started
+
+        print(f"{rows:>10} rows")
+        print(f"  list of dict: load {dict_seconds:8.3f}s  peak {dict_peak / rows:7.1f} B/row  sum {dict_sum_seconds:.4f}s")
+        print(f"  ExpenseTable: load {table_seconds:8.3f}s  peak {table_peak / rows:7.1f} B/row  sum {table_sum_seconds:.4f}s")
+        print(f"  totals: {float_total:.2f} vs {cents_total / 100:.2f}")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]:
+        run(rows)
@@ -0,0 +1,65 @@
+"""
+Measure per-add refresh latency: full load_expenses re-read vs IncrementalExpenseLoader.
+
+The GUI hands its worker's result to the Tk thread as a snapshot, so the cost
+of taking one after each append is shown too, next to copying the whole table.
+
+Usage:
+    python benchmarks/bench_incremental_loader.py [rows ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from expense import add_expense, load_expenses
+from expense_table import IncrementalExpenseLoader
+
+ADDS = 20
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "expense.csv")
+        write_ledger(file_path, rows)
+        loader = IncrementalExpenseLoader(file_path)
+        loader.refresh()
+
+        full_seconds = 0.0
+        tail_seconds = 0.0
+        snapshot_seconds = 0.0
+        copy_seconds = 0.0
+        loader.snapshot()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(ADDS):
+                add_expense(file_path, "2024-08-20", "coffee", "Food", 3.5)
+
+                started = time.perf_counter()
+                load_expenses(file_path)
+                full_seconds += time.perf_counter() - started
+
+                started = time.perf_counter()
+                loader.refresh()
+                tail_seconds += time.perf_counter() - started
+
+                started = time.perf_counter()
+                loader.snapshot()
+                snapshot_seconds += time.perf_counter() - started
+
+                started = time.perf_counter()
+                loader.table.copy()
+                copy_seconds += time.perf_counter() - started
+
+        print(f"{rows:>10} rows: full re-read {full_seconds / ADDS * 1000:9.2f} ms/add"
+              f"   incremental {tail_seconds / ADDS * 1000:7.3f} ms/add"
+              f"   snapshot {snapshot_seconds / ADDS * 1000:7.3f} ms (full copy {copy_seconds / ADDS * 1000:7.3f} ms)")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]:
+        run(rows)
@@ -0,0 +1,52 @@
+"""
+Measure multi-file ingestion throughput as the worker count grows.
+
+Writes a directory of synthetic monthly CSVs, then times ingest.summarize_files,
+ingest.validate_files and ingest.load_files for each worker count. Scaling is
+bounded by the number of CPU cores available.
+
+Usage:
+    python benchmarks/bench_ingest.py [files] [rows_per_file] [max_workers]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from ingest import load_files, summarize_files, validate_files
+
+
+def run(files, rows_per_file, max_workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        for index in range(files):
+            month = date(2024, index % 12 + 1, 1)
+            write_ledger(os.path.join(tmp, f"expenses_{index:03d}.csv"), rows_per_file,
+                         seed=index, start=month, days=28)
+        rows = files * rows_per_file
+        size_mb = sum(entry.stat().st_size for entry in os.scandir(tmp)) / 2**20
+        print(f"{files} files, {rows:,} rows, {size_mb:.1f} MiB, {os.cpu_count()} CPU(s)")
+
+        # Warm up so imports are not counted against the single-worker run
+        validate_files([tmp], workers=1)
+
+        baseline = {}
+        workers = 1
+        while workers <= max_workers:
+            line = f"  workers {workers:>2}:"
+            for label, func in [("summarize", summarize_files), ("validate", validate_files), ("load", load_files)]:
+                started = time.perf_counter()
+                func([tmp], workers=workers, chunk_bytes=4 * 2**20)
+                elapsed = time.perf_counter() - started
+                baseline.setdefault(label, elapsed)
+                line += f"   {label} {rows / elapsed:11,.0f} rows/s (x{baseline[label] / elapsed:4.2f})"
+            print(line)
+            workers *= 2
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(*(args + [16, 50_000, os.cpu_count() or 1][len(args):]))
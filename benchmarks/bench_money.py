@@ -0,0 +1,77 @@
+"""
+Compare float amount arithmetic with the integer-cents money core.
+
+For each ledger size, two phases are timed. Parsing (done once at load) runs
+``float()``, per-row ``parse_cents`` and ``money.parse_cents_array`` over the
+Amount column. Totals (redone on every refresh) compare summing floats per
+category in Python with the vectorized int64 ``sum_cents``/``group_totals``.
+The integer results are asserted equal to an exact per-row reference and the
+largest float drift from it is reported.
+
+Usage:
+    python benchmarks/bench_money.py [rows ...]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks.generator import write_ledger
+from money import group_totals, parse_cents, parse_cents_array, sum_cents
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = write_ledger(os.path.join(tmp, "expense.csv"), rows)
+        with open(file_path, mode='r', newline='') as file:
+            records = list(csv.DictReader(file))
+    amounts = [record["Amount"] for record in records]
+    categories, codes = np.unique([record["Category"] for record in records], return_inverse=True)
+    groups = len(categories)
+
+    # Load time: each amount is parsed once
+    floats, float_parse = timed(lambda: [float(amount) for amount in amounts])
+    exact, scalar_parse = timed(lambda: [parse_cents(amount) for amount in amounts])
+    (cents, _), array_parse = timed(lambda: parse_cents_array(amounts))
+    assert cents.tolist() == exact
+
+    exact_total = sum(exact)
+    exact_groups = [0] * groups
+    for code, value in zip(codes.tolist(), exact):
+        exact_groups[code] += value
+
+    # Every refresh: grand total plus per-category totals
+    def float_totals():
+        totals = [0.0] * groups
+        for code, value in zip(codes.tolist(), floats):
+            totals[code] += value
+        return sum(floats), totals
+    (float_total, float_groups), float_aggregate = timed(float_totals)
+    (money_total, money_groups), money_aggregate = timed(
+        lambda: (sum_cents(cents), group_totals(codes, cents, groups)))
+    assert money_total == exact_total and money_groups.tolist() == exact_groups
+
+    # Drift of the float results from the exact cents, before any display rounding
+    drift = max(abs(total * 100 - exact) for total, exact in
+                zip([float_total] + float_groups, [exact_total] + exact_groups))
+
+    print(f"{rows:>10} rows  parse: float {float_parse * 1000:7.1f} ms   per-row cents {scalar_parse * 1000:7.1f} ms"
+          f"   array cents {array_parse * 1000:7.1f} ms")
+    print(f"{'':>16}totals: float {float_aggregate * 1000:7.1f} ms (drift {drift:.2e} cents)"
+          f"   int64 cents {money_aggregate * 1000:7.1f} ms (exact)")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        run(rows)
@@ -0,0 +1,63 @@
+"""
+Compare indexed expense.query against a linear scan for date-range/category filters.
+
+Usage:
+    python benchmarks/bench_query.py [rows ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from expense import query
+from expense_index import ExpenseIndex
+from expense_table import ExpenseTable, parse_cents
+
+QUERIES = 200
+
+
+def scan(table, start, end, category):
+    total = 0
+    for expense in table:
+        if start <= expense["Date"] <= end and expense["Category"] == category:
+            total += parse_cents(expense["Amount"])
+    return total
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "expense.csv")
+        # The queries below cover 2023-2025
+        write_ledger(file_path, rows, start=date(2023, 1, 1), days=3 * 365)
+        with contextlib.redirect_stdout(io.StringIO()):
+            table = ExpenseTable.from_csv(file_path)
+
+    started = time.perf_counter()
+    ExpenseIndex.for_table(table)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for month in range(QUERIES):
+        start = f"{2023 + month % 3}-{month % 12 + 1:02d}-01"
+        result = query(table, start, start[:8] + "28", ["Food"])
+        len(result), result.total_cents(), result.monthly_totals()
+    indexed = (time.perf_counter() - started) / QUERIES
+
+    started = time.perf_counter()
+    expected = scan(table, "2023-03-01", "2023-03-28", "Food")
+    linear = time.perf_counter() - started
+    assert expected == query(table, "2023-03-01", "2023-03-28", ["Food"]).total_cents()
+
+    print(f"{rows:>10} rows: index build {build * 1000:8.1f} ms   query+aggregates {indexed * 1e6:8.1f} us"
+          f"   linear scan {linear * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        run(rows)
@@ -0,0 +1,55 @@
+"""
+Show how build_report and export_monthly_workbooks scale with worker count.
+
+Both parse the ledger once in the parent: the report sends each sheet's
+columns to a worker, the monthly export sends each month's rows. Every timed
+call starts with a cold ledger cache. The in-process cache is
+cleared first, since forked workers would inherit a parse done by an earlier
+configuration, and the disk cache is disabled.
+
+Usage:
+    python benchmarks/bench_report_builder.py [rows] [workers ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from ledger_cache import cache
+from report_builder import build_report, export_monthly_workbooks
+
+
+def cold(func):
+    cache.clear()
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def run(rows, worker_counts):
+    # Spawned workers read the disk cache setting from the environment
+    os.environ.pop("EXPENSE_CACHE_DIR", None)
+    cache.disk_dir = None
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "expense.csv")
+        write_ledger(csv_path, rows)
+        baseline = None
+        for workers in worker_counts:
+            with contextlib.redirect_stdout(io.StringIO()):
+                report = cold(lambda: build_report(
+                    csv_path, os.path.join(tmp, f"report_{workers}.xlsx"), workers=workers, include_rows=False))
+                monthly = cold(lambda: export_monthly_workbooks(
+                    csv_path, os.path.join(tmp, f"monthly_{workers}"), workers=workers))
+            baseline = baseline or (report, monthly)
+            print(f"{rows:>10} rows, {workers:>2} worker(s): report {report:6.2f}s ({baseline[0] / report:4.1f}x), "
+                  f"monthly {monthly:6.2f}s ({baseline[1] / monthly:4.1f}x)")
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or [1, 2, 4, os.cpu_count() or 1]
+    run(rows, worker_counts)
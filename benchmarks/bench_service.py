@@ -0,0 +1,200 @@
+"""
+Load-test the HTTP/JSON ledger service and report requests/sec and latency.
+
+Starts ``expense_service.py`` on seeded ledgers in a temporary directory (or
+targets a running service with ``--url``), then keeps ``--clients``
+keep-alive connections busy for ``--duration`` seconds with a mix of single
+expense appends, summaries and expense pages spread over ``--ledgers``
+ledgers. A ``--backdated-ratio`` share of the appends is dated anywhere in
+the seeded ledgers' range instead of today; those merge into the middle of
+the ledger index and are reported as the separate ``append_backdated``
+operation. Prints throughput, p50/p99/max latency per operation as JSON,
+and exits with status 1 if any request failed.
+
+Usage:
+    python benchmarks/bench_service.py [--ledgers 8] [--rows 100000] [--clients 64]
+        [--duration 10] [--write-ratio 0.3] [--backdated-ratio 0.2]
+        [--url http://127.0.0.1:8080] [--metrics FILE]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import CATEGORY_PROFILES, write_ledger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Date range of the seeded ledgers (write_ledger's defaults)
+SEED_START, SEED_DAYS = date(2020, 1, 1), 5 * 365
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            key, _, value = line.decode("latin-1").partition(":")
+            if key.strip().lower() == "content-length":
+                length = int(value)
+        await self.reader.readexactly(length)
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def client(host, port, ledgers, deadline, write_ratio, backdated_ratio, seed, latencies, failures):
+    rng = random.Random(seed)
+    # Today-dated rows extend the ledger index at its end; back-dated ones are merged into the middle
+    today = date.today().isoformat()
+    categories = list(CATEGORY_PROFILES)
+    connection = Connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            ledger = rng.choice(ledgers)
+            roll = rng.random()
+            if roll < write_ratio:
+                method, path = "POST", f"/ledgers/{ledger}/expenses"
+                if rng.random() < backdated_ratio:
+                    operation = "append_backdated"
+                    day = (SEED_START + timedelta(days=rng.randrange(SEED_DAYS))).isoformat()
+                else:
+                    operation, day = "append", today
+                payload = {"Date": day,
+                           "Expense Name": "load test", "Category": rng.choice(categories),
+                           "Amount": f"{rng.randint(1, 50000) / 100:.2f}"}
+            elif roll < write_ratio + (1 - write_ratio) / 2:
+                operation, method, path, payload = "summary", "GET", f"/ledgers/{ledger}/summary", None
+            else:
+                operation, method, payload = "expenses", "GET", None
+                path = f"/ledgers/{ledger}/expenses?start=2024-{rng.randint(1, 12):02d}-01&limit=50"
+            started = time.perf_counter()
+            try:
+                status = await connection.request(method, path, payload)
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                status = None
+                connection.close()
+                connection = Connection(host, port)
+            latencies.setdefault(operation, []).append(time.perf_counter() - started)
+            if status not in (200, 201):
+                failures[operation] = failures.get(operation, 0) + 1
+    finally:
+        connection.close()
+
+
+async def load(host, port, ledgers, clients, duration, write_ratio, backdated_ratio=0.0):
+    latencies, failures = {}, {}
+    started = time.perf_counter()
+    await asyncio.gather(*[client(host, port, ledgers, started + duration, write_ratio, backdated_ratio, seed,
+                                  latencies, failures)
+                           for seed in range(clients)])
+    elapsed = time.perf_counter() - started
+    everything = [sample for samples in latencies.values() for sample in samples]
+
+    def stats(samples):
+        return {"requests": len(samples), "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+                "max_ms": round(max(samples, default=0.0) * 1000, 2)}
+
+    return {"clients": clients, "seconds": round(elapsed, 2), **stats(everything),
+            "failed": sum(failures.values()),
+            "operations": {operation: {**stats(samples), "failed": failures.get(operation, 0)}
+                           for operation, samples in sorted(latencies.items())}}
+
+
+async def wait_until_up(host, port, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while True:
+        connection = Connection(host, port)
+        try:
+            if await connection.request("GET", "/health") == 200:
+                return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+        finally:
+            connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ledgers", type=int, default=8, help="ledgers to spread the load over")
+    parser.add_argument("--rows", type=int, default=100_000, help="seed rows per ledger")
+    parser.add_argument("--clients", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="fraction of requests that append")
+    parser.add_argument("--backdated-ratio", type=float, default=0.2,
+                        help="fraction of appends dated within the seeded range instead of today")
+    parser.add_argument("--url", help="load an already running service instead of starting one")
+    parser.add_argument("--metrics", metavar="FILE", help="have the started service write its timers and counters to FILE")
+    args = parser.parse_args()
+
+    ledgers = [f"ledger{index}" for index in range(args.ledgers)]
+    if args.url:
+        url = urlsplit(args.url)
+        result = asyncio.run(load(url.hostname, url.port, ledgers, args.clients, args.duration, args.write_ratio,
+                                  args.backdated_ratio))
+        print(json.dumps(result, indent=2))
+        return 1 if result["failed"] else 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, ledger in enumerate(ledgers):
+            write_ledger(os.path.join(tmp, f"{ledger}.csv"), args.rows, seed=index)
+        port = free_port()
+        service = subprocess.Popen([sys.executable, os.path.join(ROOT, "expense_service.py"),
+                                    "--root", tmp, "--port", str(port)],
+                                   cwd=tmp, stdout=subprocess.DEVNULL,
+                                   env={**os.environ, "EXPENSE_METRICS_FILE": args.metrics or ""})
+        try:
+            asyncio.run(wait_until_up("127.0.0.1", port))
+            # Untimed warm-up: the first read of each ledger parses the whole file
+            asyncio.run(load("127.0.0.1", port, ledgers, args.ledgers, 0.5, 0.0))
+            result = asyncio.run(load("127.0.0.1", port, ledgers, args.clients, args.duration, args.write_ratio,
+                                      args.backdated_ratio))
+        finally:
+            service.terminate()
+            service.wait()
+    result = {"ledgers": args.ledgers, "rows_per_ledger": args.rows, "write_ratio": args.write_ratio,
+              "backdated_ratio": args.backdated_ratio, **result}
+    print(json.dumps(result, indent=2))
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
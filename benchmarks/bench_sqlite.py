@@ -0,0 +1,57 @@
+"""
+Compare the SQLite backend with the CSV path for inserts, filtered queries and aggregates.
+
+Usage:
+    python benchmarks/bench_sqlite.py [rows ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from expense_table import ExpenseTable
+from storage import SqliteBackend, import_csv
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def csv_food_in_march(csv_path):
+    table = ExpenseTable.from_csv(csv_path)
+    return sum(row["Category"] == "Food" and row["Date"].startswith("2023-03") for row in table)
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "expense.csv")
+        db_path = os.path.join(tmp, "expense.db")
+        write_ledger(csv_path, rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, insert_seconds = timed(import_csv, csv_path, db_path)
+        store = SqliteBackend(db_path)
+
+        csv_count, csv_query_seconds = timed(csv_food_in_march, csv_path)
+        sql_rows, sql_query_seconds = timed(store.query, "2023-03-01", "2023-03-31", ["Food"])
+        assert csv_count == len(sql_rows)
+        _, csv_agg_seconds = timed(lambda: ExpenseTable.from_csv(csv_path).category_totals())
+        _, sql_agg_seconds = timed(store.category_totals)
+        _, update_seconds = timed(store.update, 1, "edited", "Food", "1.23")
+        store.close()
+
+        print(f"{rows:>10} rows: batch insert {rows / insert_seconds:10,.0f} rows/s")
+        print(f"  Food in March:  csv {csv_query_seconds:7.3f}s   sqlite {sql_query_seconds:7.4f}s")
+        print(f"  category totals: csv {csv_agg_seconds:7.3f}s   sqlite {sql_agg_seconds:7.4f}s")
+        print(f"  single-row update: {update_seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [1_000_000]:
+        run(rows)
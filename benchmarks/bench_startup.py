@@ -0,0 +1,89 @@
+"""
+Measure cold-start time of the CLI and GUI modules and guard their import graphs.
+
+Each measurement is a fresh interpreter. With ``--check`` the script also runs
+``python -X importtime`` on the lightweight entry points and exits non-zero if
+a heavy dependency is imported at load time or the median one-shot start
+exceeds the budget.
+
+Usage:
+    python benchmarks/bench_startup.py [--check] [--runs N] [--budget-ms MS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "matplotlib"]
+
+# Modules that must start without any of HEAVY_MODULES
+LIGHT_ENTRY_POINTS = ["expense", "expenseTracker", "expense_table", "rollup", "storage", "expense_tracker_gui"]
+
+ONE_SHOT = ("import sys, expense; "
+            "expense.add_expense(sys.argv[1], '2024-01-01', 'coffee', 'Food', '3.50')")
+
+
+def run_python(args):
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip())
+    return elapsed, completed
+
+
+def median_ms(args, runs):
+    return statistics.median(run_python(args)[0] for _ in range(runs)) * 1000
+
+
+def imported_heavy_modules(module):
+    """
+    Return the heavy top-level packages imported by ``import module``.
+
+    Args:
+        module (str): Module to import in a fresh interpreter.
+
+    Returns:
+        list: Names from HEAVY_MODULES that showed up in ``-X importtime``.
+    """
+    _, completed = run_python(["-X", "importtime", "-c", f"import {module}"])
+    imported = {line.split("|")[-1].strip().split(".")[0] for line in completed.stderr.splitlines() if "|" in line}
+    return [name for name in HEAVY_MODULES if name in imported]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="fail on heavy imports or a blown budget")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    baseline = median_ms(["-c", "pass"], args.runs)
+    print(f"{'python -c pass':<32} {baseline:7.1f} ms")
+    for module in LIGHT_ENTRY_POINTS:
+        print(f"{'import ' + module:<32} {median_ms(['-c', f'import {module}'], args.runs):7.1f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        one_shot = median_ms(["-c", ONE_SHOT, os.path.join(tmp, "expense.csv")], args.runs)
+    print(f"{'one-shot add_expense':<32} {one_shot:7.1f} ms")
+
+    if not args.check:
+        return 0
+    failures = []
+    for module in LIGHT_ENTRY_POINTS:
+        heavy = imported_heavy_modules(module)
+        if heavy:
+            failures.append(f"import {module} pulls in {', '.join(heavy)}")
+    if one_shot > args.budget_ms:
+        failures.append(f"one-shot add_expense took {one_shot:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Compare loading a ledger from CSV with loading it from the binary ledger backend.
+
+Usage:
+    python benchmarks/bench_storage.py [rows ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from expense_table import ExpenseTable
+from storage import BinaryLedgerBackend, import_csv
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "expense.csv")
+        ledger_path = os.path.join(tmp, "expense.ledger")
+        write_ledger(csv_path, rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, import_seconds = timed(import_csv, csv_path, ledger_path)
+
+        _, csv_seconds = timed(ExpenseTable.from_csv, csv_path)
+        view, view_seconds = timed(BinaryLedgerBackend(ledger_path).view)
+        table, load_seconds = timed(BinaryLedgerBackend(ledger_path).load)
+        assert len(view) == len(table) == rows
+
+        print(f"{rows:>10} rows: csv parse {csv_seconds:7.3f}s   ledger mmap view {view_seconds * 1000:7.3f} ms"
+              f"   ledger load {load_seconds:7.3f}s   (import {import_seconds:.2f}s,"
+              f" {os.path.getsize(ledger_path) / os.path.getsize(csv_path):.0%} of csv size)")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        run(rows)
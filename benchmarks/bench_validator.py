@@ -0,0 +1,54 @@
+"""
+Compare the per-row validation path with the vectorized expense_validator.
+
+The per-row path is what load_expenses and checkCSVFile did row by row:
+csv.DictReader + validate_expense (strptime, float) per row.
+
+Usage:
+    python benchmarks/bench_validator.py [rows ...]
+"""
+import contextlib
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import write_ledger
+from expense import validate_expense
+from expense_validator import validate_file
+
+
+def validate_per_row(file_path):
+    invalid = 0
+    with open(file_path, mode='r') as file, contextlib.redirect_stdout(io.StringIO()):
+        for row in csv.DictReader(file):
+            if not validate_expense(row):
+                invalid += 1
+    return invalid
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "expense.csv")
+        write_ledger(file_path, rows)
+
+        started = time.perf_counter()
+        validate_per_row(file_path)
+        per_row_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        validate_file(file_path)
+        bulk_seconds = time.perf_counter() - started
+
+        print(f"{rows:>10} rows: per-row {rows / per_row_seconds:12,.0f} rows/s"
+              f"   vectorized {rows / bulk_seconds:12,.0f} rows/s"
+              f"   speedup {per_row_seconds / bulk_seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    for rows in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        run(rows)
@@ -0,0 +1,18 @@
+import time
+import tracemalloc
+
+
+def measure(func, *args, **kwargs):
+    """
+    Run ``func`` once and measure wall time and peak traced memory.
+
+    Returns:
+        tuple: (result, seconds, peak_bytes)
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
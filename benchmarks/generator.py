@@ -0,0 +1,114 @@
+"""
+Seeded synthetic expense ledgers with realistic shape.
+
+Rows are written in roughly chronological order, as a ledger grows. Categories
+follow fixed weights. Rent lands on the 1st and utilities mid-month, while
+entertainment and food lean towards weekends. Amounts are log-normal around
+a per-category median. The same seed always produces the same file, so
+benchmark inputs are reproducible from 1K to 10M rows.
+
+Usage:
+    python benchmarks/generator.py expense.csv --rows 1000000 [--seed 42]
+"""
+import argparse
+from datetime import date
+
+import numpy as np
+
+BLOCK_ROWS = 500_000
+
+# name: (weight, median amount, log-normal sigma, typical names)
+CATEGORY_PROFILES = {
+    "Food": (0.35, 14.0, 0.6, ["groceries", "coffee", "lunch", "sushi", "bakery", "takeaway", "donut"]),
+    "Transportation": (0.25, 6.5, 0.7, ["bus", "train", "taxi", "fuel", "parking", "bike share"]),
+    "Entertainment": (0.15, 28.0, 0.8, ["cinema", "concert", "streaming", "shows", "games", "museum"]),
+    "Other": (0.12, 22.0, 1.0, ["pharmacy", "gift", "clothes", "haircut", "hardware", "books"]),
+    "Utilities": (0.08, 95.0, 0.4, ["power bill", "water bill", "internet", "phone", "gas bill"]),
+    "Rent": (0.05, 1450.0, 0.05, ["rent"]),
+}
+
+
+def iter_rows(rows, seed=42, start=date(2020, 1, 1), days=5 * 365, block_rows=BLOCK_ROWS):
+    """
+    Generate expense rows block by block.
+
+    Args:
+        rows (int): Number of rows to generate.
+        seed (int): Random seed.
+        start (date): First date of the ledger.
+        days (int): Number of days the ledger spans.
+        block_rows (int): Rows generated per vectorized block.
+
+    Yields:
+        list: Lines of CSV text (without the header) for the next block.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(CATEGORY_PROFILES)
+    weights = np.array([profile[0] for profile in CATEGORY_PROFILES.values()])
+    medians = np.log([profile[1] for profile in CATEGORY_PROFILES.values()])
+    sigmas = np.array([profile[2] for profile in CATEGORY_PROFILES.values()])
+    name_lists = [profile[3] for profile in CATEGORY_PROFILES.values()]
+    rent, utilities = names.index("Rent"), names.index("Utilities")
+    weekend_heavy = np.isin(np.arange(len(names)), [names.index("Entertainment"), names.index("Food")])
+
+    first = start.toordinal()
+    date_text = [date.fromordinal(first + offset).isoformat() for offset in range(days + 7)]
+    day_of_month = np.array([date.fromordinal(first + offset).day for offset in range(days + 7)])
+
+    for block_start in range(0, rows, block_rows):
+        size = min(block_rows, rows - block_start)
+        # Each block covers its share of the date span, so the file is chronological
+        low = block_start * days // rows
+        high = max(low + 1, (block_start + size) * days // rows)
+        offsets = np.sort(rng.integers(low, high, size))
+        categories = rng.choice(len(names), size=size, p=weights)
+
+        weekday = (first + offsets) % 7  # 0 = Sunday for proleptic ordinals
+        month_start = offsets - (day_of_month[offsets] - 1)
+        offsets = np.where(categories == rent, month_start, offsets)
+        offsets = np.where(categories == utilities, month_start + 14, offsets)
+        # Push half of the weekday food/entertainment spending to the next Saturday
+        to_weekend = weekend_heavy[categories] & (weekday != 0) & (weekday != 6) & (rng.random(size) < 0.5)
+        offsets = np.where(to_weekend, offsets + (6 - weekday), offsets)
+        offsets = np.clip(offsets, 0, days - 1)
+
+        cents = np.maximum(1, np.rint(np.exp(rng.normal(medians[categories], sigmas[categories])) * 100)).astype(np.int64)
+        picks = rng.random(size)
+        yield [f"{date_text[offset]},{name_lists[category][int(pick * len(name_lists[category]))]},"
+               f"{names[category]},{amount // 100}.{amount % 100:02d}\n"
+               for offset, category, pick, amount in zip(offsets.tolist(), categories.tolist(), picks.tolist(), cents.tolist())]
+
+
+def write_ledger(file_path, rows, seed=42, start=date(2020, 1, 1), days=5 * 365):
+    """
+    Write a synthetic expense CSV with the same layout as expense.csv.
+
+    Args:
+        file_path (str): Destination path.
+        rows (int): Number of expense rows.
+        seed (int): Random seed, so runs are reproducible.
+        start (date): First date in the ledger.
+        days (int): Number of days the dates are spread over.
+
+    Returns:
+        str: ``file_path``.
+    """
+    with open(file_path, mode='w', newline='') as file:
+        file.write("Date,Expense Name,Category,Amount\n")
+        for lines in iter_rows(rows, seed, start, days):
+            file.writelines(lines)
+    return file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic expense CSV.")
+    parser.add_argument("file_path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=5 * 365)
+    args = parser.parse_args()
+    write_ledger(args.file_path, args.rows, args.seed, days=args.days)
+
+
+if __name__ == "__main__":
+    main()
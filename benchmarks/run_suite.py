@@ -0,0 +1,233 @@
+"""
+Benchmark the hot paths on seeded synthetic ledgers and check for regressions.
+
+Every case runs against ledgers written by ``benchmarks/generator.py``; cases
+that hold all rows as dicts are capped at a row count where they finish in
+reasonable time. Results are printed as JSON with wall time, throughput and
+peak traced memory for each (case, rows) pair.
+
+Usage:
+    python benchmarks/run_suite.py [--rows 1000 100000 ...] [--cases NAME ...]
+        [--repeat 3] [--data-dir DIR] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.2] [--save-baseline baseline.json]
+
+With ``--baseline`` the run exits with status 1 if any case is slower, or
+uses more memory, than the baseline by more than ``--threshold`` (a fraction).
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure
+from benchmarks.generator import write_ledger
+
+DEFAULT_ROWS = [1_000, 100_000]
+
+
+def _read_records(file_path):
+    with open(file_path, mode='r', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+def _load_expenses(file_path, workdir):
+    from expense import load_expenses
+    return len(load_expenses(file_path))
+
+
+def _validate_expense(records, workdir):
+    from expense import validate_expense
+    return sum(1 for record in records if validate_expense(record))
+
+
+def _validate_csv_file(file_path, workdir):
+    from checkCSVFile import validate_csv_file
+    if not validate_csv_file(file_path):
+        raise RuntimeError(f"{file_path} failed validation")
+
+
+def _export_excel(expenses, workdir):
+    from excel_exporter import export_expenses_to_excel
+    export_expenses_to_excel(expenses, os.path.join(workdir, "export.xlsx"))
+
+
+def _export_excel_streaming(file_path, workdir):
+    from excel_exporter import export_expenses_streaming
+    from expense_table import iter_expense_chunks
+    return export_expenses_streaming(iter_expense_chunks(file_path), os.path.join(workdir, "export.xlsx"))
+
+
+def _chart_rollup(file_path, workdir):
+    # What the GUI's update_charts pays when the rollup sidecar is missing or stale
+    from rollup import ExpenseRollup
+    rollup = ExpenseRollup.build(file_path)
+    return rollup.category_totals, rollup.monthly_totals
+
+
+def _chart_table(table, workdir):
+    # Chart totals straight from an already loaded table
+    return table.category_totals(), table.monthly_totals()
+
+
+def _load_table(file_path):
+    from expense_table import ExpenseTable
+    return ExpenseTable.from_csv(file_path)
+
+
+def _load_dicts(file_path):
+    from expense import load_expenses
+    return load_expenses(file_path)
+
+
+# name: (max rows, setup turning the CSV path into the case input, timed function)
+CASES = {
+    "load_expenses": (1_000_000, None, _load_expenses),
+    "validate_expense": (1_000_000, _read_records, _validate_expense),
+    "validate_csv_file": (10_000_000, None, _validate_csv_file),
+    "export_expenses_to_excel": (100_000, _load_dicts, _export_excel),
+    "export_expenses_streaming": (1_000_000, None, _export_excel_streaming),
+    "chart_rollup_build": (10_000_000, None, _chart_rollup),
+    "chart_table_totals": (10_000_000, _load_table, _chart_table),
+}
+
+
+def _import_hot_paths():
+    # Import cost is tracked by bench_startup.py; keep it out of the first timed run
+    import checkCSVFile  # noqa: F401
+    import excel_exporter  # noqa: F401
+    import expense_validator  # noqa: F401
+    import pandas  # noqa: F401
+    import rollup  # noqa: F401
+
+
+def ledger_path(data_dir, rows, seed):
+    """Return the cached synthetic ledger for ``rows``, generating it if needed."""
+    file_path = os.path.join(data_dir, f"ledger-{rows}-{seed}.csv")
+    if not os.path.exists(file_path):
+        write_ledger(f"{file_path}.tmp", rows, seed)
+        os.replace(f"{file_path}.tmp", file_path)
+    return file_path
+
+
+def run_case(name, file_path, rows, workdir, repeat=3, trace_memory=True):
+    """
+    Time one case against one ledger.
+
+    The best of ``repeat`` untraced runs gives the time; one extra run under
+    tracemalloc gives the peak memory, so tracing overhead never skews timings.
+
+    Returns:
+        dict: case, rows, seconds, rows_per_second and peak_bytes.
+    """
+    _, setup, func = CASES[name]
+    with open(os.devnull, mode='w') as devnull, contextlib.redirect_stdout(devnull):
+        data = setup(file_path) if setup else file_path
+        best = None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            func(data, workdir)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        peak = measure(func, data, workdir)[2] if trace_memory else None
+    return {"case": name, "rows": rows, "seconds": round(best, 6),
+            "rows_per_second": round(rows / best) if best else None, "peak_bytes": peak}
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline run.
+
+    Args:
+        results (list): Result dicts from this run.
+        baseline (dict): A previous run's JSON output.
+        threshold (float): Allowed slowdown or memory growth, e.g. 0.2 for 20%.
+
+    Returns:
+        list: One dict per metric that regressed beyond the threshold.
+    """
+    previous = {(result["case"], result["rows"]): result for result in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["case"], result["rows"]))
+        if before is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            old, new = before.get(metric), result.get(metric)
+            if old and new and new > old * (1 + threshold):
+                regressions.append({"case": result["case"], "rows": result["rows"], "metric": metric,
+                                    "baseline": old, "current": new, "change": round(new / old - 1, 3)})
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark ExpenseTracker hot paths on synthetic ledgers.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="Ledger sizes to run (1K to 10M rows).")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is kept.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run.")
+    parser.add_argument("--data-dir", help="Directory to cache generated ledgers in (default: a temp dir).")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    parser.add_argument("--baseline", help="Previous results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed regression as a fraction of the baseline (default 0.2).")
+    parser.add_argument("--save-baseline", help="Write this run's results as the new baseline.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, mode='r') as file:
+            baseline = json.load(file)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        data_dir = args.data_dir or workdir
+        os.makedirs(data_dir, exist_ok=True)
+        cwd = os.getcwd()
+        # Anything the cases write relative to the working directory lands in the scratch dir
+        os.chdir(workdir)
+        try:
+            _import_hot_paths()
+            for rows in args.rows:
+                file_path = ledger_path(os.path.abspath(os.path.join(cwd, data_dir)), rows, args.seed)
+                for name in args.cases:
+                    if rows > CASES[name][0]:
+                        continue
+                    results.append(run_case(name, file_path, rows, workdir, args.repeat, not args.no_memory))
+                    print(json.dumps(results[-1]), file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(), "seed": args.seed,
+                 "repeat": args.repeat},
+        "results": results,
+    }
+    if baseline is not None:
+        report["threshold"] = args.threshold
+        report["regressions"] = compare(results, baseline, args.threshold)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, mode='w') as file:
+                file.write(output + "\n")
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
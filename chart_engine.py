@@ -0,0 +1,135 @@
+import math
+import time
+import matplotlib.pyplot as plt
+from metrics import timed
+
+
+class ExpenseCharts:
+    """
+    Keep the category pie and monthly bar charts alive and update them in place.
+
+    The wedges, their labels and the bars are created once. When only the
+    totals change, the existing artists get new angles, positions and
+    heights; an axis is rebuilt only when its set of categories or months
+    changes. Redraws go through ``draw_idle`` and are throttled to at most
+    ``max_fps`` per second, so a burst of updates costs a single render.
+    """
+
+    START_ANGLE = 140
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+
+    def __init__(self, ax_pie, ax_bar, canvas_pie, canvas_bar, schedule, max_fps=10):
+        """
+        Args:
+            ax_pie (Axes): Axes for the category pie chart.
+            ax_bar (Axes): Axes for the monthly bar chart.
+            canvas_pie (FigureCanvas): Canvas showing ``ax_pie``.
+            canvas_bar (FigureCanvas): Canvas showing ``ax_bar``.
+            schedule (callable): ``schedule(ms, func)``, e.g. ``root.after``.
+            max_fps (int): Upper bound on redraws per second.
+        """
+        self.ax_pie = ax_pie
+        self.ax_bar = ax_bar
+        self.canvas_pie = canvas_pie
+        self.canvas_bar = canvas_bar
+        self.schedule = schedule
+        self.min_interval = 1.0 / max_fps
+
+        self._wedges = []
+        self._labels = []
+        self._pct_texts = []
+        self._pie_keys = None
+        self._pie_values = None
+        self._bars = None
+        self._bar_keys = None
+        self._pending = None
+        self._scheduled = False
+        self._last_render = 0.0
+
+    def update(self, category_totals, monthly_totals):
+        """
+        Queue new totals for display.
+
+        Args:
+            category_totals (dict): Category -> total in cents.
+            monthly_totals (dict): "YYYY-MM" -> total in cents.
+        """
+        self._pending = (category_totals, monthly_totals)
+        if self._scheduled:
+            return
+        self._scheduled = True
+        wait = self._last_render + self.min_interval - time.perf_counter()
+        self.schedule(max(0, int(wait * 1000)), self._render)
+
+    @timed("render_charts")
+    def _render(self):
+        self._scheduled = False
+        if self._pending is None:
+            return
+        category_totals, monthly_totals = self._pending
+        self._pending = None
+        self._last_render = time.perf_counter()
+
+        categories = {category: cents / 100 for category, cents in sorted(category_totals.items()) if cents > 0}
+        months = {month: cents / 100 for month, cents in sorted(monthly_totals.items())}
+        if self._update_pie(categories):
+            self.canvas_pie.draw_idle()
+        if self._update_bars(months):
+            self.canvas_bar.draw_idle()
+
+    def _update_pie(self, totals):
+        keys = tuple(totals)
+        values = tuple(totals.values())
+        if values == self._pie_values and keys == self._pie_keys:
+            return False
+        self._pie_values = values
+        if keys != self._pie_keys:
+            self.ax_pie.clear()
+            self._pie_keys = keys
+            self._wedges, self._labels, self._pct_texts = [], [], []
+            if totals:
+                self._wedges, self._labels, self._pct_texts = self.ax_pie.pie(
+                    list(totals.values()), labels=list(keys), autopct='%1.1f%%',
+                    startangle=self.START_ANGLE, colors=plt.cm.Pastel1.colors)
+            self.ax_pie.set_title("Expenses by Category")
+            return True
+
+        # Same categories: move the existing wedges and texts, as Axes.pie would place them
+        grand_total = sum(totals.values())
+        theta1 = self.START_ANGLE / 360
+        for wedge, label, pct_text, value in zip(self._wedges, self._labels, self._pct_texts, totals.values()):
+            fraction = value / grand_total
+            theta2 = theta1 + fraction
+            wedge.set_theta1(360 * theta1)
+            wedge.set_theta2(360 * theta2)
+            middle = math.pi * (theta1 + theta2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct_text.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            pct_text.set_text(f"{100 * fraction:1.1f}%")
+            theta1 = theta2
+        return True
+
+    def _update_bars(self, totals):
+        keys = tuple(totals)
+        if keys != self._bar_keys:
+            self.ax_bar.clear()
+            self._bar_keys = keys
+            self._bars = self.ax_bar.bar(list(keys), list(totals.values()), color="skyblue", edgecolor="black")
+            self.ax_bar.tick_params(axis="x", labelrotation=90)
+            self.ax_bar.set_title("Expenses by Month")
+            self.ax_bar.set_xlabel("Month")
+            self.ax_bar.set_ylabel("Total Expenses")
+            return True
+
+        changed = False
+        for bar, value in zip(self._bars, totals.values()):
+            if bar.get_height() != value:
+                bar.set_height(value)
+                changed = True
+        if changed:
+            self.ax_bar.relim()
+            self.ax_bar.autoscale_view(scalex=False)
+        return changed
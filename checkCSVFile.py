@@ -1,62 +1,106 @@
-import csv
 import os
 import logging
+from expense_validator import validate_file
 
-# Set up logging
-logging.basicConfig(filename='checkCSVFile.log', level=logging.INFO, 
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# Handlers are configured by the application entry points, not on import
+logger = logging.getLogger(__name__)
 
-def validate_csv_file(file_path):
+def validate_csv_file(file_path, max_logged_errors=20):
     """
     Validate the structure and content of the CSV file.
 
+    Dates, amounts and categories of every row are checked in one vectorized
+    pass; all invalid rows are reported rather than only the first one.
+
     Args:
         file_path (str): The path to the CSV file.
+        max_logged_errors (int): How many individual invalid rows to log.
 
     Returns:
         bool: True if the file is valid, False otherwise.
     """
-    required_columns = ["Date", "Expense Name", "Category", "Amount"]
-
     if not os.path.exists(file_path):
-        logging.error(f"File not found: {file_path}")
+        logger.error(f"File not found: {file_path}")
         print("Error: File not found.")
         return False
 
     try:
-        with open(file_path, mode='r') as file:
-            reader = csv.DictReader(file)
-            headers = reader.fieldnames
-
-            # Check for missing columns
-            missing_columns = [col for col in required_columns if col not in headers]
-            if missing_columns:
-                logging.error(f"Missing columns: {missing_columns}")
-                print(f"Error: Missing columns: {missing_columns}")
-                return False
-
-            # Validate data types
-            for row in reader:
-                try:
-                    float(row["Amount"])
-                except ValueError:
-                    logging.error(f"Invalid amount found: {row['Amount']} in row {reader.line_num}")
-                    print(f"Error: Invalid amount found in row {reader.line_num}.")
-                    return False
-
-                # Additional validations can be added here (e.g., date format, category validation)
-
-        logging.info("CSV file validated successfully.")
-        print("CSV file validated successfully.")
-        return True
-
+        report = validate_file(file_path)
+    except ValueError as e:
+        logger.error(str(e))
+        print(f"Error: {e}")
+        return False
     except Exception as e:
-        logging.exception(f"Failed to validate CSV file: {str(e)}")
+        logger.exception(f"Failed to validate CSV file: {str(e)}")
         print(f"Error: Failed to validate CSV file: {str(e)}")
         return False
 
+    if not report.is_valid:
+        invalid_lines = report.invalid_lines
+        for line, reason in report.errors[:max_logged_errors]:
+            logger.error(f"Invalid row {line}: {reason}")
+        for reason, count in report.counts().items():
+            logger.error(f"{count} row(s) with {reason}")
+        print(f"Error: {len(invalid_lines)} of {report.rows_checked} rows are invalid "
+              f"(first at row {invalid_lines[0]}).")
+        return False
+
+    logger.info("CSV file validated successfully.")
+    print("CSV file validated successfully.")
+    return True
+
+
+def validate_csv_files(sources, workers=None, max_logged_errors=20):
+    """
+    Validate every CSV matched by files, directories or glob patterns in parallel.
+
+    Args:
+        sources (list): Files, directories or glob patterns.
+        workers (int, optional): Worker processes; defaults to the CPU count.
+        max_logged_errors (int): How many individual invalid rows to log per file.
+
+    Returns:
+        bool: True if every file is valid, False otherwise.
+    """
+    from ingest import expand_sources, validate_files
+
+    missing = [file_path for file_path in expand_sources(*sources) if not os.path.exists(file_path)]
+    if missing:
+        logger.error(f"File not found: {', '.join(missing)}")
+        print(f"Error: File not found: {', '.join(missing)}")
+        return False
+
+    try:
+        reports = validate_files(sources, workers)
+    except ValueError as e:
+        logger.error(str(e))
+        print(f"Error: {e}")
+        return False
+    except Exception as e:
+        logger.exception(f"Failed to validate CSV files: {str(e)}")
+        print(f"Error: Failed to validate CSV files: {str(e)}")
+        return False
+
+    valid = True
+    for file_path, report in reports.items():
+        if report.is_valid:
+            continue
+        valid = False
+        invalid_lines = report.invalid_lines
+        for line, reason in report.errors[:max_logged_errors]:
+            logger.error(f"{file_path}: invalid row {line}: {reason}")
+        print(f"Error: {file_path}: {len(invalid_lines)} of {report.rows_checked} rows are invalid "
+              f"(first at row {invalid_lines[0]}).")
+
+    if valid:
+        logger.info(f"{len(reports)} CSV file(s) validated successfully.")
+        print(f"{len(reports)} CSV file(s) validated successfully.")
+    return valid
+
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(filename='checkCSVFile.log', level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
     file_path = 'expense.csv'  # Replace with your actual file path
     validate_csv_file(file_path)
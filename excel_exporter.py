@@ -2,11 +2,15 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Color, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.formatting.rule import DataBarRule
+from openpyxl.cell import WriteOnlyCell
+from expense_table import ExpenseTable
+from metrics import timed
 import logging
 
-# Set up logging
-logging.basicConfig(filename='excel_exporter.log', level=logging.INFO, 
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# Handlers are configured by the application entry points, not on import
+logger = logging.getLogger(__name__)
+
+HEADERS = ["Date", "Expense Name", "Category", "Amount"]
 
 def create_workbook():
     """
@@ -20,6 +24,18 @@ def create_workbook():
     ws.title = "Expense Summary"
     return wb, ws
 
+def header_styles():
+    """
+    Return the font, fill and alignment used for header cells.
+
+    Returns:
+        tuple: Font, PatternFill and Alignment objects.
+    """
+    header_font = Font(bold=True, color="FFFFFF")
+    fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+    alignment = Alignment(horizontal="center", vertical="center")
+    return header_font, fill, alignment
+
 def style_headers(ws):
     """
     Style the headers of the Excel sheet.
@@ -27,9 +43,7 @@ def style_headers(ws):
     Args:
         ws (Worksheet): The active worksheet.
     """
-    header_font = Font(bold=True, color="FFFFFF")
-    fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-    alignment = Alignment(horizontal="center", vertical="center")
+    header_font, fill, alignment = header_styles()
 
     for col_num, column_title in enumerate(ws.iter_cols(1, ws.max_column), 1):
         cell = ws.cell(row=1, column=col_num)
@@ -48,19 +62,26 @@ def add_conditional_formatting(ws):
     data_bar_rule = DataBarRule(start_type="min", end_type="max", color="63C384")
     ws.conditional_formatting.add(f"B2:B{ws.max_row}", data_bar_rule)
 
-def export_expenses_to_excel(expenses, file_path="expense_summary.xlsx"):
+@timed("export_excel")
+def export_expenses_to_excel(expenses, file_path="expense_summary.xlsx", streaming=False):
     """
     Export expenses data to an Excel file with enhanced styling and formatting.
     
     Args:
         expenses (list of dict): A list of expense records.
         file_path (str): The path to save the Excel file.
+        streaming (bool): Write rows straight to disk with
+            ``export_expenses_streaming`` instead of building the sheet in memory.
     """
+    if streaming:
+        export_expenses_streaming(expenses, file_path)
+        return
+
     try:
         wb, ws = create_workbook()
         
         # Write headers
-        headers = ["Date", "Expense Name", "Category", "Amount"]
+        headers = HEADERS
         ws.append(headers)
 
         # Write data rows
@@ -73,15 +94,118 @@ def export_expenses_to_excel(expenses, file_path="expense_summary.xlsx"):
 
         # Save workbook
         wb.save(file_path)
-        logging.info(f"Expenses exported successfully to {file_path}.")
+        logger.info(f"Expenses exported successfully to {file_path}.")
+        print(f"Expenses exported successfully to {file_path}.")
+
+    except Exception as e:
+        logger.exception(f"Failed to export expenses: {str(e)}")
+        print(f"Error: Failed to export expenses: {str(e)}")
+
+def iter_export_rows(expenses):
+    """
+    Flatten an expense source into [date, name, category, amount] rows.
+
+    Args:
+        expenses (iterable): Expense dicts, or ExpenseTable batches such as
+            those produced by ``expense_table.iter_expense_chunks``.
+
+    Yields:
+        list: One worksheet row with a numeric Amount where possible.
+    """
+    for item in expenses:
+        if isinstance(item, ExpenseTable):
+            names, categories = item.names, item.categories
+            for index in range(len(item)):
+                yield [item.date_text(index), names[item.name_codes[index]],
+                       categories[item.category_codes[index]], item.cents[index] / 100]
+            continue
+        amount = item.get("Amount", "")
+        try:
+            amount = float(amount)
+        except (TypeError, ValueError):
+            pass
+        yield [item.get("Date", ""), item.get("Expense Name", ""), item.get("Category", ""), amount]
+
+def write_styled_sheet(wb, title, headers, rows, progress=None, progress_every=10_000):
+    """
+    Append a sheet with styled headers to a write-only workbook.
+
+    Args:
+        wb (Workbook): Write-only workbook.
+        title (str): Sheet title.
+        headers (list): Header row.
+        rows (iterable): Data rows, consumed once.
+        progress (callable, optional): Called with the number of rows written
+            every ``progress_every`` rows.
+        progress_every (int): Rows between progress reports.
+
+    Returns:
+        tuple: The worksheet and the number of data rows written.
+    """
+    ws = wb.create_sheet(title)
+
+    # Column widths must be set before the first row is written
+    for col_num in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = 20
+
+    header_font, fill, alignment = header_styles()
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        cell.fill = fill
+        cell.alignment = alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    count = 0
+    for row in rows:
+        ws.append(row)
+        count += 1
+        if progress is not None and count % progress_every == 0:
+            progress(count)
+    return ws, count
+
+@timed("export_excel_streaming")
+def export_expenses_streaming(expenses, file_path="expense_summary.xlsx", progress=None):
+    """
+    Export expenses with a write-only workbook so rows stream straight to disk.
+
+    Memory use stays flat regardless of the number of rows. The header
+    styling and the data bar formatting match ``export_expenses_to_excel``;
+    Amount cells are written as numbers.
+
+    Args:
+        expenses (iterable): Expense dicts or ExpenseTable batches; consumed once.
+        file_path (str): The path to save the Excel file.
+        progress (callable, optional): Called periodically with the number of
+            rows written so far.
+
+    Returns:
+        int: Number of expense rows written.
+    """
+    try:
+        wb = Workbook(write_only=True)
+        ws, rows = write_styled_sheet(wb, "Expense Summary", HEADERS, iter_export_rows(expenses), progress)
+
+        amount_column = get_column_letter(HEADERS.index("Amount") + 1)
+        data_bar_rule = DataBarRule(start_type="min", end_type="max", color="63C384")
+        ws.conditional_formatting.add(f"{amount_column}2:{amount_column}{rows + 1}", data_bar_rule)
+
+        wb.save(file_path)
+        logger.info(f"Expenses exported successfully to {file_path}.")
         print(f"Expenses exported successfully to {file_path}.")
+        return rows
 
     except Exception as e:
-        logging.exception(f"Failed to export expenses: {str(e)}")
+        logger.exception(f"Failed to export expenses: {str(e)}")
         print(f"Error: Failed to export expenses: {str(e)}")
+        return 0
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(filename='excel_exporter.log', level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
     example_expenses = [
         {"Date": "2023-08-01", "Expense Name": "Groceries", "Category": "Food", "Amount": 150},
         {"Date": "2023-08-02", "Expense Name": "Rent", "Category": "Housing", "Amount": 1200},
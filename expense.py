@@ -1,65 +1,174 @@
 import csv
-from datetime import datetime
-import pandas as pd
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from expense_table import IncrementalExpenseLoader, parse_date
+from money import parse_cents
+from journal import EditJournal
+from metrics import count, timed
+from rollup import file_stamp, invalidate, record_appends
+from storage import CsvBackend, get_backend
 
+CATEGORIES = ["Food", "Rent", "Utilities", "Transportation", "Entertainment", "Other"]
+
+logger = logging.getLogger(__name__)
+
+@timed("load_expenses")
 def load_expenses(file_path):
     """
-    Load expenses from a CSV file.
+    Load expenses from a CSV file or another registered storage backend.
 
     Args:
-        file_path (str): Path to the CSV file.
+        file_path (str): Path to the CSV file (or e.g. a ``.ledger`` file).
 
     Returns:
         list: List of expense dictionaries.
     """
+    backend = get_backend(file_path)
+    if not isinstance(backend, CsvBackend):
+        return backend.load_records()
+
     expenses = []
+    invalid = 0
     try:
         with open(file_path, mode='r') as file:
             reader = csv.DictReader(file)
-            for row in reader:
+            # Apply edits and deletions recorded in the journal by row id
+            changes = EditJournal.load(file_path).changes
+            for row_id, row in enumerate(reader):
+                if row_id in changes:
+                    if changes[row_id] is None:
+                        continue
+                    row = dict(zip(["Date", "Expense Name", "Category", "Amount"], changes[row_id]))
                 # Validate data before adding it to the list
                 if validate_expense(row):
                     expenses.append(row)
                 else:
-                    print(f"Invalid data found in row: {row}")
+                    invalid += 1
+        # One summary line instead of a line per row; reasons are in the metrics
+        if invalid:
+            print(f"Skipped {invalid} invalid row(s) in {file_path}.")
         return expenses
     except FileNotFoundError:
         print(f"Error: The file {file_path} does not exist.")
         return expenses
 
+def load_table(*sources):
+    """
+    Load one or more expense CSVs as a single ExpenseTable, through the ledger cache.
+
+    Repeat loads of unchanged files (and their journals) return the cached
+    table without parsing; see ``ledger_cache.LedgerCache``.
+
+    Args:
+        *sources (str): CSV files, directories or glob patterns.
+
+    Returns:
+        ExpenseTable: The combined expenses, in sorted file order. The table
+        is shared with other callers: use ``copy()`` before modifying it.
+    """
+    from ingest import expand_sources
+    from ledger_cache import cache
+
+    return cache.tables(expand_sources(*sources))
+
+# Loaders of the most recently queried CSVs, so repeated queries only parse appended
+# rows; each holds its whole table, so only a few are kept
+MAX_QUERY_LOADERS = 8
+_query_loaders = OrderedDict()
+_query_loaders_lock = threading.Lock()
+
+def _query_loader(file_path):
+    key = os.path.abspath(file_path)
+    with _query_loaders_lock:
+        loader = _query_loaders.get(key)
+        if loader is None:
+            loader = _query_loaders[key] = IncrementalExpenseLoader(file_path)
+            while len(_query_loaders) > MAX_QUERY_LOADERS:
+                _query_loaders.popitem(last=False)
+        _query_loaders.move_to_end(key)
+        return loader
+
+def query(source, start=None, end=None, categories=None, name_contains=None):
+    """
+    Select expenses by date range, category and name without scanning every row.
+
+    Backed by a date-sorted index with per-category posting lists that is
+    built once per table and kept up to date as rows are appended.
+
+    Args:
+        source (str | ExpenseTable): Path to an expense store, or a loaded table.
+        start (str | date, optional): First date, inclusive (YYYY-MM-DD).
+        end (str | date, optional): Last date, inclusive (YYYY-MM-DD).
+        categories (iterable, optional): Category names to keep; None keeps all.
+        name_contains (str, optional): Case-insensitive substring of the expense name.
+
+    Returns:
+        QueryResult: Lazy view of the matching expenses in date order, with
+        ``total_cents``, ``category_totals`` and ``monthly_totals`` aggregates.
+    """
+    from expense_index import ExpenseIndex
+
+    with timed("query"):
+        table = source
+        if isinstance(source, str):
+            backend = get_backend(source)
+            if isinstance(backend, CsvBackend):
+                table = _query_loader(source).refresh()
+            else:
+                table = backend.load()
+        return ExpenseIndex.for_table(table).query(start, end, categories, name_contains)
+
 def validate_expense(expense):
     """
     Validate an expense entry.
 
+    Failures are tallied in the ``invalid_rows`` metric by reason (and
+    logged at debug level) rather than printed, since this runs once per row
+    when loading a ledger.
+
     Args:
         expense (dict): Expense data to validate.
 
     Returns:
         bool: True if the expense is valid, False otherwise.
     """
+    # Ensure date is present and valid, by the rule the ledger readers apply
+    date_value = expense.get("Date")
+    if not date_value or date_value.strip() == "":
+        return _invalid("missing date", "Missing or invalid date.")
+    try:
+        parse_date(date_value)
+    except ValueError as e:
+        return _invalid("invalid date", e)
+
+    # Ensure amount converts to int64 cents (so no NaN or infinities)
     try:
-        # Ensure date is present and valid
-        date_value = expense.get("Date")
-        if not date_value or date_value.strip() == "":
-            print("Error: Missing or invalid date.")
-            return False
-        datetime.strptime(date_value, "%Y-%m-%d")
-        
-        # Ensure amount is a valid float
-        float(expense["Amount"])
-
-        # Add any additional validations as needed (e.g., category validation)
-        return True
-    except (ValueError, KeyError) as e:
-        print(f"Validation error: {e}")
-        return False
+        parse_cents(expense["Amount"])
+    except KeyError as e:
+        return _invalid("missing amount", e)
+    except ValueError as e:
+        return _invalid("invalid amount", e)
+
+    # Add any additional validations as needed (e.g., category validation)
+    return True
 
+def _invalid(reason, detail):
+    count("invalid_rows", source="validate_expense", reason=reason)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Validation error ({reason}): {detail}")
+    return False
+
+@timed("append_expense")
 def add_expense(file_path, date, name, category, amount):
     """
-    Add a new expense to the CSV file.
+    Add a new expense to the CSV file or another registered storage backend.
 
     Args:
-        file_path (str): Path to the CSV file.
+        file_path (str): Path to the CSV file (or e.g. a ``.ledger`` file).
         date (str): Date of the expense.
         name (str): Name of the expense.
         category (str): Category of the expense.
@@ -73,16 +182,160 @@ def add_expense(file_path, date, name, category, amount):
     }
 
     if validate_expense(new_expense):
+        backend = get_backend(file_path)
         try:
-            with open(file_path, mode='a', newline='') as file:
-                writer = csv.DictWriter(file, fieldnames=new_expense.keys())
-                writer.writerow(new_expense)
-                print("Expense added successfully.")
+            if isinstance(backend, CsvBackend):
+                with locked_append(file_path) as file:
+                    stamp_before = file_stamp(file_path)
+                    writer = csv.DictWriter(file, fieldnames=new_expense.keys())
+                    writer.writerow(new_expense)
+                    file.flush()
+                    # Keep the rollup sidecar in step with the append in O(1)
+                    _update_rollup(file_path, stamp_before, [(date, category, amount)])
+            else:
+                backend.append(date, name, category, amount)
+            print("Expense added successfully.")
         except Exception as e:
             print(f"Error: Could not write to file {file_path}. Exception: {e}")
     else:
         print("Error: Invalid expense data. The expense was not added.")
 
+def _update_rollup(file_path, stamp_before, rows):
+    # The rows are already written: a failing sidecar update must not be reported as a
+    # failed append. The sidecar is dropped instead, and the next reader rebuilds it.
+    try:
+        record_appends(file_path, stamp_before, rows)
+    except Exception as e:
+        count("rollup_update_failures")
+        logger.warning(f"Could not update the rollup of {file_path}, it will be rebuilt: {e}")
+        try:
+            invalidate(file_path)
+        except OSError:
+            # A sidecar whose stamp no longer matches the file is rebuilt anyway
+            pass
+
+@contextmanager
+def locked_file(file):
+    """
+    Hold an exclusive advisory lock on an open file.
+
+    Writers that go through ``add_expense``/``add_expenses`` (CLI and GUI)
+    serialize on this lock, so concurrent appends never interleave.
+
+    Args:
+        file (file object): File opened for writing.
+    """
+    if os.name == "nt":
+        import msvcrt
+        position = file.tell()
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        file.seek(position)
+        try:
+            yield file
+        finally:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield file
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def locked_append(file_path):
+    """
+    Open a CSV for appending and hold its lock.
+
+    ``EditJournal.compact`` replaces the CSV while holding the same lock, so
+    once the lock is granted the handle is checked against the path. If the
+    file was replaced in the meantime it is reopened, and the append lands
+    in the new file instead of the unlinked one.
+
+    Args:
+        file_path (str): Path to the CSV file.
+    """
+    while True:
+        with open(file_path, mode='a', newline='') as file, locked_file(file):
+            try:
+                current = os.path.samestat(os.fstat(file.fileno()), os.stat(file_path))
+            except FileNotFoundError:
+                current = False
+            if current:
+                yield file
+                return
+
+@timed("append_expenses")
+def add_expenses(file_path, rows, fsync=False, validated=False, quiet=False, categories=None):
+    """
+    Add many expenses with one validation pass, one lock and one write.
+
+    Args:
+        file_path (str): Path to the CSV file (or another registered backend).
+        rows (iterable): Expense dicts with Date, Expense Name, Category and
+            Amount keys, or ``(date, name, category, amount)`` tuples.
+        fsync (bool): Flush the batch to stable storage before returning.
+        validated (bool): The caller already checked every row with
+            ``validate_expense``; skip the batch validation pass.
+        quiet (bool): Log the outcome instead of printing it, for callers
+            such as the service that append on every request.
+        categories (list, optional): Accepted category names. None accepts
+            any category, like ``validate_expense``.
+
+    Returns:
+        int: Number of expenses written; invalid rows are skipped.
+    """
+    from expense_validator import validate_records
+
+    records = [row if isinstance(row, dict) else dict(zip(["Date", "Expense Name", "Category", "Amount"], row))
+               for row in rows]
+    invalid = set()
+    if not validated:
+        report = validate_records(records, categories=categories)
+        invalid = set(report.invalid_lines.tolist())
+    valid = [(record["Date"], record["Expense Name"], record["Category"], record["Amount"])
+             for index, record in enumerate(records) if index not in invalid]
+    if invalid:
+        for reason, rows_with_reason in report.counts().items():
+            if rows_with_reason:
+                count("invalid_rows", rows_with_reason, source="add_expenses", reason=reason)
+        _status(f"Skipped {len(invalid)} invalid expense(s).", quiet)
+    if not valid:
+        return 0
+
+    backend = get_backend(file_path)
+    try:
+        if not isinstance(backend, CsvBackend):
+            backend.append_many(valid)
+        else:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(valid)
+            with locked_append(file_path) as file:
+                stamp_before = file_stamp(file_path)
+                if stamp_before[0] == 0:
+                    file.write("Date,Expense Name,Category,Amount\r\n")
+                file.write(buffer.getvalue())
+                file.flush()
+                if fsync:
+                    os.fsync(file.fileno())
+                _update_rollup(file_path, stamp_before, [(date, category, amount) for date, _, category, amount in valid])
+        _status(f"{len(valid)} expense(s) added successfully.", quiet)
+        return len(valid)
+    except Exception as e:
+        if quiet:
+            logger.error(f"Could not write to file {file_path}: {e}")
+        else:
+            print(f"Error: Could not write to file {file_path}. Exception: {e}")
+        return 0
+
+def _status(message, quiet):
+    if quiet:
+        logger.debug(message)
+    else:
+        print(message)
+
 # Example usage
 if __name__ == "__main__":
     file_path = 'expense.csv'
@@ -1,11 +1,25 @@
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import logging
 import os
-from expense import add_expense, load_expenses
-from excel_exporter import export_expenses_to_excel
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from expense import CATEGORIES, add_expense, add_expenses, load_expenses
+from expense_table import format_cents, iter_expense_chunks, iter_reader_chunks, summarize_chunks
+from metrics import metrics
+from money import format_money, parse_cents, parse_cents_array, sum_cents
 
 def main():
     print("Running Expense Tracker!")
     expenseFilePath = "expense.csv"
-    budget = 2000  # Example budget, this could be user-defined
+    budget_cents = parse_cents(2000)  # Example budget, this could be user-defined
 
     print("Getting User Expense!")
     expense_name = input("Enter expense name: ").strip()
@@ -16,12 +30,12 @@ def main():
         return
 
     try:
-        expense_amount = float(expense_amount)
+        expense_amount = format_cents(parse_cents(expense_amount))
     except ValueError:
         print("Error: Invalid amount entered. Please enter a numeric value.")
         return
 
-    categories = ["Food", "Rent", "Utilities", "Transportation", "Entertainment", "Other"]
+    categories = CATEGORIES
     print("Available categories:")
     for i, category in enumerate(categories, 1):
         print(f"{i}. {category}")
@@ -34,20 +48,294 @@ def main():
     category = categories[int(category_choice) - 1]
 
     # Add expense
-    add_expense(expenseFilePath, "2023-08-10", expense_name, category, expense_amount)
+    add_expense(expenseFilePath, date.today().isoformat(), expense_name, category, expense_amount)
 
     # Load and summarize expenses
     print("Summarizing expenses from expense.csv...")
     expenses = load_expenses(expenseFilePath)
-    total_spent = sum(float(exp["Amount"]) for exp in expenses)
-    print(f"Total Spent: ${total_spent:.2f}")
-    print(f"Budget: ${budget:.2f}")
-    print(f"Remaining: ${budget - total_spent:.2f}")
+    # Exact integer cents, summed in one vectorized pass
+    total_cents = sum_cents(parse_cents_array([exp["Amount"] for exp in expenses])[0])
+    print(f"Total Spent: {format_money(total_cents)}")
+    print(f"Budget: {format_money(budget_cents)}")
+    print(f"Remaining: {format_money(budget_cents - total_cents)}")
 
     # Export expenses to Excel
     print("Exporting expenses to Excel...")
+    from excel_exporter import export_expenses_to_excel
     export_expenses_to_excel(expenses)
     print("Expenses have been exported to expense_summary.xlsx.")
 
+STDIN = "-"
+IMPORT_BATCH_ROWS = 50_000
+
+
+def _open_source(source):
+    # "-" reads the expense CSV from stdin
+    if source == STDIN:
+        return contextlib.nullcontext(sys.stdin)
+    return open(source, mode='r', newline='')
+
+
+def _map_sources(func, sources, workers, *args):
+    """Run ``func(source, *args)`` per source, in a process pool when more than one worker is useful."""
+    # stdin belongs to this process, so it is always handled here
+    files = [source for source in sources if source != STDIN]
+    workers = min(workers, len(files))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {source: pool.submit(func, source, *args) for source in files}
+            return [futures[source].result() if source in futures else func(source, *args) for source in sources]
+    return [func(source, *args) for source in sources]
+
+
+def _import_source(source, ledger, batch_rows, fsync, categories):
+    started = time.perf_counter()
+    result = {"source": source, "rows": 0, "written": 0}
+    try:
+        # Library messages go to stderr so stdout stays machine-readable
+        with _open_source(source) as file, contextlib.redirect_stdout(sys.stderr):
+            reader = csv.DictReader(file)
+            missing = [column for column in ["Date", "Expense Name", "Category", "Amount"] if column not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"Missing columns: {missing}")
+            while True:
+                batch = list(itertools.islice(reader, batch_rows))
+                if not batch:
+                    break
+                result["rows"] += len(batch)
+                result["written"] += add_expenses(ledger, batch, fsync=fsync, categories=categories)
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+    result["skipped"] = result["rows"] - result["written"]
+    result["seconds"] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def _summarize_source(source):
+    from rollup import ExpenseRollup
+    from storage import CsvBackend, SqliteBackend, get_backend
+
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            if source == STDIN:
+                summary = summarize_chunks(iter_reader_chunks(sys.stdin))
+            else:
+                backend = get_backend(source)
+                if isinstance(backend, CsvBackend):
+                    if not os.path.exists(source):
+                        raise FileNotFoundError(f"The file {source} does not exist.")
+                    # The rollup sidecar makes repeated summaries O(1)
+                    rollup = ExpenseRollup.load(source)
+                elif isinstance(backend, SqliteBackend):
+                    rollup = backend.summary()
+                    backend.close()
+                else:
+                    rollup = None
+                    summary = summarize_chunks([backend.load()])
+                if rollup is not None:
+                    summary = {"rows": rollup.rows, "total_cents": rollup.total_cents,
+                               "category_totals": rollup.category_totals, "monthly_totals": rollup.monthly_totals}
+    except (OSError, ValueError) as e:
+        return {"source": source, "error": str(e), "seconds": round(time.perf_counter() - started, 6)}
+    summary.pop("invalid_rows", None)
+    return {"source": source, **summary, "seconds": round(time.perf_counter() - started, 6)}
+
+
+def _validate_source(source, max_errors, categories):
+    from expense_validator import validate_file
+
+    started = time.perf_counter()
+    spooled = None
+    try:
+        path = source
+        if source == STDIN:
+            # The validator reads the file in several passes, so stdin is spooled first
+            with tempfile.NamedTemporaryFile(mode='w', suffix=".csv", delete=False, newline='') as spooled:
+                shutil.copyfileobj(sys.stdin, spooled)
+            path = spooled.name
+        report = validate_file(path, categories=categories)
+    except (OSError, ValueError) as e:
+        return {"source": source, "error": str(e), "seconds": round(time.perf_counter() - started, 6)}
+    finally:
+        if spooled is not None:
+            os.unlink(spooled.name)
+    return {"source": source, "valid": report.is_valid,
+            "invalid_rows": len(report.invalid_lines),
+            "reasons": {reason: count for reason, count in report.counts().items() if count},
+            "errors": [[line, reason] for line, reason in report.errors[:max_errors]],
+            "seconds": round(time.perf_counter() - started, 6)}
+
+
+def _merge_summaries(results):
+    merged = {"rows": 0, "total_cents": 0, "category_totals": {}, "monthly_totals": {}}
+    for result in results:
+        if "error" in result:
+            continue
+        merged["rows"] += result["rows"]
+        merged["total_cents"] += result["total_cents"]
+        for key in ("category_totals", "monthly_totals"):
+            for name, cents in result[key].items():
+                merged[key][name] = merged[key].get(name, 0) + cents
+    merged["monthly_totals"] = dict(sorted(merged["monthly_totals"].items()))
+    merged["total"] = format_cents(merged["total_cents"])
+    return merged
+
+
+def _categories(args):
+    # import and validate share one category policy
+    return None if args.allow_unknown_categories else CATEGORIES
+
+
+def import_command(args):
+    from storage import BinaryLedgerBackend, get_backend
+
+    workers = args.workers
+    if isinstance(get_backend(args.ledger), BinaryLedgerBackend):
+        # A binary ledger supports a single writer process
+        workers = 1
+    results = _map_sources(_import_source, args.sources, workers, args.ledger, args.batch_rows, args.fsync,
+                           _categories(args))
+    stats = {"ledger": args.ledger, "files": results,
+             "rows": sum(result["rows"] for result in results),
+             "written": sum(result["written"] for result in results),
+             "skipped": sum(result["skipped"] for result in results)}
+    if args.summary:
+        stats["summary"] = _summarize_source(args.ledger)
+    return stats, workers
+
+
+def summary_command(args):
+    results = _map_sources(_summarize_source, args.sources or [args.ledger], args.workers)
+    return {"files": results, **_merge_summaries(results)}, args.workers
+
+
+def validate_command(args):
+    results = _map_sources(_validate_source, args.sources, args.workers, args.max_errors, _categories(args))
+    return {"files": results, "valid": all(result.get("valid") for result in results)}, args.workers
+
+
+def export_command(args):
+    from excel_exporter import export_expenses_streaming
+    from storage import CsvBackend, get_backend
+
+    sources = args.sources or [args.ledger]
+    if args.report:
+        from report_builder import build_report
+        if len(sources) != 1 or not isinstance(get_backend(sources[0]), CsvBackend) or sources[0] == STDIN:
+            raise SystemExit("Error: --report needs exactly one CSV file.")
+        with contextlib.redirect_stdout(sys.stderr):
+            sheets = build_report(sources[0], args.output, workers=args.workers)
+        return {"output": args.output, "sheets": sheets}, args.workers
+
+    from ledger_cache import cache
+
+    def chunks():
+        for source in sources:
+            if source == STDIN:
+                yield from iter_reader_chunks(sys.stdin)
+            elif isinstance(get_backend(source), CsvBackend) and not cache.disk_dir:
+                # Without a disk cache, streaming keeps memory flat
+                yield from iter_expense_chunks(source)
+            else:
+                yield get_backend(source).load()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        rows = export_expenses_streaming(chunks(), args.output)
+    return {"output": args.output, "rows": rows}, 1
+
+
+COMMANDS = {
+    "import": import_command,
+    "summary": summary_command,
+    "validate": validate_command,
+    "export": export_command,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="expenseTracker",
+        description="Expense tracker. Without a command, records one expense interactively.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--ledger", default="expense.csv", help="expense ledger (CSV, .ledger or SQLite)")
+    common.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for multi-file runs (default: CPU count)")
+    common.add_argument("--metrics", metavar="FILE",
+                        help="write this process's timers and counters to FILE (.prom: Prometheus text, else JSON)")
+    common.add_argument("--profile", metavar="OPERATIONS",
+                        help="cProfile these comma-separated operations ('*' for all) into --profile-dir")
+    common.add_argument("--profile-dir", default=".", help="directory for .prof files (default: current)")
+    common.add_argument("--cache-dir", default=os.environ.get("EXPENSE_CACHE_DIR"),
+                        help="keep parsed ledgers on disk here so later runs skip parsing (env: EXPENSE_CACHE_DIR)")
+
+    category_policy = argparse.ArgumentParser(add_help=False)
+    category_policy.add_argument("--allow-unknown-categories", action="store_true",
+                                 help=f"accept categories other than {', '.join(CATEGORIES)} (default: reject the row)")
+
+    commands = parser.add_subparsers(dest="command")
+    import_parser = commands.add_parser("import", parents=[common, category_policy],
+                                        help="append expense CSVs to the ledger")
+    import_parser.add_argument("sources", nargs="+", help="CSV files to import; '-' reads stdin")
+    import_parser.add_argument("--batch-rows", type=int, default=IMPORT_BATCH_ROWS,
+                               help="rows validated and appended per batch")
+    import_parser.add_argument("--fsync", action="store_true", help="fsync every batch")
+    import_parser.add_argument("--summary", action="store_true", help="include the ledger totals after the import")
+
+    summary_parser = commands.add_parser("summary", parents=[common], help="print totals per category and month")
+    summary_parser.add_argument("sources", nargs="*", help="ledgers or CSVs to total (default: --ledger); '-' reads stdin")
+
+    validate_parser = commands.add_parser("validate", parents=[common, category_policy],
+                                          help="check expense CSVs without importing")
+    validate_parser.add_argument("sources", nargs="+", help="CSV files to check; '-' reads stdin")
+    validate_parser.add_argument("--max-errors", type=int, default=20, help="errors listed per file")
+
+    export_parser = commands.add_parser("export", parents=[common], help="export expenses to an Excel workbook")
+    export_parser.add_argument("sources", nargs="*", help="ledgers or CSVs to export (default: --ledger); '-' reads stdin")
+    export_parser.add_argument("-o", "--output", default="expense_summary.xlsx", help="workbook to write")
+    export_parser.add_argument("--report", action="store_true",
+                               help="build the multi-sheet report (category, monthly pivot, top expenses)")
+    return parser
+
+
+def cli(argv=None):
+    """
+    Run a batch subcommand and print its result with timing stats as JSON.
+
+    With no command, falls back to the interactive ``main``.
+
+    Args:
+        argv (list, optional): Arguments; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status; 1 if any source failed or did not validate.
+    """
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        main()
+        return 0
+
+    if args.cache_dir:
+        from ledger_cache import cache
+        cache.disk_dir = args.cache_dir
+        # Worker processes started with spawn pick the cache up from the environment
+        os.environ["EXPENSE_CACHE_DIR"] = args.cache_dir
+    if args.profile:
+        metrics.enable_profiling(args.profile.split(",") if args.profile != "*" else "*", profile_dir=args.profile_dir)
+    started = time.perf_counter()
+    stats, workers = COMMANDS[args.command](args)
+    seconds = time.perf_counter() - started
+    rows = stats.get("rows", sum(result.get("rows", 0) for result in stats.get("files", [])))
+    stats = {"command": args.command, **stats, "workers": workers, "seconds": round(seconds, 6),
+             "rows_per_second": round(rows / seconds) if rows and seconds else None}
+    print(json.dumps(stats))
+    if args.metrics:
+        metrics.write(args.metrics)
+    failed = any("error" in result for result in stats.get("files", [])) or stats.get("valid") is False
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    logging.basicConfig(filename='expense_tracker.log', level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    sys.exit(cli())
@@ -0,0 +1,278 @@
+import weakref
+from datetime import date, datetime
+import numpy as np
+from money import group_totals, monthly_totals
+
+# One index per table, dropped together with the table
+_indexes = weakref.WeakKeyDictionary()
+
+
+def _ordinal(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(value, "%Y-%m-%d").date().toordinal()
+
+
+def _months(first_ordinal, last_ordinal):
+    """Yield ``("YYYY-MM", first day ordinal)`` for every month between two ordinals."""
+    day = date.fromordinal(first_ordinal).replace(day=1)
+    last = date.fromordinal(last_ordinal)
+    while day <= last:
+        yield day.strftime("%Y-%m"), day.toordinal()
+        day = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+class _Run:
+    """Row positions sorted by date, with a prefix sum of their amounts."""
+
+    def __init__(self, rows, dates, cents):
+        self.rows = rows
+        self.dates = dates
+        self.prefix = np.concatenate(([0], np.cumsum(cents, dtype=np.int64)))
+
+    def extend(self, rows, dates, cents):
+        """Add rows sorted by date (and position); back-dated ones are merged into place."""
+        if not self.dates.size or dates[0] >= self.dates[-1]:
+            self.rows = np.concatenate((self.rows, rows))
+            self.dates = np.concatenate((self.dates, dates))
+            self.prefix = np.concatenate((self.prefix, self.prefix[-1] + np.cumsum(cents, dtype=np.int64)))
+            return
+        # New rows come after existing rows with the same date, as a stable sort would put them
+        at = np.searchsorted(self.dates, dates, side="right")
+        amounts = np.insert(np.diff(self.prefix), at, cents)
+        self.rows = np.insert(self.rows, at, rows)
+        self.dates = np.insert(self.dates, at, dates)
+        self.prefix = np.concatenate(([0], np.cumsum(amounts, dtype=np.int64)))
+
+    def bounds(self, start, end):
+        lo = 0 if start is None else int(np.searchsorted(self.dates, start, side="left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, end, side="right"))
+        return lo, max(lo, hi)
+
+    def total(self, lo, hi):
+        return int(self.prefix[hi] - self.prefix[lo])
+
+    def monthly_totals(self, lo, hi, totals):
+        if lo == hi:
+            return
+        months = list(_months(int(self.dates[lo]), int(self.dates[hi - 1])))
+        starts = np.searchsorted(self.dates[lo:hi], [ordinal for _, ordinal in months], side="left") + lo
+        ends = list(starts[1:]) + [hi]
+        for (month, _), month_lo, month_hi in zip(months, starts, ends):
+            if month_hi > month_lo:
+                totals[month] = totals.get(month, 0) + self.total(month_lo, month_hi)
+
+
+class ExpenseIndex:
+    """
+    Date and category indexes over an ExpenseTable.
+
+    Row positions are kept sorted by date, once for the whole table and once
+    per category (posting lists), each with a prefix sum of amounts. A date
+    range is two binary searches, and totals over it are a subtraction, so
+    queries and their aggregates run in O(log N) rather than a full scan.
+
+    The index keeps its own copies of the columns. Appended rows are sorted
+    on their own and merged into the existing runs, so back-dated entries
+    cost a linear merge rather than a re-sort; edits and deletions rebuild
+    the index on the next query.
+    """
+
+    def __init__(self, table):
+        # Weak, so the cache entry keyed by the table does not keep the table alive
+        self._table = weakref.ref(table)
+        self._size = 0
+        self._version = None
+        self.sync()
+
+    @property
+    def table(self):
+        return self._table()
+
+    @classmethod
+    def for_table(cls, table):
+        """Return the cached index of ``table``, brought up to date."""
+        index = _indexes.get(table)
+        if index is None:
+            index = _indexes[table] = cls(table)
+        else:
+            index.sync()
+        return index
+
+    def sync(self):
+        """Catch up with rows appended to or edited in the table since the last call."""
+        table = self.table
+        if self._version == table.version and self._size == len(table):
+            return
+        if self._version != table.version or self._size > len(table):
+            self._build()
+        else:
+            self._extend()
+        self._size = len(table)
+        self._version = table.version
+
+    def _columns(self, start=0):
+        # Copies, so the table's arrays remain free to grow while the index is in use
+        table = self.table
+        return (np.frombuffer(table.dates, dtype=np.int64)[start:].copy(),
+                np.frombuffer(table.cents, dtype=np.int64)[start:].copy(),
+                np.frombuffer(table.category_codes, dtype=np.int32)[start:].copy(),
+                np.frombuffer(table.name_codes, dtype=np.int32)[start:].copy())
+
+    def _build(self):
+        self.dates, self.cents, self.category_codes, self.name_codes = self._columns()
+        order = np.argsort(self.dates, kind="stable")
+        self.all = _Run(order, self.dates[order], self.cents[order])
+        self.by_category = {}
+        self._add_postings(order)
+
+    def _add_postings(self, order):
+        # Stable sort by category keeps each posting list in date order
+        codes = self.category_codes[order]
+        grouped = order[np.argsort(codes, kind="stable")]
+        grouped_codes = self.category_codes[grouped]
+        for rows in np.split(grouped, np.flatnonzero(np.diff(grouped_codes)) + 1):
+            if not rows.size:
+                continue
+            code = int(self.category_codes[rows[0]])
+            run = self.by_category.get(code)
+            if run is None:
+                self.by_category[code] = _Run(rows, self.dates[rows], self.cents[rows])
+            else:
+                run.extend(rows, self.dates[rows], self.cents[rows])
+
+    def _extend(self):
+        dates, cents, category_codes, name_codes = self._columns(self._size)
+        self.dates = np.concatenate((self.dates, dates))
+        self.cents = np.concatenate((self.cents, cents))
+        self.category_codes = np.concatenate((self.category_codes, category_codes))
+        self.name_codes = np.concatenate((self.name_codes, name_codes))
+        order = np.argsort(dates, kind="stable") + self._size
+        self.all.extend(order, self.dates[order], self.cents[order])
+        self._add_postings(order)
+
+    def query(self, start=None, end=None, categories=None, name_contains=None):
+        """
+        Select expenses by date range, category and name.
+
+        Args:
+            start (str | date, optional): First date, inclusive (YYYY-MM-DD).
+            end (str | date, optional): Last date, inclusive (YYYY-MM-DD).
+            categories (iterable, optional): Category names to keep; None keeps all.
+            name_contains (str, optional): Case-insensitive substring of the name.
+
+        Returns:
+            QueryResult: Lazy view of the matching rows in date order.
+        """
+        self.sync()
+        start, end = _ordinal(start), _ordinal(end)
+        if categories is None:
+            runs = [self.all]
+        else:
+            lookup = {name: code for code, name in enumerate(self.table.categories)}
+            codes = sorted({lookup[name] for name in categories if name in lookup})
+            runs = [self.by_category[code] for code in codes if code in self.by_category]
+        name_codes = None
+        if name_contains:
+            needle = name_contains.lower()
+            name_codes = np.array([code for code, name in enumerate(self.table.names) if needle in name.lower()],
+                                  dtype=np.int32)
+        return QueryResult(self, [(run, *run.bounds(start, end)) for run in runs], (start, end), name_codes)
+
+
+class QueryResult:
+    """
+    Lazy view over the rows matched by ``ExpenseIndex.query``.
+
+    Nothing is copied up front. Length and aggregates are answered from the
+    index's prefix sums; row positions are only materialized when rows are
+    read or a name filter has to be applied. Rows come back as the usual
+    expense dictionaries, in date order.
+    """
+
+    def __init__(self, index, runs, date_range, name_codes=None):
+        self.index = index
+        self.table = index.table
+        self._runs = runs
+        self._date_range = date_range
+        self._name_codes = name_codes
+        self._positions = None
+
+    @property
+    def positions(self):
+        """Table positions of the matching rows, in date order."""
+        if self._positions is None:
+            parts = [run.rows[lo:hi] for run, lo, hi in self._runs]
+            positions = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+            if len(parts) > 1:
+                positions = positions[np.lexsort((positions, self.index.dates[positions]))]
+            if self._name_codes is not None:
+                positions = positions[np.isin(self.index.name_codes[positions], self._name_codes)]
+            self._positions = positions
+        return self._positions
+
+    def __len__(self):
+        if self._name_codes is not None:
+            return len(self.positions)
+        return sum(hi - lo for _, lo, hi in self._runs)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.table.row(int(position)) for position in self.positions[index]]
+        return self.table.row(int(self.positions[index]))
+
+    def __iter__(self):
+        for position in self.positions:
+            yield self.table.row(int(position))
+
+    def row_id(self, index):
+        """Return the stable row id of the ``index``-th match."""
+        return self.table.row_ids[int(self.positions[index])]
+
+    def total_cents(self):
+        """Return the sum of the matching amounts in cents."""
+        if self._name_codes is not None:
+            return int(self.index.cents[self.positions].sum())
+        return sum(run.total(lo, hi) for run, lo, hi in self._runs)
+
+    def category_totals(self):
+        """
+        Sum the matching amounts per category.
+
+        Returns:
+            dict: Category name -> total in cents, for categories with matches.
+        """
+        categories = self.table.categories
+        if self._name_codes is not None:
+            positions = self.positions
+            codes = self.index.category_codes[positions]
+            totals = group_totals(codes, self.index.cents[positions], len(categories))
+            counts = np.bincount(codes, minlength=len(categories))
+            return {categories[code]: int(totals[code]) for code in np.flatnonzero(counts)}
+        if self._runs and self._runs[0][0] is self.index.all:
+            # Every category in the date range, answered from the posting lists
+            start, end = self._date_range
+            runs = [(code, run, *run.bounds(start, end)) for code, run in self.index.by_category.items()]
+        else:
+            runs = [(int(self.index.category_codes[run.rows[0]]), run, lo, hi) for run, lo, hi in self._runs]
+        return {categories[code]: run.total(lo, hi) for code, run, lo, hi in sorted(runs, key=lambda item: item[0]) if hi > lo}
+
+    def monthly_totals(self):
+        """
+        Sum the matching amounts per calendar month.
+
+        Returns:
+            dict: "YYYY-MM" -> total in cents, sorted by month.
+        """
+        if self._name_codes is not None:
+            positions = self.positions
+            return monthly_totals(self.index.dates[positions], self.index.cents[positions])
+        totals = {}
+        for run, lo, hi in self._runs:
+            run.monthly_totals(lo, hi, totals)
+        return dict(sorted(totals.items()))
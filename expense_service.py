@@ -0,0 +1,476 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import re
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from expense import add_expenses, validate_expense
+from expense_table import IncrementalExpenseLoader
+from metrics import count, gauge, metrics, timed
+from money import format_cents, parse_cents
+
+LEDGER_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+EXPORT_NAME = re.compile(r"[A-Za-z0-9_.-]{1,128}\.xlsx")
+FIELDS = ["Date", "Expense Name", "Category", "Amount"]
+DEFAULT_MAX_LEDGERS = 64
+MAX_BATCH_ROWS = 10_000
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_PAGE_ROWS = 1000
+# Metric labels come from these fixed sets, never from the raw request
+SERVICE_ROUTES = {"health", "metrics", "ledgers"}
+LEDGER_ROUTES = {"expenses", "summary", "export"}
+METHODS = {"GET", "POST"}
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+logger = logging.getLogger(__name__)
+
+
+class HttpError(Exception):
+    """A request failure reported to the client as ``{"error": message}``."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def route_name(parts):
+    """
+    Return the fixed route name of a request path, used to dispatch it and label its metrics.
+
+    Args:
+        parts (list): Path segments, e.g. ``["ledgers", "home", "summary"]``.
+
+    Returns:
+        str: "health", "metrics", "ledgers", "expenses", "summary", "export" or "not_found".
+    """
+    if len(parts) == 1 and parts[0] in SERVICE_ROUTES:
+        return parts[0]
+    if len(parts) == 3 and parts[0] == "ledgers" and parts[2] in LEDGER_ROUTES:
+        return parts[2]
+    return "not_found"
+
+
+def _split_path(path):
+    return [unquote(part) for part in path.strip("/").split("/") if part]
+
+
+def _export(table, file_path):
+    # Runs in an export worker process; the table arrives pickled
+    from excel_exporter import export_expenses_streaming
+    return export_expenses_streaming([table], file_path)
+
+
+class Ledger:
+    """
+    One hot ledger: its parsed table plus a queue of pending appends.
+
+    The table is kept current by an ``IncrementalExpenseLoader``, so reads
+    after the first one only parse bytes appended since. Appends from all
+    connections go through a single writer task that drains the queue and
+    writes everything waiting with one ``add_expenses`` call (one lock, one
+    write, one rollup update), so a burst of N appends costs a handful of
+    writes instead of N. Reads never wait for writes.
+    """
+
+    def __init__(self, name, file_path, io_pool):
+        self.name = name
+        self.file_path = file_path
+        self.loader = IncrementalExpenseLoader(file_path)
+        self.pending = asyncio.Queue()
+        self.writing = False
+        # Serializes use of the loader, which runs on io_pool threads
+        self._lock = asyncio.Lock()
+        self._io_pool = io_pool
+        self._writer = asyncio.create_task(self._write_batches())
+
+    @property
+    def idle(self):
+        return self.pending.empty() and not self.writing and not self._lock.locked()
+
+    async def append(self, rows):
+        """
+        Queue validated rows and wait until they are on disk.
+
+        Args:
+            rows (list): ``(date, name, category, amount)`` tuples.
+
+        Returns:
+            int: Number of rows written.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.pending.put((rows, future))
+        return await future
+
+    async def read(self, func):
+        """
+        Bring the table up to date and return ``func(table)``.
+
+        Both run on an I/O thread while the loader is held, so ``func`` sees
+        a table no other refresh is modifying.
+        """
+        def run():
+            return func(self.loader.refresh())
+
+        async with self._lock:
+            return await asyncio.get_running_loop().run_in_executor(self._io_pool, run)
+
+    async def close(self):
+        """Finish the queued appends and stop the writer task."""
+        await self.pending.join()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+
+    async def _write_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.pending.get()]
+            rows = list(batch[0][0])
+            # Everything that queued up during the previous write goes out together
+            while not self.pending.empty() and len(rows) < MAX_BATCH_ROWS:
+                batch.append(self.pending.get_nowait())
+                rows.extend(batch[-1][0])
+            self.writing = True
+            try:
+                with timed("service_append_batch"):
+                    # Rows were checked one by one when they were queued
+                    # and the service logs instead of printing per batch
+                    append = partial(add_expenses, validated=True, quiet=True)
+                    written = await loop.run_in_executor(self._io_pool, append, self.file_path, rows)
+                error = None if written == len(rows) else OSError(f"could not write to ledger {self.name}")
+            except Exception as e:
+                error = e
+            finally:
+                self.writing = False
+            count("service_append_batches", ledger=self.name)
+            count("service_appended_rows", len(rows) if error is None else 0, ledger=self.name)
+            for item_rows, future in batch:
+                if not future.done():
+                    if error is None:
+                        future.set_result(len(item_rows))
+                    else:
+                        future.set_exception(error)
+                self.pending.task_done()
+
+
+class ExpenseService:
+    """
+    Serve many expense ledgers from one process over a local HTTP/JSON API.
+
+    Ledgers are the ``<name>.csv`` files in ``root``. Up to ``max_ledgers``
+    of them stay resident as ``Ledger`` objects (least recently used are
+    dropped once idle); blocking file work runs on a thread pool and Excel
+    exports on a process pool, so the event loop only parses requests and
+    routes them.
+
+    Routes:
+        GET  /health
+        GET  /metrics                      Prometheus text of the process metrics
+        GET  /ledgers                      ledger names, and whether each is resident
+        GET  /ledgers/<name>/expenses      ?start=&end=&category=&name=&offset=&limit=
+        POST /ledgers/<name>/expenses      an expense object or a list of them
+        GET  /ledgers/<name>/summary       grand, category and monthly totals (same filters)
+        POST /ledgers/<name>/export        {"file": "<name>.xlsx"}, written under <root>/exports
+    """
+
+    def __init__(self, root, max_ledgers=DEFAULT_MAX_LEDGERS, io_workers=8, export_workers=2):
+        self.root = root
+        self.max_ledgers = max_ledgers
+        self.export_dir = os.path.join(root, "exports")
+        self._ledgers = OrderedDict()
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="expense-io")
+        # Spawned, not forked: forking while the I/O threads hold locks can deadlock the child
+        self._export_pool = ProcessPoolExecutor(max_workers=export_workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """
+        Start listening.
+
+        Returns:
+            asyncio.Server: The running server (``port=0`` picks a free port).
+        """
+        os.makedirs(self.root, exist_ok=True)
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server
+
+    async def close(self):
+        """Stop accepting connections, flush every pending append and shut the pools down."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for ledger in list(self._ledgers.values()):
+            await ledger.close()
+        self._ledgers.clear()
+        self._io_pool.shutdown()
+        self._export_pool.shutdown()
+
+    def ledger_path(self, name):
+        if not LEDGER_NAME.fullmatch(name):
+            raise HttpError(400, f"invalid ledger name: {name!r}")
+        return os.path.join(self.root, f"{name}.csv")
+
+    def ledger(self, name, create=False):
+        """Return the resident ledger ``name``, loading it on first use."""
+        ledger = self._ledgers.get(name)
+        if ledger is not None:
+            self._ledgers.move_to_end(name)
+        else:
+            file_path = self.ledger_path(name)
+            if not create and not os.path.exists(file_path):
+                raise HttpError(404, f"no such ledger: {name}")
+            ledger = self._ledgers[name] = Ledger(name, file_path, self._io_pool)
+        if len(self._ledgers) > self.max_ledgers:
+            self._evict(ledger)
+        gauge("service_resident_ledgers", len(self._ledgers))
+        return ledger
+
+    def _evict(self, keep):
+        # Busy ledgers stay until a later call finds them idle
+        for name, ledger in list(self._ledgers.items()):
+            if len(self._ledgers) <= self.max_ledgers:
+                break
+            if ledger is not keep and ledger.idle:
+                # Nothing queued or in flight, so stopping the writer loses nothing
+                del self._ledgers[name]
+                asyncio.ensure_future(ledger.close())
+                count("service_ledger_evictions")
+
+    async def handle(self, method, target, body):
+        """
+        Route one request.
+
+        Args:
+            method (str): HTTP method.
+            target (str): Request path with an optional query string.
+            body (bytes): Request body.
+
+        Returns:
+            tuple: ``(status, payload)``; the payload is JSON-serializable,
+            or a string for text responses.
+        """
+        url = urlsplit(target)
+        parts = _split_path(url.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = route_name(parts)
+        if route == "health":
+            return 200, {"status": "ok", "ledgers": len(self._ledgers)}
+        if route == "metrics":
+            return 200, metrics.prometheus_text()
+        if route == "ledgers":
+            self._allow(method, "GET")
+            return 200, {"ledgers": self.list_ledgers()}
+        if route == "not_found":
+            raise HttpError(404, f"no route for {url.path}")
+        name = parts[1]
+        if route == "expenses" and method == "POST":
+            return 201, await self.add(name, self._json(body))
+        if route == "expenses":
+            self._allow(method, "GET")
+            return 200, await self.expenses(name, params)
+        if route == "summary":
+            self._allow(method, "GET")
+            return 200, await self.summary(name, params)
+        self._allow(method, "POST")
+        return 200, await self.export(name, self._json(body) if body else {})
+
+    def list_ledgers(self):
+        names = sorted(entry[:-4] for entry in os.listdir(self.root)
+                       if entry.endswith(".csv") and LEDGER_NAME.fullmatch(entry[:-4]))
+        return [{"name": name, "resident": name in self._ledgers} for name in names]
+
+    async def add(self, name, payload):
+        """Validate expense objects and append them through the ledger's writer task."""
+        records = payload if isinstance(payload, list) else [payload]
+        if not records or len(records) > MAX_BATCH_ROWS:
+            raise HttpError(400, f"send between 1 and {MAX_BATCH_ROWS} expenses")
+        rows = []
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise HttpError(400, f"expense {index} is not an object")
+            record = {field: record.get(field) for field in FIELDS}
+            if not isinstance(record["Date"], str) or record["Amount"] is None or not validate_expense(record):
+                raise HttpError(400, f"expense {index} is invalid: needs a YYYY-MM-DD Date and a numeric Amount")
+            try:
+                amount = format_cents(parse_cents(record["Amount"]))
+            except ValueError:
+                raise HttpError(400, f"expense {index} has an invalid Amount")
+            rows.append((record["Date"], str(record["Expense Name"] or ""), str(record["Category"] or ""), amount))
+        ledger = self.ledger(name, create=True)
+        return {"ledger": name, "added": await ledger.append(rows)}
+
+    async def expenses(self, name, params):
+        """Return one page of matching expenses in date order."""
+        try:
+            offset = max(int(params.get("offset", 0)), 0)
+            limit = min(max(int(params.get("limit", 100)), 0), MAX_PAGE_ROWS)
+        except ValueError:
+            raise HttpError(400, "offset and limit must be integers")
+
+        def page(table):
+            result = self._query(table, params)
+            return {"ledger": name, "count": len(result), "offset": offset,
+                    "expenses": result[offset:offset + limit]}
+
+        return await self._read(name, page)
+
+    async def summary(self, name, params):
+        """Return grand, category and monthly totals (in cents and formatted) of the matching expenses."""
+        def totals(table):
+            result = self._query(table, params)
+            total = result.total_cents()
+            return {"ledger": name, "rows": len(result), "total_cents": total, "total": format_cents(total),
+                    "category_totals": result.category_totals(), "monthly_totals": result.monthly_totals()}
+
+        return await self._read(name, totals)
+
+    async def export(self, name, payload):
+        """Write the ledger to an Excel workbook in an export worker process."""
+        file_name = payload.get("file", f"{name}.xlsx") if isinstance(payload, dict) else None
+        if not isinstance(file_name, str) or not EXPORT_NAME.fullmatch(file_name):
+            raise HttpError(400, "file must be a plain .xlsx file name")
+        file_path = os.path.join(self.export_dir, file_name)
+        os.makedirs(self.export_dir, exist_ok=True)
+        # Snapshot under the loader lock; the worker gets its own copy
+        table = await self._read(name, lambda table: table.copy())
+        with timed("service_export"):
+            rows = await asyncio.get_running_loop().run_in_executor(self._export_pool, _export, table, file_path)
+        if rows != len(table):
+            raise HttpError(500, f"export of ledger {name} failed")
+        return {"ledger": name, "file": file_path, "rows": rows}
+
+    async def _read(self, name, func):
+        try:
+            return await self.ledger(name).read(func)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+
+    @staticmethod
+    def _query(table, params):
+        from expense_index import ExpenseIndex
+
+        categories = params["category"].split(",") if params.get("category") else None
+        return ExpenseIndex.for_table(table).query(params.get("start") or None, params.get("end") or None,
+                                                   categories, params.get("name") or None)
+
+    @staticmethod
+    def _allow(method, allowed):
+        if method != allowed:
+            raise HttpError(405, f"use {allowed}")
+
+    @staticmethod
+    def _json(body):
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise HttpError(400, "body is not valid JSON")
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload, keep_alive = 413, {"error": f"body over {MAX_BODY_BYTES} bytes"}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._respond(method, target, body)
+                writer.write(self._encode(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Disconnects and malformed request lines just end the connection
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method, target, body):
+        route = route_name(_split_path(urlsplit(target).path))
+        label = method if method in METHODS else "other"
+        with timed(f"service_{label.lower()}_{route}"):
+            try:
+                status, payload = await self.handle(method, target, body)
+            except HttpError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                logger.exception(f"Request {method} {target} failed: {e}")
+                status, payload = 500, {"error": str(e)}
+        count("service_requests", method=label, route=route, status=status)
+        return status, payload
+
+    @staticmethod
+    def _encode(status, payload, keep_alive):
+        if isinstance(payload, str):
+            content_type, body = "text/plain; version=0.0.4", payload.encode()
+        else:
+            content_type, body = "application/json", json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + body
+
+
+async def serve(root, host="127.0.0.1", port=8080, **options):
+    """
+    Run an ``ExpenseService`` until Ctrl+C or SIGTERM, then flush pending appends.
+
+    Args:
+        root (str): Directory holding the ``<name>.csv`` ledgers.
+        host (str): Interface to bind; keep the default to stay local.
+        port (int): TCP port.
+        **options: Passed to ``ExpenseService``.
+    """
+    service = ExpenseService(root, **options)
+    server = await service.start(host, port)
+    address = server.sockets[0].getsockname()
+    logger.info(f"Serving ledgers in {root} on http://{address[0]}:{address[1]}")
+    print(f"Serving ledgers in {root} on http://{address[0]}:{address[1]}", flush=True)
+    stopped = asyncio.Event()
+    if os.name != "nt":
+        # Let a plain `kill` shut down as cleanly as Ctrl+C
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+    try:
+        await stopped.wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve expense ledgers over a local HTTP/JSON API.")
+    parser.add_argument("--root", default="ledgers", help="directory of <name>.csv ledgers (default: ./ledgers)")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8080, help="TCP port (0 picks a free one)")
+    parser.add_argument("--max-ledgers", type=int, default=DEFAULT_MAX_LEDGERS, help="ledgers kept resident")
+    parser.add_argument("--io-workers", type=int, default=8, help="threads for file reads and appends")
+    parser.add_argument("--export-workers", type=int, default=2, help="processes for Excel exports")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.root, args.host, args.port, max_ledgers=args.max_ledgers,
+                          io_workers=args.io_workers, export_workers=args.export_workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    logging.basicConfig(filename='expense_service.log', level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    main()
@@ -0,0 +1,776 @@
+import bisect
+import csv
+import io
+import itertools
+import locale
+import os
+from array import array
+from datetime import date, datetime
+from journal import EditJournal
+from metrics import count, timed
+# parse_cents/format_cents live in the money core; re-exported here for existing importers
+from money import format_cents, group_totals, monthly_totals, parse_cents, sum_cents
+
+
+def _to_array(typecode, values):
+    column = array(typecode)
+    if getattr(values, "itemsize", None) == column.itemsize and hasattr(values, "tobytes"):
+        # Same-width buffers (array.array, numpy) are copied in one block
+        column.frombytes(values.tobytes())
+    else:
+        column.extend(values)
+    return column
+
+
+def parse_date(date_value):
+    """
+    Convert a ledger date to its day ordinal.
+
+    This is the rule every reader applies, so validators must use it too:
+    year, month and day separated by ``-``, as ``strptime("%Y-%m-%d")``
+    reads them. Month and day may omit their leading zero (``2024-1-5``),
+    as the original loader allowed; surrounding whitespace is rejected.
+
+    Args:
+        date_value (str): Date as written in the CSV.
+
+    Returns:
+        int: ``date.toordinal()`` of the date.
+
+    Raises:
+        ValueError: If the date is blank, not in that form or not a real day.
+    """
+    if not date_value or date_value.strip() == "":
+        raise ValueError("Missing date")
+    return datetime.strptime(date_value, "%Y-%m-%d").date().toordinal()
+
+
+class ExpenseTable:
+    """
+    Columnar, typed store for expense rows.
+
+    Dates are kept as day ordinals and amounts as integer cents in int64
+    arrays; names and categories are dictionary-encoded into int32 code
+    arrays. Iterating the table or indexing it yields the same
+    ``{"Date", "Expense Name", "Category", "Amount"}`` dictionaries that
+    ``expense.load_expenses`` returns, so existing consumers keep working.
+
+    ``row_ids`` holds each row's stable id (see ``journal.EditJournal``),
+    in ascending order, so ``find`` locates a row by id with a binary search.
+    ``base`` is the journal base those ids refer to, or None when the table
+    does not come from a single CSV; edits pass it back to the journal.
+    """
+
+    def __init__(self):
+        self.dates = array('q')
+        self.cents = array('q')
+        self.category_codes = array('i')
+        self.name_codes = array('i')
+        self.row_ids = array('q')
+        self.next_row_id = 0
+        self.base = None
+        # Bumped by in-place edits, so derived indexes know to rebuild; appends only grow the table
+        self.version = 0
+        self.categories = []
+        self.names = []
+        self.invalid_rows = 0
+        self._category_lookup = {}
+        self._name_lookup = {}
+        self._date_lookup = {}
+        self._date_text = {}
+
+    @classmethod
+    def from_columns(cls, dates, cents, category_codes, name_codes, categories, names, row_ids=None):
+        """
+        Build a table from already-encoded columns.
+
+        Args:
+            dates (buffer): Day ordinals, any integer buffer or sequence.
+            cents (buffer): Amounts in cents.
+            category_codes (buffer): Indices into ``categories``.
+            name_codes (buffer): Indices into ``names``.
+            categories (list): Category dictionary.
+            names (list): Name dictionary.
+            row_ids (buffer, optional): Row ids; defaults to row positions.
+
+        Returns:
+            ExpenseTable: The assembled table.
+        """
+        table = cls()
+        table.dates = _to_array('q', dates)
+        table.cents = _to_array('q', cents)
+        table.category_codes = _to_array('i', category_codes)
+        table.name_codes = _to_array('i', name_codes)
+        table.categories = list(categories)
+        table.names = list(names)
+        table.row_ids = _to_array('q', row_ids if row_ids is not None else range(len(table.cents)))
+        table.next_row_id = table.row_ids[-1] + 1 if table.row_ids else 0
+        table._category_lookup = {value: code for code, value in enumerate(table.categories)}
+        table._name_lookup = {value: code for code, value in enumerate(table.names)}
+        return table
+
+    @classmethod
+    @timed("load_table")
+    def from_csv(cls, file_path):
+        """
+        Build a table from an expense CSV file, skipping invalid rows.
+
+        Edits recorded in the file's journal are applied.
+
+        Args:
+            file_path (str): Path to the CSV file.
+
+        Returns:
+            ExpenseTable: The parsed expenses.
+        """
+        table = cls()
+        try:
+            with open(file_path, mode='r', newline='') as file:
+                # The journal must belong to the file that is open, not one that replaced it since
+                journal = EditJournal.load(file_path, os.fstat(file.fileno()).st_ino)
+                table.base = journal.base
+                table.extend_from_reader(csv.reader(file), changes=journal.changes)
+        except FileNotFoundError:
+            print(f"Error: The file {file_path} does not exist.")
+        if table.invalid_rows:
+            count("invalid_rows", table.invalid_rows, source="table")
+            print(f"Skipped {table.invalid_rows} invalid row(s) in {file_path}.")
+        return table
+
+    def extend_from_reader(self, reader, header=None, changes=None):
+        """
+        Append every valid row produced by a ``csv.reader``.
+
+        Each non-blank record takes the next row id, valid or not.
+
+        Args:
+            reader (iterator): Iterator of CSV rows as lists of strings.
+            header (list, optional): Column names. When omitted, the first row
+                read is used as the header.
+            changes (dict, optional): Journal edits, row id -> replacement
+                ``(date, name, category, amount)`` or None for a deleted row.
+
+        Returns:
+            list: The header that was used.
+        """
+        if header is None:
+            header = next(reader, None)
+            if header is None:
+                return None
+        try:
+            date_col = header.index("Date")
+            name_col = header.index("Expense Name")
+            category_col = header.index("Category")
+            amount_col = header.index("Amount")
+        except ValueError:
+            raise ValueError(f"Missing expense columns in header: {header}")
+
+        width = max(date_col, name_col, category_col, amount_col) + 1
+        for row in reader:
+            if not row:
+                continue
+            row_id = self.next_row_id
+            self.next_row_id += 1
+            if changes and row_id in changes:
+                replacement = changes[row_id]
+                if replacement is not None:
+                    try:
+                        self.append(*replacement, row_id=row_id)
+                    except ValueError:
+                        self.invalid_rows += 1
+                continue
+            if len(row) < width:
+                self.invalid_rows += 1
+                continue
+            try:
+                self.append(row[date_col], row[name_col], row[category_col], row[amount_col], row_id)
+            except ValueError:
+                self.invalid_rows += 1
+        return header
+
+    def append(self, date_value, name, category, amount, row_id=None):
+        """
+        Append one expense.
+
+        Args:
+            date_value (str): Date in YYYY-MM-DD format.
+            name (str): Name of the expense.
+            category (str): Category of the expense.
+            amount (str | float): Amount of the expense.
+            row_id (int, optional): Stable id of the row; defaults to the next one.
+
+        Raises:
+            ValueError: If the date or amount is invalid.
+        """
+        ordinal, cents = self._parse_values(date_value, amount)
+        if row_id is None:
+            row_id = self.next_row_id
+        self.next_row_id = max(self.next_row_id, row_id + 1)
+
+        self.dates.append(ordinal)
+        self.cents.append(cents)
+        self.category_codes.append(self._encode(category, self.categories, self._category_lookup))
+        self.name_codes.append(self._encode(name, self.names, self._name_lookup))
+        self.row_ids.append(row_id)
+
+    def _parse_values(self, date_value, amount):
+        ordinal = self._date_lookup.get(date_value)
+        if ordinal is None:
+            ordinal = parse_date(date_value)
+            self._date_lookup[date_value] = ordinal
+        return ordinal, parse_cents(amount)
+
+    def find(self, row_id):
+        """
+        Return the position of the row with id ``row_id``.
+
+        Raises:
+            KeyError: If no row has that id.
+        """
+        index = bisect.bisect_left(self.row_ids, row_id)
+        if index == len(self.row_ids) or self.row_ids[index] != row_id:
+            raise KeyError(row_id)
+        return index
+
+    def replace_row(self, index, date_value, name, category, amount):
+        """
+        Overwrite the values of the row at ``index`` in place, keeping its id.
+
+        Raises:
+            ValueError: If the date or amount is invalid.
+        """
+        self.dates[index], self.cents[index] = self._parse_values(date_value, amount)
+        self.version += 1
+        self.category_codes[index] = self._encode(category, self.categories, self._category_lookup)
+        self.name_codes[index] = self._encode(name, self.names, self._name_lookup)
+
+    def copy(self):
+        """Return an independent copy of the table (columns are copied block-wise)."""
+        table = ExpenseTable.from_columns(self.dates, self.cents, self.category_codes, self.name_codes,
+                                          self.categories, self.names, self.row_ids)
+        table.next_row_id = self.next_row_id
+        table.invalid_rows = self.invalid_rows
+        table.base = self.base
+        return table
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the columns and the name/category dictionaries."""
+        columns = (self.dates, self.cents, self.category_codes, self.name_codes, self.row_ids)
+        return (sum(len(column) * column.itemsize for column in columns)
+                + sum(len(value) + 64 for value in self.names) + sum(len(value) + 64 for value in self.categories))
+
+    def remove_row(self, index):
+        """Delete the row at ``index``."""
+        for column in (self.dates, self.cents, self.category_codes, self.name_codes, self.row_ids):
+            del column[index]
+        self.version += 1
+
+    def extend_table(self, other):
+        """
+        Append every row of another table, re-encoding its dictionaries.
+
+        The appended rows get fresh ids following this table's.
+
+        Args:
+            other (ExpenseTable): Rows to append, in order.
+        """
+        category_map = [self._encode(value, self.categories, self._category_lookup) for value in other.categories]
+        name_map = [self._encode(value, self.names, self._name_lookup) for value in other.names]
+        self.dates.extend(other.dates)
+        self.cents.extend(other.cents)
+        self.category_codes.extend(array('i', map(category_map.__getitem__, other.category_codes)))
+        self.name_codes.extend(array('i', map(name_map.__getitem__, other.name_codes)))
+        self.row_ids.extend(range(self.next_row_id, self.next_row_id + len(other)))
+        self.next_row_id += len(other)
+        self.invalid_rows += other.invalid_rows
+
+    @staticmethod
+    def _encode(value, values, lookup):
+        code = lookup.get(value)
+        if code is None:
+            code = len(values)
+            values.append(value)
+            lookup[value] = code
+        return code
+
+    def date_text(self, index):
+        """Return the date of row ``index`` as a YYYY-MM-DD string."""
+        ordinal = self.dates[index]
+        text = self._date_text.get(ordinal)
+        if text is None:
+            text = date.fromordinal(ordinal).isoformat()
+            self._date_text[ordinal] = text
+        return text
+
+    def row(self, index):
+        """
+        Materialize one row as an expense dictionary.
+
+        Args:
+            index (int): Row position (negative indices are allowed).
+
+        Returns:
+            dict: Expense with Date, Expense Name, Category and Amount strings.
+        """
+        return {
+            "Date": self.date_text(index),
+            "Expense Name": self.names[self.name_codes[index]],
+            "Category": self.categories[self.category_codes[index]],
+            "Amount": format_cents(self.cents[index]),
+        }
+
+    def __len__(self):
+        return len(self.cents)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ExpenseTable index out of range")
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def _numpy_columns(self):
+        import numpy as np
+        return (np.frombuffer(self.dates, dtype=np.int64), np.frombuffer(self.cents, dtype=np.int64),
+                np.frombuffer(self.category_codes, dtype=np.int32))
+
+    def total_cents(self):
+        """Return the exact sum of all amounts in cents."""
+        if not self.cents:
+            return 0
+        return sum_cents(self._numpy_columns()[1])
+
+    def category_totals(self):
+        """
+        Sum amounts per category, exactly and without a Python-level loop.
+
+        Returns:
+            dict: Category name -> total in cents, in first-seen order.
+        """
+        if not self.cents:
+            return dict.fromkeys(self.categories, 0)
+        _, cents, codes = self._numpy_columns()
+        totals = group_totals(codes, cents, len(self.categories))
+        return dict(zip(self.categories, map(int, totals)))
+
+    def monthly_totals(self):
+        """
+        Sum amounts per calendar month.
+
+        Returns:
+            dict: "YYYY-MM" -> total in cents, sorted by month.
+        """
+        if not self.cents:
+            return {}
+        dates, cents, _ = self._numpy_columns()
+        return monthly_totals(dates, cents)
+
+    def to_records(self):
+        """Return all rows as a list of expense dictionaries."""
+        return list(self)
+
+
+class TableSnapshot:
+    """
+    Read-only view of the first ``length`` rows of an append-only table.
+
+    The view shares its columns with the table instead of copying them.
+    The table may keep growing, but rows below ``length`` must never change,
+    so the view reads the same rows for as long as it is held. See
+    ``IncrementalExpenseLoader.snapshot``.
+
+    Row access, iteration and ``find`` behave as they do on an ExpenseTable.
+    ``row_ids`` is the shared column, valid for positions below ``len(view)``.
+    """
+
+    def __init__(self, table, length=None):
+        self._table = table
+        self._length = len(table) if length is None else length
+        self.row_ids = table.row_ids
+        self.base = table.base
+        self.invalid_rows = table.invalid_rows
+
+    def find(self, row_id):
+        """
+        Return the position of the row with id ``row_id``.
+
+        Raises:
+            KeyError: If no row of the view has that id.
+        """
+        index = bisect.bisect_left(self.row_ids, row_id, 0, self._length)
+        if index == self._length or self.row_ids[index] != row_id:
+            raise KeyError(row_id)
+        return index
+
+    def row(self, index):
+        """Materialize one row as an expense dictionary (see ``ExpenseTable.row``)."""
+        return self[index]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._table.row(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("TableSnapshot index out of range")
+        return self._table.row(index)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self._table.row(index)
+
+    def __bool__(self):
+        return self._length > 0
+
+    def to_records(self):
+        """Return all rows as a list of expense dictionaries."""
+        return list(self)
+
+
+DEFAULT_CHUNK_ROWS = 65_536
+# Rough upper bound for one row held in an ExpenseTable chunk: four array
+# slots plus its share of the name dictionary and csv.reader temporaries
+ESTIMATED_ROW_BYTES = 256
+
+
+def iter_expense_chunks(file_path, chunk_rows=DEFAULT_CHUNK_ROWS, max_memory_bytes=None):
+    """
+    Stream an expense CSV as a sequence of bounded ExpenseTable batches.
+
+    Only one batch is alive at a time, so the whole ledger is never held in
+    memory. Invalid rows are skipped and counted in each batch's
+    ``invalid_rows``. Edits recorded in the file's journal are applied.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunk_rows (int): Maximum rows per batch.
+        max_memory_bytes (int, optional): Memory ceiling per batch; lowers
+            ``chunk_rows`` so that a batch stays under it.
+
+    Yields:
+        ExpenseTable: The next batch of expenses.
+    """
+    if max_memory_bytes is not None:
+        chunk_rows = max(1, min(chunk_rows, max_memory_bytes // ESTIMATED_ROW_BYTES))
+
+    try:
+        file = open(file_path, mode='r', newline='')
+    except FileNotFoundError:
+        print(f"Error: The file {file_path} does not exist.")
+        return
+
+    with file:
+        journal = EditJournal.load(file_path, os.fstat(file.fileno()).st_ino)
+        for chunk in iter_reader_chunks(file, chunk_rows, journal.changes):
+            chunk.base = journal.base
+            yield chunk
+
+
+def iter_reader_chunks(file, chunk_rows=DEFAULT_CHUNK_ROWS, changes=None):
+    """
+    Stream an already open expense CSV (e.g. ``sys.stdin``) as ExpenseTable batches.
+
+    Args:
+        file (file object): Text stream positioned at the header row.
+        chunk_rows (int): Maximum rows per batch.
+        changes (dict, optional): Journal edits to apply, as for
+            ``ExpenseTable.extend_from_reader``.
+
+    Yields:
+        ExpenseTable: The next batch of expenses; row ids continue across batches.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    next_row_id = 0
+    while True:
+        batch = itertools.islice(reader, chunk_rows)
+        first = next(batch, None)
+        if first is None:
+            return
+        chunk = ExpenseTable()
+        chunk.next_row_id = next_row_id
+        chunk.extend_from_reader(itertools.chain([first], batch), header, changes)
+        next_row_id = chunk.next_row_id
+        yield chunk
+
+
+def iter_expense_rows(file_path, chunk_rows=DEFAULT_CHUNK_ROWS, max_memory_bytes=None):
+    """
+    Stream expense dictionaries from a CSV file in bounded memory.
+
+    Suitable as the ``expenses`` argument of ``export_expenses_to_excel``.
+
+    Yields:
+        dict: Expense with Date, Expense Name, Category and Amount strings.
+    """
+    for chunk in iter_expense_chunks(file_path, chunk_rows, max_memory_bytes):
+        yield from chunk
+
+
+@timed("aggregate")
+def summarize_chunks(chunks):
+    """
+    Aggregate totals over a stream of ExpenseTable batches.
+
+    Args:
+        chunks (iterable of ExpenseTable): Batches, e.g. from ``iter_expense_chunks``.
+
+    Returns:
+        dict: ``rows``, ``invalid_rows``, ``total_cents`` and per-category /
+        per-month totals in cents (``category_totals``, ``monthly_totals``).
+    """
+    summary = {"rows": 0, "invalid_rows": 0, "total_cents": 0,
+               "category_totals": {}, "monthly_totals": {}}
+    for chunk in chunks:
+        summary["rows"] += len(chunk)
+        summary["invalid_rows"] += chunk.invalid_rows
+        summary["total_cents"] += chunk.total_cents()
+        for key, totals in (("category_totals", chunk.category_totals()),
+                            ("monthly_totals", chunk.monthly_totals())):
+            merged = summary[key]
+            for name, cents in totals.items():
+                merged[name] = merged.get(name, 0) + cents
+    summary["monthly_totals"] = dict(sorted(summary["monthly_totals"].items()))
+    if summary["invalid_rows"]:
+        count("invalid_rows", summary["invalid_rows"], source="table")
+    return summary
+
+
+class IncrementalExpenseLoader:
+    """
+    Keep an ExpenseTable in sync with a CSV file by tailing appended bytes.
+
+    The loader remembers how far into the file it has parsed, together with
+    the file's size, mtime and a short signature of the bytes around that
+    point. When the file has only grown, just the new bytes are parsed; a
+    truncation or rewrite (e.g. ``DataFrame.to_csv``) triggers a full reload.
+
+    The edit journal is tailed the same way: new amendments and tombstones
+    are applied to the table in place by row id.
+    """
+
+    SIGNATURE_BYTES = 64
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.table = ExpenseTable()
+        self.last_refresh = None
+        self.appended_from = 0
+        self._header = None
+        self._offset = 0
+        self._size = -1
+        self._mtime_ns = None
+        self._inode = None
+        self._head_signature = b""
+        self._tail_signature = b""
+        self._encoding = locale.getpreferredencoding(False)
+        self._journal = EditJournal(file_path)
+        self._stamp = None
+        # Append-only copy of the table that snapshots share, and the table version it matches
+        self._mirror = None
+        self._mirror_version = None
+
+    @timed("refresh_table")
+    def refresh(self):
+        """
+        Bring the table up to date with the file on disk.
+
+        After the call, ``last_refresh`` is ``"unchanged"``, ``"append"``,
+        ``"edit"`` (journal entries applied in place) or ``"reload"``; for
+        appends, rows from ``appended_from`` onwards are new.
+
+        Returns:
+            ExpenseTable: The up-to-date table.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            print(f"Error: The file {self.file_path} does not exist.")
+            self._reset()
+            self.last_refresh = "reload"
+            return self.table
+
+        if stat.st_size == self._size and stat.st_mtime_ns == self._mtime_ns:
+            self.appended_from = len(self.table)
+            entries = self._journal.read_new()
+            if entries is None:
+                return self.reload()
+            self.last_refresh = "edit" if entries else "unchanged"
+            self._apply_edits(entries)
+            return self.table
+
+        with open(self.file_path, mode='rb') as file:
+            entries = self._journal.read_new() if self._can_tail(file, stat) else None
+            if entries is not None:
+                # Edits to rows parsed earlier are applied in place; the new rows pick them up while parsing
+                self._apply_edits(entries)
+                self.appended_from = len(self.table)
+                file.seek(self._offset)
+                data = file.read(stat.st_size - self._offset)
+                # Leave a partially written last line for the next refresh
+                data = data[:data.rfind(b"\n") + 1]
+                self.last_refresh = "append"
+            else:
+                from ledger_cache import fingerprint
+
+                self._reset()
+                # Taken before anything is read, so the cache never pairs a table with a newer file version
+                self._stamp = fingerprint(self.file_path)
+                self._journal = EditJournal.load(self.file_path, os.fstat(file.fileno()).st_ino)
+                self.last_refresh = "reload"
+                if self._load_cached(file, stat):
+                    self.table.base = self._journal.base
+                    self._remember(file, stat)
+                    return self.table
+                self.table.base = self._journal.base
+                # The tail and cache checks may have moved the file position
+                file.seek(0)
+                data = file.read()
+            self._parse(data)
+            self._offset += len(data)
+            self._remember(file, stat)
+        if self.last_refresh == "reload" and self._offset == stat.st_size:
+            from ledger_cache import cache
+            cache.save(self.file_path, self._stamp, self.table)
+        return self.table
+
+    def _load_cached(self, file, stat):
+        # A full reload starts from the ledger cache when it holds this exact file version
+        from ledger_cache import cache, fingerprint
+
+        stamp = self._stamp
+        if stamp is None or stamp[:2] != (stat.st_size, stat.st_mtime_ns) or fingerprint(self.file_path) != stamp:
+            return False
+        if not stat.st_size:
+            return False
+        # The loader's offset always ends on a line break
+        file.seek(stat.st_size - 1)
+        if file.read(1) != b"\n":
+            return False
+        table = cache.lookup(self.file_path, stamp)
+        if table is None:
+            return False
+        file.seek(0)
+        self._header = next(csv.reader([file.readline().decode(self._encoding)]))
+        self.table = table.copy()
+        self._offset = stat.st_size
+        return True
+
+    def _apply_edits(self, entries):
+        table = self.table
+        for row_id, row in entries:
+            try:
+                index = table.find(row_id)
+            except KeyError:
+                continue
+            if row is None:
+                table.remove_row(index)
+                continue
+            try:
+                table.replace_row(index, *row)
+            except ValueError:
+                table.remove_row(index)
+                table.invalid_rows += 1
+
+    def snapshot(self):
+        """
+        Return a read-only view of the table as it is now.
+
+        The view stays the same while the loader keeps refreshing, so another
+        thread can read it without holding the lock that guards the loader.
+        Views share an append-only copy of the table. After an append only the
+        new rows are copied into it. After an in-place edit or a reload, the
+        copy starts over, and views already handed out keep the old copy.
+
+        Returns:
+            TableSnapshot: The table's rows, ids and base as of this call.
+        """
+        table, mirror = self.table, self._mirror
+        if mirror is not None and table.version == self._mirror_version and len(mirror) <= len(table):
+            start = len(mirror)
+            try:
+                # The dictionaries only grow, so the codes of the new rows carry over unchanged
+                mirror.categories.extend(table.categories[len(mirror.categories):])
+                mirror.names.extend(table.names[len(mirror.names):])
+                for column in ("dates", "cents", "category_codes", "name_codes", "row_ids"):
+                    getattr(mirror, column).extend(getattr(table, column)[start:])
+            except BufferError:
+                # A reader holds a buffer (e.g. a numpy view) of the copy, so it cannot grow
+                mirror = None
+            else:
+                mirror.next_row_id = table.next_row_id
+                mirror.invalid_rows = table.invalid_rows
+        else:
+            mirror = None
+        if mirror is None:
+            mirror = self._mirror = table.copy()
+            self._mirror_version = table.version
+        return TableSnapshot(mirror)
+
+    def reload(self):
+        """
+        Discard the parsed state and re-read the whole file.
+
+        Returns:
+            ExpenseTable: The freshly loaded table.
+        """
+        self._size = -1
+        self._offset = 0
+        return self.refresh()
+
+    def _reset(self):
+        self.table = ExpenseTable()
+        self._mirror = None
+        self.appended_from = 0
+        self._header = None
+        self._offset = 0
+        self._size = -1
+        self._mtime_ns = None
+
+    def _can_tail(self, file, stat):
+        if self._offset == 0 or self._header is None:
+            return False
+        if stat.st_ino != self._inode or stat.st_size <= self._offset:
+            return False
+        file.seek(0)
+        if file.read(len(self._head_signature)) != self._head_signature:
+            return False
+        start = self._offset - len(self._tail_signature)
+        file.seek(start)
+        return file.read(self._offset - start) == self._tail_signature
+
+    def _remember(self, file, stat):
+        file.seek(0)
+        self._head_signature = file.read(min(self.SIGNATURE_BYTES, self._offset))
+        start = max(0, self._offset - self.SIGNATURE_BYTES)
+        file.seek(start)
+        self._tail_signature = file.read(self._offset - start)
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        self._inode = stat.st_ino
+
+    def _parse(self, data):
+        if not data:
+            return
+        reader = csv.reader(io.StringIO(data.decode(self._encoding), newline=''))
+        before = self.table.invalid_rows
+        self._header = self.table.extend_from_reader(reader, self._header, self._journal.changes)
+        skipped = self.table.invalid_rows - before
+        if skipped:
+            count("invalid_rows", skipped, source="table")
+            print(f"Skipped {skipped} invalid row(s) in {self.file_path}.")
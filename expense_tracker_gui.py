@@ -1,11 +1,17 @@
+import logging
+import threading
+from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, messagebox
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-import numpy as np 
-import pandas as pd
-from excel_exporter import export_expenses_to_excel
-from expense import load_expenses, add_expense
+from expense import CATEGORIES, add_expense, query
+from expense_table import IncrementalExpenseLoader
+from journal import EditJournal, StaleRowError
+from metrics import timed
+from money import format_cents, format_money, parse_cents, to_units
+from rollup import ExpenseRollup
+from storage import SqliteBackend, get_backend
+from virtual_tree import VirtualTreeview
+from task_runner import TaskExecutor
 
 class ExpenseTrackerApp:
     def __init__(self, root):
@@ -15,27 +21,44 @@ class ExpenseTrackerApp:
         self.root.state('zoomed')  # Full screen
 
         self.expenseFilePath = "expense.csv"
-        self.expenses = []
-        self.budget = 2000
-        self.budget_var = tk.DoubleVar(value=self.budget)
+        self.expense_loader = IncrementalExpenseLoader(self.expenseFilePath)
+        # The UI only ever holds snapshots; the loader's table is refreshed in place on workers
+        self.expenses = self.expense_loader.snapshot()
+        self.rollup = ExpenseRollup(self.expenseFilePath)
+        # SQLite ledgers (.db/.sqlite) support single-row edits keyed by row id
+        storage = get_backend(self.expenseFilePath)
+        self.sql_store = storage if isinstance(storage, SqliteBackend) else None
+
+        # Ledger I/O, aggregation and export run on worker threads; the lock
+        # serializes access to the loader, rollup sidecar and SQLite store
+        self.tasks = TaskExecutor(self.root)
+        self.ledger_lock = threading.Lock()
+        self.status_var = tk.StringVar(value="")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Money is kept in integer cents; floats only feed the progress bar
+        self.budget_cents = parse_cents(2000)
+        self.budget_var = tk.StringVar(value=format_cents(self.budget_cents))
 
 
         self.category_var = tk.StringVar()
         self.total_spent_var = tk.StringVar(value="Total Spent: $0.00")
         self.remaining_budget_var = tk.StringVar(value="Remaining Budget: $0.00")
 
-        self.category_options = ["Food", "Rent", "Utilities", "Transportation", "Entertainment", "Other"]
+        self.category_options = CATEGORIES
+        # Active filter as query() keyword arguments, or None to show everything
+        self.filters = None
+        self.filtered = None
 
         # Initialize GUI components
         self.create_widgets()
         self.load_expenses()
-        self.update_summary()
 
     def create_widgets(self):
         self.create_entry_frame()
         self.create_summary_frame()
         self.create_chart_frame()
         self.create_expense_table()
+        self.create_filter_frame()
         self.create_export_button()
 
     def create_entry_frame(self):
@@ -67,25 +90,31 @@ class ExpenseTrackerApp:
             return
 
         try:
-            amount = float(amount)
+            cents = parse_cents(amount)
         except ValueError:
             messagebox.showerror("Input Error", "Please enter a valid numeric amount.")
             return
 
-        if amount <= 0:
+        if cents <= 0:
             messagebox.showerror("Input Error", "Amount should be greater than zero.")
             return
 
-        self.add_expense_to_file(name, category, amount)
-        self.load_expenses()
-        self.update_summary()
-        self.update_charts()
+        self.add_expense_to_file(name, category, format_cents(cents))
 
     def add_expense_to_file(self, name, category, amount):
         from datetime import datetime
         date = datetime.now().strftime("%Y-%m-%d")
-        add_expense(self.expenseFilePath, date, name, category, amount)
-        messagebox.showinfo("Success", f"Added {name} to expenses.")
+
+        def write():
+            with self.ledger_lock:
+                add_expense(self.expenseFilePath, date, name, category, amount)
+
+        def added(_):
+            # Several quick adds coalesce into a single refresh
+            self.load_expenses()
+            messagebox.showinfo("Success", f"Added {name} to expenses.")
+
+        self.tasks.submit(write, on_done=added, on_error=self.show_task_error)
 
     def create_summary_frame(self):
         summary_frame = ttk.LabelFrame(self.root, text="Summary", padding=(10, 10))
@@ -99,7 +128,8 @@ class ExpenseTrackerApp:
         self.budget_entry = ttk.Entry(summary_frame, textvariable=self.budget_var, width=20)
         self.budget_entry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
 
-        self.progress = ttk.Progressbar(summary_frame, length=200, maximum=self.budget, mode='determinate')
+        self.progress = ttk.Progressbar(summary_frame, length=200, maximum=to_units(self.budget_cents),
+                                        mode='determinate')
         self.progress.grid(row=3, column=0, columnspan=2, padx=5, pady=10)
         self.update_progress_bar()
 
@@ -109,48 +139,119 @@ class ExpenseTrackerApp:
 
     def update_budget(self):
         try:
-            self.budget = float(self.budget_var.get())
-            self.progress.config(maximum=self.budget)
+            self.budget_cents = parse_cents(self.budget_var.get())
+            self.progress.config(maximum=to_units(self.budget_cents))
             self.update_summary()
         except ValueError:
             messagebox.showerror("Input Error", "Please enter a valid numeric budget.")
 
     def create_chart_frame(self):
         # Frame for the Pie Chart
-        pie_chart_frame = ttk.LabelFrame(self.root, text="Expenses by Category", padding=(10, 10))
-        pie_chart_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
+        self.pie_chart_frame = ttk.LabelFrame(self.root, text="Expenses by Category", padding=(10, 10))
+        self.pie_chart_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
+
+        # Frame for the Bar Chart
+        self.bar_chart_frame = ttk.LabelFrame(self.root, text="Expenses by Month", padding=(10, 10))
+        self.bar_chart_frame.grid(row=1, column=1, padx=10, pady=10, sticky="nsew")
+
+        # matplotlib is the slowest import by far; show the window first and build the charts once idle
+        self.charts = None
+        self.root.after_idle(self.build_charts)
+
+    def build_charts(self):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        import matplotlib.pyplot as plt
+        from chart_engine import ExpenseCharts
 
         self.fig_pie, self.ax_pie = plt.subplots(figsize=(6, 5))
-        self.canvas_pie = FigureCanvasTkAgg(self.fig_pie, master=pie_chart_frame)
+        self.canvas_pie = FigureCanvasTkAgg(self.fig_pie, master=self.pie_chart_frame)
         self.canvas_pie.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-        # Frame for the Bar Chart
-        bar_chart_frame = ttk.LabelFrame(self.root, text="Expenses by Month", padding=(10, 10))
-        bar_chart_frame.grid(row=1, column=1, padx=10, pady=10, sticky="nsew")
-
         self.fig_bar, self.ax_bar = plt.subplots(figsize=(6, 5))
-        self.canvas_bar = FigureCanvasTkAgg(self.fig_bar, master=bar_chart_frame)
+        self.canvas_bar = FigureCanvasTkAgg(self.fig_bar, master=self.bar_chart_frame)
         self.canvas_bar.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+        self.charts = ExpenseCharts(self.ax_pie, self.ax_bar, self.canvas_pie, self.canvas_bar, self.root.after)
         self.update_charts()
 
     def create_expense_table(self):
         table_frame = ttk.LabelFrame(self.root, text="Recorded Expenses", padding=(10, 10))
         table_frame.grid(row=1, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
 
-        self.tree = ttk.Treeview(table_frame, columns=("Date", "Name", "Category", "Amount"), show="headings")
+        # Only the visible window of rows is materialized in the Treeview
+        self.table_view = VirtualTreeview(table_frame, columns=("Date", "Name", "Category", "Amount"))
+        self.tree = self.table_view.tree
         self.tree.heading("Date", text="Date")
         self.tree.heading("Name", text="Name")
         self.tree.heading("Category", text="Category")
         self.tree.heading("Amount", text="Amount")
 
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.table_view.pack(fill=tk.BOTH, expand=True)
         self.tree.update_idletasks()  # Force UI update
 
+    def create_filter_frame(self):
+        filter_frame = ttk.LabelFrame(self.root, text="Filter Expenses", padding=(10, 10))
+        filter_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
+
+        ttk.Label(filter_frame, text="From (YYYY-MM-DD):").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.filter_start_entry = ttk.Entry(filter_frame, width=12)
+        self.filter_start_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+
+        ttk.Label(filter_frame, text="To:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        self.filter_end_entry = ttk.Entry(filter_frame, width=12)
+        self.filter_end_entry.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
+
+        ttk.Label(filter_frame, text="Category:").grid(row=0, column=4, padx=5, pady=5, sticky="w")
+        self.filter_category_var = tk.StringVar(value="All")
+        filter_category_menu = ttk.OptionMenu(filter_frame, self.filter_category_var, "All", "All", *self.category_options)
+        filter_category_menu.grid(row=0, column=5, padx=5, pady=5, sticky="ew")
+
+        ttk.Label(filter_frame, text="Name contains:").grid(row=0, column=6, padx=5, pady=5, sticky="w")
+        self.filter_name_entry = ttk.Entry(filter_frame, width=20)
+        self.filter_name_entry.grid(row=0, column=7, padx=5, pady=5, sticky="ew")
+
+        ttk.Button(filter_frame, text="Apply", command=self.apply_filter).grid(row=0, column=8, padx=5, pady=5)
+        ttk.Button(filter_frame, text="Clear", command=self.clear_filter).grid(row=0, column=9, padx=5, pady=5)
+
+        self.filter_summary_var = tk.StringVar(value="")
+        ttk.Label(filter_frame, textvariable=self.filter_summary_var).grid(row=1, column=0, columnspan=10, padx=5, pady=5, sticky="w")
+
+    def apply_filter(self):
+        start = self.filter_start_entry.get().strip() or None
+        end = self.filter_end_entry.get().strip() or None
+        for value in (start, end):
+            if value is None:
+                continue
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                messagebox.showerror("Input Error", "Dates must be in YYYY-MM-DD format.")
+                return
+        category = self.filter_category_var.get()
+        filters = {
+            "start": start,
+            "end": end,
+            "categories": None if category == "All" else [category],
+            "name_contains": self.filter_name_entry.get().strip() or None,
+        }
+        self.filters = filters if any(value is not None for value in filters.values()) else None
+        self.load_expenses()
+
+    def clear_filter(self):
+        for entry in (self.filter_start_entry, self.filter_end_entry, self.filter_name_entry):
+            entry.delete(0, tk.END)
+        self.filter_category_var.set("All")
+        self.filters = None
+        self.load_expenses()
+
     def on_item_selected(self, event):
         selected_item = self.tree.selection()[0]
         item_data = self.tree.item(selected_item, "values")
 
+        # Treeview iids are row ids: SQLite rowids, or journal row ids for CSV ledgers
+        old_expense = None if self.sql_store else self.expenses[self.expenses.find(int(selected_item))]
+        # The ids and values shown belong to this version of the ledger; the journal checks it
+        base = None if self.sql_store else self.expenses.base
         name = item_data[1]
         amount = item_data[3]
         category = item_data[2]
@@ -182,41 +283,42 @@ class ExpenseTrackerApp:
                 messagebox.showerror("Input Error", "Expense name and amount are required.")
                 return
             try:
-                new_amount = float(new_amount)
+                new_cents = parse_cents(new_amount)
             except ValueError:
                 messagebox.showerror("Input Error", "Please enter a valid numeric amount.")
                 return
 
-            if new_amount <= 0:
+            if new_cents <= 0:
                 messagebox.showerror("Input Error", "Amount should be greater than zero.")
                 return
+            new_amount = format_cents(new_cents)
              # Update the treeview with the new data
             self.tree.item(selected_item, values=(item_data[0], new_name, new_category, new_amount))
 
-            # Reflect changes in the CSV file
-            df = pd.DataFrame(self.expenses)
-            df.loc[df.index[int(selected_item)], ["Expense Name", "Category", "Amount"]] = [new_name, new_category, new_amount]
-            df.to_csv(self.expenseFilePath, index=False)
-
-            self.load_expenses()
-            self.update_summary()
-            self.update_charts()
+            def rewrite():
+                with self.ledger_lock:
+                    if self.sql_store:
+                        self.sql_store.update(int(selected_item), new_name, new_category, new_amount)
+                        return
+                    # One journal line instead of rewriting the CSV
+                    new_expense = {"Date": item_data[0], "Expense Name": new_name, "Category": new_category, "Amount": new_amount}
+                    self.record_edit(int(selected_item), old_expense, new_expense, base)
 
+            self.tasks.submit(rewrite, on_done=lambda _: self.load_expenses(), on_error=self.show_edit_error)
             edit_window.destroy()
 
         def delete_expense():
             # Remove from Treeview
             self.tree.delete(selected_item)
 
-            # Reflect changes in the CSV file
-            df = pd.DataFrame(self.expenses)
-            df = df.drop(df.index[int(selected_item)])
-            df.to_csv(self.expenseFilePath, index=False)
-
-            self.load_expenses()
-            self.update_summary()
-            self.update_charts()
+            def rewrite():
+                with self.ledger_lock:
+                    if self.sql_store:
+                        self.sql_store.delete(int(selected_item))
+                        return
+                    self.record_edit(int(selected_item), old_expense, None, base)
 
+            self.tasks.submit(rewrite, on_done=lambda _: self.load_expenses(), on_error=self.show_edit_error)
             edit_window.destroy()
 
         save_button = ttk.Button(edit_window, text="Save Changes", command=save_changes)
@@ -225,79 +327,152 @@ class ExpenseTrackerApp:
         delete_button = ttk.Button(edit_window, text="Delete Expense", command=delete_expense)
         delete_button.grid(row=3, column=1, padx=5, pady=10, sticky="ew")
 
+    def record_edit(self, row_id, old_expense, new_expense, base):
+        # Runs on a worker thread with the ledger lock held. The journal also keeps the
+        # rollup sidecar in step; once it grows long enough it is folded back into the CSV.
+        journal = EditJournal(self.expenseFilePath)
+        if new_expense is None:
+            journal.delete(row_id, old_expense, base)
+        else:
+            journal.amend(row_id, old_expense, new_expense, base)
+        if journal.should_compact():
+            journal.compact()
+
     def update_charts(self):
-        if not self.expenses:
+        # Totals come from the maintained rollup, or the filter's aggregates; the chart
+        # engine updates its artists in place
+        if self.charts is None:
             return
+        totals = self.filtered[1] if self.filtered else self.rollup
+        self.charts.update(totals.category_totals, totals.monthly_totals)
+
+    def load_expenses(self, reload=False):
+        # Coalesced: when several refreshes queue up, only the newest one is applied
+        self.tasks.submit(self.read_ledger, reload, self.filters, key="refresh",
+                          on_done=self.apply_ledger, on_error=self.show_task_error)
+
+    def read_ledger(self, reload=False, filters=None):
+        # Runs on a worker thread
+        with self.ledger_lock:
+            if self.sql_store:
+                filtered = self.filter_view(self.sql_store.query(**filters)) if filters else None
+                return self.sql_store.rows(), self.sql_store.summary(), filtered
+            # Only newly appended rows are parsed; rewrites fall back to a full reload
+            if reload:
+                table = self.expense_loader.reload()
+            else:
+                table = self.expense_loader.refresh()
+            filtered = None
+            if filters:
+                # Served from the table's date/category index; aggregates come from its prefix sums
+                matches = query(table, **filters)
+                totals = ExpenseRollup(self.expenseFilePath)
+                totals.rows = len(matches)
+                totals.total_cents = matches.total_cents()
+                totals.category_totals = matches.category_totals()
+                totals.monthly_totals = matches.monthly_totals()
+                # Positions are materialized now: the lazy result follows the live index
+                filtered = (matches.positions, totals)
+            # The loader grows this table in place on the next refresh, so the tree's fetch
+            # callbacks and exports get a snapshot taken while the lock is held; after an
+            # append only the new rows are copied into it
+            return self.expense_loader.snapshot(), ExpenseRollup.load(self.expenseFilePath), filtered
+
+    def filter_view(self, rows):
+        totals = ExpenseRollup(self.expenseFilePath)
+        for _, expense in rows:
+            totals.add(expense["Date"], expense["Category"], expense["Amount"])
+        return rows, totals
+
+    @timed("render_table")
+    def apply_ledger(self, result):
+        data, self.rollup, self.filtered = result
+        if self.sql_store:
+            self.expenses = [expense for _, expense in data]
+            rows = self.filtered[0] if self.filtered else data
+
+            def fetch(index):
+                row_id, expense = rows[index]
+                return row_id, (expense["Date"], expense["Expense Name"], expense["Category"], expense["Amount"])
+        elif self.filtered:
+            # Positions of the matches in the snapshot, in date order
+            self.expenses = table = data
+            rows = self.filtered[0]
+
+            def fetch(index):
+                position = int(rows[index])
+                expense = table[position]
+                return table.row_ids[position], (expense["Date"], expense["Expense Name"], expense["Category"], expense["Amount"])
+        else:
+            # The table view pulls only the rows it shows, by position, from the snapshot
+            self.expenses = rows = table = data
+
+            def fetch(index):
+                expense = table[index]
+                return table.row_ids[index], (expense["Date"], expense["Expense Name"], expense["Category"], expense["Amount"])
+
+        if self.filtered:
+            totals = self.filtered[1]
+            self.filter_summary_var.set(f"Showing {totals.rows:,} of {len(self.expenses):,} expenses, "
+                                        f"total {format_money(totals.total_cents)}")
+        else:
+            self.filter_summary_var.set("")
+        self.table_view.set_source(len(rows), fetch)
+        self.update_summary()
+        self.update_charts()
 
-        # Clear previous figures
-        self.ax_pie.clear()
-        self.ax_bar.clear()
-
-        df = pd.DataFrame(self.expenses)
-        
-        # Convert Amount column to numeric, forcing errors to NaN and then dropping them
-        df["Amount"] = pd.to_numeric(df["Amount"], errors="coerce")
-        
-        # Drop any rows where Amount could not be converted to a float
-        df = df.dropna(subset=["Amount"])
-
-        # Convert Date to datetime format for easier manipulation
-        df["Date"] = pd.to_datetime(df["Date"])
-
-        # Group by category and sum the amounts for the pie chart
-        category_totals = df.groupby("Category")["Amount"].sum()
-
-        # Plot the pie chart
-        self.ax_pie.pie(category_totals, labels=category_totals.index, autopct='%1.1f%%', startangle=140, colors=plt.cm.Pastel1.colors)
-        self.ax_pie.set_title("Expenses by Category")
-
-        # Group by month and sum the amounts for the bar chart
-        df["Month"] = df["Date"].dt.to_period("M")
-        monthly_totals = df.groupby("Month")["Amount"].sum()
-
-        # Plot the bar chart
-        monthly_totals.plot(kind="bar", ax=self.ax_bar, color="skyblue", edgecolor="black")
-        self.ax_bar.set_title("Expenses by Month")
-        self.ax_bar.set_xlabel("Month")
-        self.ax_bar.set_ylabel("Total Expenses")
-
-        # Redraw the canvases with the updated figures
-        self.canvas_pie.draw()
-        self.canvas_bar.draw()
-
-    def load_expenses(self):
-        self.expenses = load_expenses(self.expenseFilePath)
-        self.tree.delete(*self.tree.get_children())  # Clear the treeview
-
-        print("Loading expenses...")
-        for i, expense in enumerate(self.expenses):
-            print(f"Inserting expense {i}: {expense}")
-            self.tree.insert('', 'end', iid=i, values=(expense["Date"], expense["Expense Name"], expense["Category"], expense["Amount"]))
-        
-        self.tree.update_idletasks()  # Force UI update
+    def show_task_error(self, error):
+        self.status_var.set("")
+        messagebox.showerror("Error", str(error))
+
+    def show_edit_error(self, error):
+        # The tree already shows the edit; put back what the ledger holds
+        if isinstance(error, StaleRowError):
+            error = "The expense was changed elsewhere since it was shown. The list has been reloaded; please try again."
+        self.show_task_error(error)
+        self.load_expenses(reload=True)
 
     def update_summary(self):
-        total_spent = sum(float(exp["Amount"]) for exp in self.expenses)
-        remaining_budget = self.budget - total_spent
-        self.total_spent_var.set(f"Total Spent: ${total_spent:.2f}")
-        self.remaining_budget_var.set(f"Remaining Budget: ${remaining_budget:.2f}")
+        # Exact: the rollup keeps integer cents, and so does the budget
+        self.total_spent_var.set(f"Total Spent: {format_money(self.rollup.total_cents)}")
+        self.remaining_budget_var.set(f"Remaining Budget: {format_money(self.budget_cents - self.rollup.total_cents)}")
 
         # Update the progress bar
         self.update_progress_bar()
 
     def update_progress_bar(self):
-        total_spent = sum(float(exp["Amount"]) for exp in self.expenses)
-        self.progress['value'] = total_spent
+        self.progress['value'] = to_units(self.rollup.total_cents)
 
     def create_export_button(self):
         export_button = ttk.Button(self.root, text="Export to Excel", command=self.export_to_excel)
         export_button.grid(row=3, column=0, columnspan=2, padx=10, pady=10)
+        ttk.Label(self.root, textvariable=self.status_var).grid(row=4, column=0, columnspan=2, padx=10, pady=5)
 
     def export_to_excel(self):
-        export_expenses_to_excel(self.expenses)
-        messagebox.showinfo("Export Successful", "Expenses have been exported to expense_summary.xlsx.")
+        total = len(self.expenses)
+
+        def exported(_):
+            self.status_var.set("")
+            messagebox.showinfo("Export Successful", "Expenses have been exported to expense_summary.xlsx.")
+
+        def export(expenses, file_path, progress):
+            # openpyxl is loaded on the worker thread the first time an export runs
+            from excel_exporter import export_expenses_streaming
+            return export_expenses_streaming(expenses, file_path, progress=progress)
+
+        self.status_var.set(f"Exporting 0 of {total:,} expenses...")
+        # A snapshot from read_ledger: no worker modifies it while the export iterates it
+        self.tasks.submit(export, self.expenses, "expense_summary.xlsx",
+                          on_progress=lambda done: self.status_var.set(f"Exporting {done:,} of {total:,} expenses..."),
+                          on_done=exported, on_error=self.show_task_error)
+
+    def on_close(self):
+        self.tasks.shutdown()
+        self.root.destroy()
 
 if __name__ == "__main__":
+    logging.basicConfig(filename='expense_tracker.log', level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
     root = tk.Tk()
     app = ExpenseTrackerApp(root)
     root.mainloop()
\ No newline at end of file
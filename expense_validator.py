@@ -0,0 +1,317 @@
+import csv
+import os
+import numpy as np
+import pandas as pd
+from expense import CATEGORIES
+from expense_table import parse_date
+from metrics import count, timed
+from money import parse_cents_array
+
+REQUIRED_COLUMNS = ["Date", "Expense Name", "Category", "Amount"]
+DEFAULT_CHUNK_ROWS = 1_000_000
+SCAN_BLOCK_BYTES = 16 * 1024 * 1024
+_NOT_STRUCTURE = bytes(byte for byte in range(256) if byte not in b",\n")
+
+
+class ValidationReport:
+    """
+    Compact result of a bulk validation run.
+
+    Invalid rows are stored as parallel line-number and reason-code arrays
+    rather than one object per error, so a report over millions of rows
+    stays small. Line numbers count the header as line 1.
+    """
+
+    def __init__(self):
+        self.rows_checked = 0
+        self.reasons = []
+        self._lines = []
+        self._codes = []
+
+    def add(self, lines, reason):
+        """
+        Record ``reason`` for every line number in ``lines``.
+
+        Args:
+            lines (array-like): Line numbers of the failing rows.
+            reason (str): Human-readable reason.
+        """
+        lines = np.asarray(lines, dtype=np.int64)
+        if not lines.size:
+            return
+        if reason not in self.reasons:
+            self.reasons.append(reason)
+        self._lines.append(lines)
+        self._codes.append(np.full(lines.size, self.reasons.index(reason), dtype=np.int8))
+
+    def merge(self, other, line_offset=0):
+        """
+        Fold another report into this one.
+
+        Args:
+            other (ValidationReport): Report to add.
+            line_offset (int): Added to every line number of ``other``, e.g.
+                when it covered a chunk that starts further into the file.
+        """
+        self.rows_checked += other.rows_checked
+        for lines, codes in zip(other._lines, other._codes):
+            for code in np.unique(codes):
+                self.add(lines[codes == code] + line_offset, other.reasons[code])
+
+    @property
+    def is_valid(self):
+        return not self._lines
+
+    @property
+    def invalid_lines(self):
+        """Sorted array of unique line numbers that failed at least one check."""
+        if not self._lines:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(self._lines))
+
+    @property
+    def errors(self):
+        """List of ``(line_number, reason)`` tuples ordered by line number."""
+        if not self._lines:
+            return []
+        lines = np.concatenate(self._lines)
+        codes = np.concatenate(self._codes)
+        order = np.lexsort((codes, lines))
+        return [(int(lines[i]), self.reasons[codes[i]]) for i in order]
+
+    def counts(self):
+        """
+        Count failures per reason.
+
+        Returns:
+            dict: Reason -> number of rows that failed with it.
+        """
+        totals = dict.fromkeys(self.reasons, 0)
+        for codes in self._codes:
+            for code, count in zip(*np.unique(codes, return_counts=True)):
+                totals[self.reasons[code]] += int(count)
+        return totals
+
+
+def _is_date(value):
+    try:
+        parse_date(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _check_dates(dates):
+    # Same rule as the table parser, applied once per distinct value
+    codes, values = pd.factorize(dates.fillna("").astype(str))
+    missing = np.array([value.strip() == "" for value in values], dtype=bool)
+    invalid = np.array([not blank and not _is_date(value) for value, blank in zip(values, missing)], dtype=bool)
+    return missing[codes], invalid[codes]
+
+
+def validate_frame(df, report=None, first_line=2, categories=CATEGORIES, lines=None):
+    """
+    Validate a DataFrame of expense strings in one vectorized pass.
+
+    Args:
+        df (DataFrame): Expense rows. Date and Category may be strings or
+            categoricals; Amount is checked with the ``parse_cents`` rule,
+            so it should hold the strings as written.
+        report (ValidationReport, optional): Report to add results to.
+        first_line (int): File line number of the first row in ``df``, when
+            rows are on consecutive lines.
+        categories (list): Accepted category names.
+        lines (array, optional): File line number of every row; overrides
+            ``first_line``.
+
+    Returns:
+        ValidationReport: The report with this frame's failures added.
+    """
+    if report is None:
+        report = ValidationReport()
+    if lines is None:
+        lines = np.arange(first_line, first_line + len(df), dtype=np.int64)
+    report.rows_checked += len(df)
+
+    dates = df["Date"]
+    if isinstance(dates.dtype, pd.CategoricalDtype):
+        # Ledgers repeat the same few hundred dates, so parse each distinct value once
+        codes = dates.cat.codes.to_numpy()
+        missing_date, invalid_date = _check_dates(pd.Series(dates.cat.categories, dtype=object))
+        missing_date = np.append(missing_date, True)[codes]
+        invalid_date = np.append(invalid_date, False)[codes]
+    else:
+        missing_date, invalid_date = _check_dates(dates)
+    report.add(lines[missing_date], "missing date")
+    report.add(lines[invalid_date], "invalid date")
+
+    amounts = df["Amount"]
+    if isinstance(amounts.dtype, pd.CategoricalDtype):
+        # Parse each distinct amount once; missing values are invalid
+        valid_amount = np.append(parse_cents_array(amounts.cat.categories.astype(str))[1], False)
+        valid_amount = valid_amount[amounts.cat.codes.to_numpy()]
+    else:
+        valid_amount = parse_cents_array(amounts.fillna("").astype(str).to_numpy())[1]
+    report.add(lines[~valid_amount], "invalid amount")
+
+    if categories is not None:
+        report.add(lines[~df["Category"].isin(categories).to_numpy()], "unknown category")
+    return report
+
+
+def validate_records(records, categories=CATEGORIES):
+    """
+    Validate a list of expense dictionaries in bulk.
+
+    Args:
+        records (list of dict): Expense rows as passed to ``add_expense``.
+        categories (list): Accepted category names.
+
+    Returns:
+        ValidationReport: Report whose line numbers are 0-based record indices.
+    """
+    df = pd.DataFrame.from_records(list(records), columns=REQUIRED_COLUMNS)
+    df = df.astype(str).where(df.notna(), "")
+    return validate_frame(df, first_line=0, categories=categories)
+
+
+def is_regular(data, fields):
+    """
+    Check that every line of a CSV block is one plain record.
+
+    A block is regular when it has no quotes (so no field spans lines) and
+    each line has exactly ``fields`` fields, so there are no blank or short
+    lines. Row positions of a regular block map one to one onto its lines,
+    which is what lets pandas validate it; anything else goes through the
+    csv module like the table readers.
+
+    Args:
+        data (bytes): Complete lines of the CSV, without the header.
+        fields (int): Number of columns in the header.
+
+    Returns:
+        bool: True if the block is regular.
+    """
+    if b'"' in data:
+        return False
+    if data and not data.endswith(b"\n"):
+        data += b"\n"
+    # Keep only commas and line breaks; a regular block is then one pattern repeated
+    skeleton = data.translate(None, _NOT_STRUCTURE)
+    line = b"," * (fields - 1) + b"\n"
+    return skeleton == line * (len(skeleton) // len(line))
+
+
+def validate_rows(reader, header, report=None, line_offset=0, categories=CATEGORIES, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Validate the records of a ``csv.reader`` with real file line numbers.
+
+    Rows are taken exactly as ``ExpenseTable`` takes them: empty lines are
+    skipped, and rows with too few fields are reported as "missing columns".
+
+    Args:
+        reader (csv.reader): Reader positioned after the header.
+        header (list): Column names.
+        report (ValidationReport, optional): Report to add results to.
+        line_offset (int): File line number of the reader's line 0, so a
+            record on reader line ``n`` is file line ``line_offset + n``.
+        categories (list): Accepted category names.
+        chunk_rows (int): Rows per vectorized batch.
+
+    Returns:
+        ValidationReport: The report with these rows' failures added.
+    """
+    if report is None:
+        report = ValidationReport()
+    columns = [header.index(column) for column in ("Date", "Category", "Amount")]
+    width = max(header.index(column) for column in REQUIRED_COLUMNS) + 1
+    records, lines, short = [], [], []
+
+    def flush():
+        frame = pd.DataFrame(records, columns=["Date", "Category", "Amount"])
+        validate_frame(frame, report, categories=categories, lines=np.array(lines, dtype=np.int64))
+        records.clear()
+        lines.clear()
+
+    previous = reader.line_num
+    for row in reader:
+        # A record starts on the line after the previous one ended
+        line = line_offset + previous + 1
+        previous = reader.line_num
+        if not row:
+            continue
+        if len(row) < width:
+            short.append(line)
+            continue
+        records.append([row[column] for column in columns])
+        lines.append(line)
+        if len(records) >= chunk_rows:
+            flush()
+    if records:
+        flush()
+    report.rows_checked += len(short)
+    report.add(short, "missing columns")
+    return report
+
+
+def _file_is_regular(file, fields):
+    carry = b""
+    while block := file.read(SCAN_BLOCK_BYTES):
+        block = carry + block
+        cut = block.rfind(b"\n") + 1
+        if not is_regular(block[:cut], fields):
+            return False
+        carry = block[cut:]
+    return is_regular(carry, fields)
+
+
+@timed("validate_file")
+def validate_file(file_path, chunk_rows=DEFAULT_CHUNK_ROWS, categories=CATEGORIES):
+    """
+    Validate a whole expense CSV file chunk by chunk.
+
+    Every invalid row is reported instead of stopping at the first one.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunk_rows (int): Rows per vectorized chunk.
+        categories (list): Accepted category names.
+
+    Returns:
+        ValidationReport: Report covering every row of the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If required columns are missing from the header.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+
+    with open(file_path, mode='rb') as file:
+        header_line = file.readline()
+        headers = next(csv.reader([header_line.decode('utf-8-sig')]), [])
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in headers]
+        if missing_columns:
+            raise ValueError(f"Missing columns: {missing_columns}")
+        regular = _file_is_regular(file, len(headers))
+
+    report = ValidationReport()
+    if not regular:
+        # Blank, short or multi-line records: walk the file like the table readers do
+        with open(file_path, mode='r', newline='', encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+            next(reader)
+            validate_rows(reader, headers, report, categories=categories, chunk_rows=chunk_rows)
+    else:
+        first_line = 2
+        # Names are not validated, so they are never materialized
+        reader = pd.read_csv(file_path, usecols=["Date", "Category", "Amount"],
+                             dtype={"Date": "category", "Category": "category", "Amount": "category"},
+                             keep_default_na=False, chunksize=chunk_rows)
+        for chunk in reader:
+            validate_frame(chunk, report, first_line, categories)
+            first_line += len(chunk)
+    for reason, rows in report.counts().items():
+        if rows:
+            count("invalid_rows", rows, source="validate_file", reason=reason)
+    return report
@@ -0,0 +1,233 @@
+import csv
+import glob
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from expense import CATEGORIES
+from expense_table import ExpenseTable, summarize_chunks
+from journal import EditJournal
+
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+REQUIRED_COLUMNS = ["Date", "Expense Name", "Category", "Amount"]
+# An empty line, which csv.reader returns as no record at all
+_BLANK_LINE = re.compile(rb"\n(?=\r?\n)")
+
+
+def expand_sources(*patterns):
+    """
+    Resolve files, directories and glob patterns to a sorted list of CSV paths.
+
+    Args:
+        *patterns (str): File paths, directories (all ``*.csv`` inside) or globs.
+
+    Returns:
+        list: Unique paths in sorted order, so runs are deterministic.
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(glob.glob(os.path.join(pattern, "*.csv")))
+        elif glob.has_magic(pattern):
+            paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            paths.add(pattern)
+    return sorted(paths)
+
+
+def split_ranges(file_path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Split a CSV into byte ranges that start and end on line boundaries.
+
+    Assumes no quoted field spans a line break.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunk_bytes (int): Target size of each range.
+
+    Returns:
+        tuple: The parsed header row and a list of ``(start, end)`` offsets
+        covering every data line.
+
+    Raises:
+        ValueError: If required columns are missing from the header.
+    """
+    with open(file_path, mode='rb') as file:
+        header_line = file.readline()
+        header = next(csv.reader([header_line.decode('utf-8-sig')]), [])
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+        if missing_columns:
+            raise ValueError(f"Missing columns in {file_path}: {missing_columns}")
+
+        size = os.fstat(file.fileno()).st_size
+        ranges = []
+        start = len(header_line)
+        while start < size:
+            file.seek(min(start + chunk_bytes, size))
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def _read_range(file_path, start, end):
+    with open(file_path, mode='rb') as file:
+        file.seek(start)
+        return file.read(end - start)
+
+
+def count_records(data):
+    """
+    Count the records in complete CSV lines the way the table readers number them.
+
+    Empty lines are not records; every other line is one, valid or not.
+    Like ``split_ranges``, this assumes no quoted field spans a line break.
+
+    Args:
+        data (bytes): Whole lines of a CSV, without the header.
+
+    Returns:
+        int: Number of records, i.e. row ids they take.
+    """
+    lines = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+    return lines - len(_BLANK_LINE.findall(b"\n" + data))
+
+
+def _parse_range(file_path, start, end, header, first_row_id=0, changes=None):
+    table = ExpenseTable()
+    # Row ids continue from the previous range, so journal edits land on the right rows
+    table.next_row_id = first_row_id
+    data = _read_range(file_path, start, end).decode('utf-8')
+    table.extend_from_reader(csv.reader(io.StringIO(data, newline='')), header, changes)
+    return table
+
+
+def _summarize_range(file_path, start, end, header, first_row_id=0, changes=None):
+    # Only the aggregates travel back to the parent, not the rows
+    return summarize_chunks([_parse_range(file_path, start, end, header, first_row_id, changes)])
+
+
+def _validate_range(file_path, start, end, header, categories):
+    import pandas as pd
+    from expense_validator import is_regular, validate_frame, validate_rows
+
+    data = _read_range(file_path, start, end)
+    # Line numbers are relative to the range; the parent shifts them
+    if is_regular(data, len(header)):
+        df = pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=["Date", "Category", "Amount"],
+                         dtype={"Date": "category", "Category": "category", "Amount": "category"},
+                         keep_default_na=False)
+        report = validate_frame(df, first_line=0, categories=categories)
+    else:
+        reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+        report = validate_rows(reader, header, line_offset=-1, categories=categories)
+    return report, data.count(b"\n") + (0 if data.endswith(b"\n") else 1)
+
+
+def _plan(sources, chunk_bytes, journal=False):
+    tasks = []
+    for file_path in expand_sources(*sources):
+        header, ranges = split_ranges(file_path, chunk_bytes)
+        if not journal:
+            tasks.extend((file_path, start, end, header) for start, end in ranges)
+            continue
+        changes = EditJournal.load(file_path).changes
+        if not changes:
+            tasks.extend((file_path, start, end, header, 0, None) for start, end in ranges)
+            continue
+        # Each range gets the id of its first record and the edits that fall inside it
+        first_row_id = 0
+        for start, end in ranges:
+            last_row_id = first_row_id + count_records(_read_range(file_path, start, end))
+            edits = {row_id: row for row_id, row in changes.items() if first_row_id <= row_id < last_row_id}
+            tasks.append((file_path, start, end, header, first_row_id, edits))
+            first_row_id = last_row_id
+    return tasks
+
+
+def _run(func, tasks, workers, *extra):
+    """Apply ``func`` to every task, returning results in task order."""
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [func(*task, *extra) for task in tasks]
+    columns = list(zip(*tasks)) + [[value] * len(tasks) for value in extra]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, *columns))
+
+
+def load_files(sources, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Parse many expense CSVs into one ExpenseTable using a process pool.
+
+    Rows keep file order (sorted paths) and line order within each file,
+    whatever the number of workers. Edits in each file's journal are
+    applied, as ``ExpenseTable.from_csv`` does; the combined table numbers
+    its rows afresh. Invalid rows are skipped and counted in ``invalid_rows``.
+
+    Args:
+        sources (list): Files, directories or glob patterns.
+        workers (int, optional): Worker processes; defaults to the CPU count.
+        chunk_bytes (int): Target byte size of each parallel chunk.
+
+    Returns:
+        ExpenseTable: All valid expenses.
+    """
+    table = ExpenseTable()
+    for chunk in _run(_parse_range, _plan(sources, chunk_bytes, journal=True), workers):
+        table.extend_table(chunk)
+    return table
+
+
+def summarize_files(sources, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Compute totals over many expense CSVs without collecting their rows.
+
+    Edits in each file's journal are applied.
+
+    Args:
+        sources (list): Files, directories or glob patterns.
+        workers (int, optional): Worker processes; defaults to the CPU count.
+        chunk_bytes (int): Target byte size of each parallel chunk.
+
+    Returns:
+        dict: Same layout as ``expense_table.summarize_chunks``.
+    """
+    summaries = _run(_summarize_range, _plan(sources, chunk_bytes, journal=True), workers)
+    merged = {"rows": 0, "invalid_rows": 0, "total_cents": 0, "category_totals": {}, "monthly_totals": {}}
+    for summary in summaries:
+        for key in ("rows", "invalid_rows", "total_cents"):
+            merged[key] += summary[key]
+        for key in ("category_totals", "monthly_totals"):
+            totals = merged[key]
+            for name, cents in summary[key].items():
+                totals[name] = totals.get(name, 0) + cents
+    merged["monthly_totals"] = dict(sorted(merged["monthly_totals"].items()))
+    return merged
+
+
+def validate_files(sources, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES, categories=CATEGORIES):
+    """
+    Validate many expense CSVs chunk by chunk in a process pool.
+
+    Args:
+        sources (list): Files, directories or glob patterns.
+        workers (int, optional): Worker processes; defaults to the CPU count.
+        chunk_bytes (int): Target byte size of each parallel chunk.
+        categories (list): Accepted category names.
+
+    Returns:
+        dict: File path -> ValidationReport with file line numbers (header is line 1).
+
+    Raises:
+        ValueError: If a file is missing required columns.
+    """
+    from expense_validator import ValidationReport
+
+    tasks = _plan(sources, chunk_bytes)
+    reports = {file_path: ValidationReport() for file_path in expand_sources(*sources)}
+    next_line = {file_path: 2 for file_path in reports}
+    for (file_path, _, _, _), (report, lines) in zip(tasks, _run(_validate_range, tasks, workers, categories)):
+        reports[file_path].merge(report, next_line[file_path])
+        next_line[file_path] += lines
+    return reports
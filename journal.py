@@ -0,0 +1,326 @@
+import csv
+import json
+import os
+
+# Compact once the journal holds this many edits
+COMPACT_ENTRIES = 1_000
+
+FIELDS = ["Date", "Expense Name", "Category", "Amount"]
+
+
+def journal_path(file_path):
+    """Return the path of the edit journal kept next to an expense CSV."""
+    return f"{file_path}.journal"
+
+
+def _inode(file_path):
+    try:
+        return os.stat(file_path).st_ino
+    except FileNotFoundError:
+        return None
+
+
+class StaleRowError(ValueError):
+    """Raised when an edit names rows by ids or values the ledger no longer has."""
+
+
+def _same_values(expense, row):
+    from expense_table import parse_date
+    from money import parse_cents
+
+    # Compared as the rollup sees them, so "2.5" and "2.50" are the same amount
+    try:
+        return (expense["Category"] == row[2] and parse_date(str(expense["Date"])) == parse_date(row[0])
+                and parse_cents(expense["Amount"]) == parse_cents(row[3]))
+    except (KeyError, ValueError):
+        return False
+
+
+class EditJournal:
+    """
+    Append-only log of edits and deletions for an expense CSV.
+
+    Rows are identified by their row id: the 0-based position of the record
+    among the CSV's non-blank data records. Appends never change existing ids.
+    Editing or deleting a row appends one JSON line to ``<csv>.journal``
+    (an amendment with the new values, or a tombstone), so an edit costs
+    O(1) I/O instead of a full rewrite. Readers apply the journal while they
+    parse the CSV; ``compact`` folds it back into the file and renumbers rows.
+
+    The first journal line records the CSV's inode and a generation that
+    every compaction bumps. Together they form the ``base`` that row ids
+    refer to: tables remember the base they were read from, and edits made
+    with another base are rejected instead of landing on a renumbered row.
+    A journal left behind by an interrupted compaction has the old inode,
+    so it never applies to the compacted file.
+    """
+
+    def __init__(self, file_path, inode=None):
+        self.file_path = file_path
+        self.path = journal_path(file_path)
+        self.changes = {}
+        self.entries = 0
+        self._offset = 0
+        self._header = None
+        self._inode = inode
+
+    @classmethod
+    def load(cls, file_path, inode=None):
+        """
+        Read the journal of a CSV.
+
+        Args:
+            file_path (str): Path to the expense CSV.
+            inode (int, optional): Inode of the CSV the caller has open, when
+                it is reading the file; defaults to the file at ``file_path``.
+
+        Returns:
+            EditJournal: Journal whose ``changes`` map row id -> replacement
+            ``(date, name, category, amount)`` tuple, or None for deleted rows.
+        """
+        journal = cls(file_path, inode)
+        journal.read_new()
+        return journal
+
+    @property
+    def base(self):
+        """``(inode, generation)`` of the CSV version the row ids refer to."""
+        if self._header is None:
+            return (self._inode, 0)
+        generation = self._header.get("generation", 0)
+        # A header for another inode is left over from a compaction or a replaced file
+        return (self._inode, generation if self._header["base"] == self._inode else generation + 1)
+
+    def read_new(self):
+        """
+        Read entries appended since the last call.
+
+        Returns:
+            list: New ``(row_id, row)`` pairs in log order, or None if the
+            journal was truncated, replaced or compacted away since the last
+            read; the caller should then reload from scratch.
+        """
+        if self._inode is None:
+            self._inode = _inode(self.file_path)
+        try:
+            with open(self.path, mode='rb') as file:
+                return self._read(file)
+        except FileNotFoundError:
+            return self._reset() if self._offset or self._header else []
+
+    def _reset(self):
+        self.changes = {}
+        self.entries = 0
+        self._offset = 0
+        self._header = None
+        return None
+
+    def _read(self, file):
+        size = file.seek(0, os.SEEK_END)
+        if size < self._offset:
+            return self._reset()
+        if self._header is not None:
+            # Compaction rewrites the header, possibly to a journal of the same size
+            file.seek(0)
+            first = file.readline()
+            if not first.endswith(b"\n") or json.loads(first) != self._header:
+                return self._reset()
+        if size == self._offset:
+            return []
+
+        file.seek(self._offset)
+        data = file.read(size - self._offset)
+        # A partially written last line is left for the next read
+        data = data[:data.rfind(b"\n") + 1]
+        new_entries = []
+        for line in data.splitlines():
+            entry = json.loads(line)
+            if "base" in entry:
+                self._header = entry
+                if entry["base"] != self._inode:
+                    # Left over from a compaction that replaced the CSV; ignore it entirely
+                    self._offset = size
+                    return []
+                continue
+            row = tuple(entry["row"]) if entry["row"] is not None else None
+            self.changes[entry["id"]] = row
+            new_entries.append((entry["id"], row))
+        self.entries += len(new_entries)
+        self._offset += len(data)
+        return new_entries
+
+    def amend(self, row_id, old, new, base, fsync=False):
+        """
+        Record new values for a row.
+
+        Args:
+            row_id (int): Id of the row to change.
+            old (dict): The row's current values, used to adjust the rollup sidecar.
+            new (dict): Expense with Date, Expense Name, Category and Amount.
+            base (tuple): ``base`` of the table the row id and ``old`` come from.
+            fsync (bool): Flush the entry to stable storage before returning.
+
+        Raises:
+            StaleRowError: If the ledger was compacted or replaced since the
+                table was read, or the row was edited or deleted meanwhile.
+        """
+        self._write(row_id, [str(new[field]) for field in FIELDS], old, new, base, fsync)
+
+    def delete(self, row_id, old, base, fsync=False):
+        """
+        Record a tombstone for a row.
+
+        Args:
+            row_id (int): Id of the row to delete.
+            old (dict): The row's current values, used to adjust the rollup sidecar.
+            base (tuple): ``base`` of the table the row id and ``old`` come from.
+            fsync (bool): Flush the entry to stable storage before returning.
+
+        Raises:
+            StaleRowError: As for ``amend``.
+        """
+        self._write(row_id, None, old, None, base, fsync)
+
+    def _write(self, row_id, row, old, new, base, fsync):
+        from expense import locked_file
+        from rollup import ExpenseRollup, file_stamp
+
+        # One handle both reads and appends, so nothing else touches the file while it is locked
+        with open(self.path, mode='ab+') as file, locked_file(file):
+            inode = _inode(self.file_path)
+            if inode != self._inode:
+                self._inode = inode
+                self._reset()
+            if self._read(file) is None:
+                # Compacted since the last read
+                self._read(file)
+            if base is None or tuple(base) != self.base:
+                raise StaleRowError(f"{self.file_path} was compacted or replaced since it was read; reload it")
+            # A row that is not in the journal still has the values of the base file, which the
+            # caller read along with the ids. An edited one must match its latest entry.
+            if row_id in self.changes and (self.changes[row_id] is None or not _same_values(old, self.changes[row_id])):
+                raise StaleRowError(f"row {row_id} of {self.file_path} was changed since it was read; reload it")
+
+            size = file.seek(0, os.SEEK_END)
+            if self._header is None or self._header["base"] != inode:
+                self._header = {"base": inode, "generation": self.base[1]}
+                self.changes = {}
+                self.entries = 0
+                file.truncate(0)
+                file.write(json.dumps(self._header).encode() + b"\n")
+            elif self._offset < size:
+                # Drop the torn last line of a writer that died mid-write
+                file.truncate(self._offset)
+            file.write(json.dumps({"id": row_id, "row": row}).encode() + b"\n")
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+            self.changes[row_id] = tuple(row) if row is not None else None
+            self.entries += 1
+            self._offset = file.tell()
+
+            # The CSV itself is untouched, so an up-to-date rollup stays current with a delta.
+            # A stale one is rebuilt on its next load, which applies the journal.
+            rollup = ExpenseRollup.read(self.file_path)
+            if rollup is not None and rollup.stamp == file_stamp(self.file_path):
+                rollup.remove(old["Date"], old["Category"], old["Amount"])
+                if new is not None:
+                    rollup.add(new["Date"], new["Category"], new["Amount"])
+                rollup.save()
+
+    def should_compact(self, max_entries=COMPACT_ENTRIES):
+        """Return True once the journal has grown enough to be worth folding back."""
+        self.read_new()
+        return self.entries >= max_entries
+
+    def compact(self):
+        """
+        Rewrite the CSV with every journal entry applied and empty the journal.
+
+        Row ids are renumbered by the rewrite, so the journal restarts with
+        the next generation and edits made with the old ``base`` are
+        rejected. The CSV stays locked from the rewrite until it has been
+        replaced, so appenders wait for it and then write to the new file
+        (see ``expense.locked_append``).
+
+        Returns:
+            int: Number of journal entries folded into the file, or 0 if
+            compaction was skipped and should be tried again later.
+        """
+        from expense import locked_file
+
+        if not os.path.exists(self.path) or not os.path.exists(self.file_path):
+            return 0
+        with open(self.path, mode='ab+') as journal_file, locked_file(journal_file):
+            self._reset()
+            self._inode = _inode(self.file_path)
+            self._read(journal_file)
+            folded = self.entries
+            if not self.changes:
+                return 0
+            generation = self.base[1]
+            if not self._replace_csv():
+                self._reset()
+                return 0
+            self._inode = _inode(self.file_path)
+            self._reset()
+            self._header = {"base": self._inode, "generation": generation + 1}
+            journal_file.truncate(0)
+            journal_file.write(json.dumps(self._header).encode() + b"\n")
+            journal_file.flush()
+            self._offset = journal_file.tell()
+        return folded
+
+    def _replace_csv(self):
+        from expense import locked_file
+        from rollup import file_stamp
+
+        temp_path = f"{self.file_path}.compact"
+        with open(self.file_path, mode='a', newline='') as csv_file, locked_file(csv_file):
+            stamp_before = file_stamp(self.file_path)
+            self._rewrite(temp_path)
+            if os.name != "nt":
+                os.replace(temp_path, self.file_path)
+                self._restamp_rollup(stamp_before)
+                return True
+        # Windows cannot replace a file that is open, so it is replaced just after
+        # unlocking, unless an append slipped in between
+        if file_stamp(self.file_path) != stamp_before:
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, self.file_path)
+        self._restamp_rollup(stamp_before)
+        return True
+
+    def _restamp_rollup(self, stamp_before):
+        from rollup import ExpenseRollup
+
+        # The totals already include the journal; only the stamp moves to the new file
+        rollup = ExpenseRollup.read(self.file_path)
+        if rollup is not None and rollup.stamp == stamp_before:
+            rollup.restamp()
+            rollup.save()
+
+    def _rewrite(self, temp_path):
+        with open(self.file_path, mode='r', newline='') as source, open(temp_path, mode='w', newline='') as target:
+            reader = csv.reader(source)
+            writer = csv.writer(target)
+            header = next(reader, None)
+            if header is None:
+                return
+            writer.writerow(header)
+            columns = [header.index(field) for field in FIELDS]
+            row_id = 0
+            for row in reader:
+                if not row:
+                    continue
+                if row_id in self.changes:
+                    replacement = self.changes[row_id]
+                    if replacement is not None:
+                        row = row + [""] * (len(header) - len(row))
+                        for column, value in zip(columns, replacement):
+                            row[column] = value
+                        writer.writerow(row)
+                else:
+                    writer.writerow(row)
+                row_id += 1
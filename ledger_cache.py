@@ -0,0 +1,340 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from expense_table import ExpenseTable
+from journal import journal_path
+from metrics import count, timed
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def fingerprint(file_path):
+    """
+    Return the stat fingerprint of a ledger, including its edit journal.
+
+    Args:
+        file_path (str): Path to the expense CSV.
+
+    Returns:
+        tuple: ``(size, mtime_ns, journal_size, journal_mtime_ns, inode)``,
+        or None if the CSV does not exist.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    try:
+        journal = os.stat(journal_path(file_path))
+        journal_stamp = (journal.st_size, journal.st_mtime_ns)
+    except FileNotFoundError:
+        journal_stamp = (0, 0)
+    return (stat.st_size, stat.st_mtime_ns) + journal_stamp + (stat.st_ino,)
+
+
+def content_hash(file_path):
+    """Return a BLAKE2 digest of the CSV and its journal contents."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in (file_path, journal_path(file_path)):
+        try:
+            with open(path, mode='rb') as file:
+                while block := file.read(HASH_BLOCK_BYTES):
+                    digest.update(block)
+        except FileNotFoundError:
+            pass
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _same_content(stored_stamp, stored_hash, file_path, stamp):
+    if stored_stamp == stamp:
+        return True
+    # Touched but possibly unchanged: sizes must match before hashing is worth it. A file
+    # replaced by a copy is a new journal base, so cached row ids would not apply to it.
+    if stored_hash is None or stored_stamp[0] != stamp[0] or stored_stamp[2] != stamp[2] or stored_stamp[4:] != stamp[4:]:
+        return False
+    return content_hash(file_path) == stored_hash
+
+
+def _value_bytes(value):
+    if isinstance(value, ExpenseTable):
+        return value.nbytes
+    memory_usage = getattr(value, "memory_usage", None)
+    if memory_usage is not None:
+        # pandas DataFrame / Series
+        usage = memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class _Entry:
+    def __init__(self, stamp, digest):
+        self.stamp = stamp
+        self.digest = digest
+        self.values = {}
+        self.nbytes = 0
+
+
+class LedgerCache:
+    """
+    Cache of parsed ledgers keyed by file fingerprint.
+
+    Each CSV maps to one entry holding its parsed ExpenseTable plus any
+    derived values (e.g. the typed DataFrame behind the report sheets). An
+    entry is valid while the CSV and its edit journal keep the size and
+    mtime (and the CSV its inode) they had when it was parsed; a file that
+    was touched or rewritten in place with the same size is re-checked
+    against the stored content hash. Appends, journal edits, compactions
+    and replacements therefore all invalidate it.
+
+    Entries live in an in-process LRU bounded by ``max_bytes``. With a
+    ``disk_dir``, tables are also written there as ``.npz`` files and
+    derived values as pickles, so a new process (the next CLI run or GUI
+    start) can skip parsing too.
+
+    Cached values are shared between callers; copy them before modifying.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def table(self, file_path):
+        """
+        Return the parsed ExpenseTable of a CSV, parsing it only on a miss.
+
+        Args:
+            file_path (str): Path to the expense CSV.
+
+        Returns:
+            ExpenseTable: The cached (shared) table.
+        """
+        return self.get(file_path, "table", lambda: ExpenseTable.from_csv(file_path))
+
+    def tables(self, file_paths):
+        """
+        Return one table combining several CSVs, in the given order.
+
+        The combination is cached as well, keyed by every file's fingerprint.
+
+        Args:
+            file_paths (list): Paths to expense CSVs.
+
+        Returns:
+            ExpenseTable: The combined (shared) table.
+        """
+        if len(file_paths) == 1:
+            return self.table(file_paths[0])
+        key = "\0".join(os.path.abspath(file_path) for file_path in file_paths)
+        stamp = tuple(fingerprint(file_path) for file_path in file_paths)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                self._entries.move_to_end(key)
+                self._record("hit")
+                return entry.values["table"]
+
+        combined = ExpenseTable()
+        for file_path in file_paths:
+            combined.extend_table(self.table(file_path))
+        if tuple(fingerprint(file_path) for file_path in file_paths) == stamp:
+            self._store(key, stamp, None, "table", combined)
+        return combined
+
+    def get(self, file_path, name, build):
+        """
+        Return the value ``name`` derived from a CSV, building it on a miss.
+
+        Args:
+            file_path (str): Path to the expense CSV the value is derived from.
+            name (str): Name of the derived value, e.g. "table" or "ledger_frame".
+            build (callable): Called with no arguments to compute the value.
+
+        Returns:
+            The cached (shared) value.
+        """
+        key = os.path.abspath(file_path)
+        stamp = fingerprint(key)
+        if stamp is None:
+            return build()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and name in entry.values and _same_content(entry.stamp, entry.digest, key, stamp):
+                entry.stamp = stamp
+                self._entries.move_to_end(key)
+                self._record("hit")
+                return entry.values[name]
+
+        value, digest = self._read_disk(key, name, stamp)
+        if value is not None:
+            self._record("disk_hit")
+        else:
+            self._record("miss")
+            digest = content_hash(key)
+            with timed("cache_build"):
+                value = build()
+            if fingerprint(key) != stamp:
+                # The file changed while it was read; the result may mix both versions
+                return value
+            self._write_disk(key, name, stamp, digest, value)
+        self._store(key, stamp, digest, name, value)
+        return value
+
+    def lookup(self, file_path, stamp):
+        """
+        Return the cached table of a CSV without parsing it.
+
+        Args:
+            file_path (str): Path to the expense CSV.
+            stamp (tuple): The ``fingerprint`` the caller has observed.
+
+        Returns:
+            ExpenseTable: The cached table, or None if nothing matches ``stamp``.
+        """
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and "table" in entry.values and entry.stamp == stamp:
+                self._entries.move_to_end(key)
+                self._record("hit")
+                return entry.values["table"]
+        table, _ = self._read_disk(key, "table", stamp)
+        self._record("disk_hit" if table is not None else "miss")
+        return table
+
+    def save(self, file_path, stamp, table):
+        """
+        Write a table parsed elsewhere to the disk cache, if one is configured.
+
+        The in-process LRU is left alone: the caller keeps mutating its table.
+
+        Args:
+            file_path (str): Path to the expense CSV.
+            stamp (tuple): The ``fingerprint`` taken before the file was read.
+            table (ExpenseTable): The parsed table.
+        """
+        key = os.path.abspath(file_path)
+        if self.disk_dir and fingerprint(key) == stamp:
+            self._write_disk(key, "table", stamp, content_hash(key), table)
+
+    def clear(self):
+        """Drop every in-process entry (the disk cache is left in place)."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """
+        Return the hit/miss counters and current size.
+
+        Returns:
+            dict: hits, disk_hits, misses, evictions, entries, nbytes and max_bytes.
+        """
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "evictions": self.evictions, "entries": len(self._entries),
+                    "nbytes": self.nbytes, "max_bytes": self.max_bytes}
+
+    def _record(self, result):
+        if result == "hit":
+            self.hits += 1
+        elif result == "disk_hit":
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+        count("cache_lookups", result=result)
+
+    def _store(self, key, stamp, digest, name, value):
+        nbytes = _value_bytes(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.stamp != stamp:
+                if entry is not None:
+                    self.nbytes -= entry.nbytes
+                entry = self._entries[key] = _Entry(stamp, digest)
+            elif name in entry.values:
+                return
+            entry.values[name] = value
+            entry.nbytes += nbytes
+            self.nbytes += nbytes
+            self._entries.move_to_end(key)
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+                count("cache_evictions")
+
+    def _disk_path(self, key, name):
+        return os.path.join(self.disk_dir, hashlib.sha1(key.encode()).hexdigest()[:20] +
+                            (".npz" if name == "table" else f".{name}.pkl"))
+
+    def _read_disk(self, key, name, stamp):
+        if not self.disk_dir:
+            return None, None
+        path = self._disk_path(key, name)
+        try:
+            if name == "table":
+                import numpy as np
+                with np.load(path, allow_pickle=False) as data:
+                    meta = json.loads(str(data["meta"]))
+                    if meta["path"] != key or not _same_content(tuple(meta["stamp"]), meta["digest"], key, stamp):
+                        return None, None
+                    table = ExpenseTable.from_columns(data["dates"], data["cents"], data["category_codes"],
+                                                      data["name_codes"], data["categories"].tolist(),
+                                                      data["names"].tolist(), data["row_ids"])
+                table.next_row_id = meta["next_row_id"]
+                table.invalid_rows = meta["invalid_rows"]
+                table.base = tuple(meta["base"]) if meta.get("base") is not None else None
+                return table, meta["digest"]
+            with open(path, mode='rb') as file:
+                stored_key, stored_stamp, digest, value = pickle.load(file)
+            if stored_key != key or not _same_content(stored_stamp, digest, key, stamp):
+                return None, None
+            return value, digest
+        except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError):
+            return None, None
+
+    def _write_disk(self, key, name, stamp, digest, value):
+        if not self.disk_dir:
+            return
+        os.makedirs(self.disk_dir, exist_ok=True)
+        path = self._disk_path(key, name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, mode='wb') as file:
+            if name == "table":
+                import numpy as np
+                meta = {"path": key, "stamp": list(stamp), "digest": digest,
+                        "next_row_id": value.next_row_id, "invalid_rows": value.invalid_rows,
+                        "base": value.base}
+                np.savez(file, meta=np.array(json.dumps(meta)),
+                         dates=np.frombuffer(value.dates, dtype=np.int64),
+                         cents=np.frombuffer(value.cents, dtype=np.int64),
+                         category_codes=np.frombuffer(value.category_codes, dtype=np.int32),
+                         name_codes=np.frombuffer(value.name_codes, dtype=np.int32),
+                         row_ids=np.frombuffer(value.row_ids, dtype=np.int64),
+                         categories=np.array(value.categories, dtype=str),
+                         names=np.array(value.names, dtype=str))
+            else:
+                pickle.dump((key, stamp, digest, value), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+
+cache = LedgerCache(int(os.environ.get("EXPENSE_CACHE_BYTES", DEFAULT_MAX_BYTES)),
+                    os.environ.get("EXPENSE_CACHE_DIR") or None)
@@ -0,0 +1,249 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = "expense_tracker"
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+def _parse_targets(value):
+    # "" -> nothing, "*" -> everything, "a,b" -> those operations
+    names = {name.strip() for name in (value or "").split(",") if name.strip()}
+    return True if "*" in names else names
+
+
+class Metrics:
+    """
+    Process-wide timers, counters and gauges for the hot paths.
+
+    Recording a sample is a lock and a dict update, so it is cheap enough
+    for every load, validation, append, aggregation, render and export, and
+    for per-row tallies such as invalid rows by reason. Nothing is printed
+    or logged per row; read the aggregates with ``snapshot`` or dump them
+    with ``write_json`` / ``write_prometheus``.
+
+    Profiling is opt-in per operation: set ``EXPENSE_PROFILE`` (cProfile) or
+    ``EXPENSE_TRACEMALLOC`` (peak memory) to a comma-separated list of
+    operation names, or ``*`` for all of them, or call ``enable_profiling``.
+    cProfile stats are written to ``EXPENSE_PROFILE_DIR`` (default: the
+    working directory) as ``<operation>-<timestamp_ns>.prof``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiling = threading.local()
+        self.reset()
+        self.profile_operations = _parse_targets(os.environ.get("EXPENSE_PROFILE"))
+        self.tracemalloc_operations = _parse_targets(os.environ.get("EXPENSE_TRACEMALLOC"))
+        self.profile_dir = os.environ.get("EXPENSE_PROFILE_DIR", ".")
+
+    def reset(self):
+        """Drop every recorded sample."""
+        with self._lock:
+            self.counters = {}
+            self.gauges = {}
+            # operation -> [count, total seconds, max seconds]
+            self.timers = {}
+
+    def count(self, name, value=1, **labels):
+        """Add ``value`` to the counter ``name`` with the given labels."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        """Set the gauge ``name`` with the given labels to ``value``."""
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, operation, seconds):
+        """Record one duration sample for ``operation``."""
+        with self._lock:
+            timer = self.timers.get(operation)
+            if timer is None:
+                self.timers[operation] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    @contextmanager
+    def timed(self, operation):
+        """
+        Time a block (or, used as a decorator, a function) as ``operation``.
+
+        Runs it under cProfile and/or tracemalloc when profiling is enabled
+        for the operation.
+        """
+        if self._wants(self.profile_operations, operation) or self._wants(self.tracemalloc_operations, operation):
+            with self.capture(operation, cprofile=self._wants(self.profile_operations, operation),
+                              tracemalloc=self._wants(self.tracemalloc_operations, operation)):
+                started = time.perf_counter()
+                try:
+                    yield
+                finally:
+                    self.observe(operation, time.perf_counter() - started)
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(operation, time.perf_counter() - started)
+
+    @staticmethod
+    def _wants(targets, operation):
+        return targets is True or operation in targets
+
+    def enable_profiling(self, operations="*", cprofile=True, tracemalloc=False, profile_dir=None):
+        """
+        Profile future runs of the named operations.
+
+        Args:
+            operations (str | iterable): Operation names, or "*" for all.
+            cprofile (bool): Capture cProfile stats to ``profile_dir``.
+            tracemalloc (bool): Record the peak traced memory as a gauge.
+            profile_dir (str, optional): Where ``.prof`` files are written.
+        """
+        targets = True if operations == "*" else set([operations] if isinstance(operations, str) else operations)
+        self.profile_operations = targets if cprofile else set()
+        self.tracemalloc_operations = targets if tracemalloc else set()
+        if profile_dir is not None:
+            self.profile_dir = profile_dir
+
+    @contextmanager
+    def capture(self, operation, cprofile=True, tracemalloc=False):
+        """
+        Profile a block.
+
+        cProfile stats are dumped to ``<profile_dir>/<operation>-<timestamp_ns>.prof``
+        and the tracemalloc peak is stored as the ``peak_bytes`` gauge. Nested
+        captures on the same thread are ignored, since profilers cannot nest.
+        """
+        if getattr(self._profiling, "active", False):
+            yield
+            return
+        self._profiling.active = True
+        profiler = None
+        started_tracing = False
+        try:
+            if tracemalloc:
+                import tracemalloc as tracer
+                started_tracing = not tracer.is_tracing()
+                if started_tracing:
+                    tracer.start()
+                tracer.reset_peak()
+            if cprofile:
+                import cProfile
+                profiler = cProfile.Profile()
+                profiler.enable()
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{operation}-{time.time_ns()}.prof"))
+            if tracemalloc:
+                self.gauge("peak_bytes", tracer.get_traced_memory()[1], operation=operation)
+                if started_tracing:
+                    tracer.stop()
+            self._profiling.active = False
+
+    def snapshot(self):
+        """
+        Return every metric as plain JSON-serializable data.
+
+        Returns:
+            dict: ``timers`` (operation -> count, total/mean/max seconds),
+            ``counters`` and ``gauges`` (``name{label="value"}`` -> value).
+        """
+        with self._lock:
+            timers = {operation: {"count": count, "total_seconds": round(total, 6),
+                                  "mean_seconds": round(total / count, 6), "max_seconds": round(peak, 6)}
+                      for operation, (count, total, peak) in sorted(self.timers.items())}
+            counters = {name + _format_labels(key): value for (name, key), value in sorted(self.counters.items())}
+            gauges = {name + _format_labels(key): value for (name, key), value in sorted(self.gauges.items())}
+        return {"timers": timers, "counters": counters, "gauges": gauges}
+
+    def prometheus_text(self):
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            timers = sorted(self.timers.items())
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+
+        lines = []
+        if timers:
+            name = f"{PREFIX}_operation_seconds"
+            lines.append(f"# TYPE {name} summary")
+            for operation, (count, total, _) in timers:
+                labels = _format_labels((("operation", operation),))
+                lines.append(f"{name}_count{labels} {count}")
+                lines.append(f"{name}_sum{labels} {total:.6f}")
+            lines.append(f"# TYPE {PREFIX}_operation_max_seconds gauge")
+            for operation, (_, _, peak) in timers:
+                lines.append(f"{PREFIX}_operation_max_seconds{_format_labels((('operation', operation),))} {peak:.6f}")
+        for kind, samples, suffix in (("counter", counters, "_total"), ("gauge", gauges, "")):
+            declared = set()
+            for (name, key), value in samples:
+                metric = f"{PREFIX}_{name}{suffix}"
+                if metric not in declared:
+                    lines.append(f"# TYPE {metric} {kind}")
+                    declared.add(metric)
+                lines.append(f"{metric}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, file_path):
+        """Write ``snapshot()`` to a JSON file."""
+        self._write(file_path, json.dumps(self.snapshot(), indent=2) + "\n")
+
+    def write_prometheus(self, file_path):
+        """Write the metrics as a Prometheus text file (e.g. for node_exporter's textfile collector)."""
+        self._write(file_path, self.prometheus_text())
+
+    def write(self, file_path):
+        """Write Prometheus text for ``.prom`` paths, JSON otherwise."""
+        if file_path.endswith(".prom"):
+            self.write_prometheus(file_path)
+        else:
+            self.write_json(file_path)
+
+    @staticmethod
+    def _write(file_path, text):
+        # Replaced atomically, so scrapers never read a half-written file
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, mode='w') as file:
+            file.write(text)
+        os.replace(temp_path, file_path)
+
+
+metrics = Metrics()
+
+# Module-level shortcuts to the process-wide registry
+count = metrics.count
+gauge = metrics.gauge
+timed = metrics.timed
+capture = metrics.capture
+snapshot = metrics.snapshot
+
+
+def _dump_at_exit():
+    file_path = os.environ.get("EXPENSE_METRICS_FILE")
+    if file_path:
+        metrics.write(file_path)
+
+
+atexit.register(_dump_at_exit)
@@ -0,0 +1,217 @@
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+# Integer digits the vectorized parser handles; longer amounts go through Decimal
+MAX_FAST_DIGITS = 15
+# Ledgers store cents as int64
+MIN_CENTS, MAX_CENTS = -2**63, 2**63 - 1
+
+
+def parse_cents(value):
+    """
+    Convert an amount to integer cents without going through float.
+
+    Args:
+        value (str | int | float | Decimal): Amount as written in the CSV or entered by the user.
+
+    Returns:
+        int: Amount in cents, rounded half-up to the nearest cent.
+
+    Raises:
+        ValueError: If the value is not a finite number or does not fit in
+            int64 cents. Booleans are rejected rather than read as 1 and 0.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"could not convert boolean to amount: {value!r}")
+    if isinstance(value, int):
+        cents = value * 100
+    else:
+        cents = _parse_text(value)
+    if not MIN_CENTS <= cents <= MAX_CENTS:
+        raise ValueError(f"amount out of range: {value!r}")
+    return cents
+
+
+def _parse_text(value):
+    text = str(value).strip()
+    whole, dot, frac = text.partition(".")
+    # Fast path for the plain "123", "123.4" and "123.45" forms the app writes
+    digits = whole[1:] if whole[:1] == "-" else whole
+    if digits.isdigit() and (not dot or (frac.isdigit() and len(frac) <= 2)):
+        cents = int(digits) * 100 + int(frac.ljust(2, "0") or 0)
+        return -cents if whole[:1] == "-" else cents
+    try:
+        # Non-numbers, NaN, infinities and out-of-range exponents all raise here
+        return int((Decimal(text) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (ArithmeticError, ValueError):
+        raise ValueError(f"could not convert string to amount: {value!r}")
+
+
+def format_cents(cents):
+    """
+    Format integer cents as a plain decimal string (e.g. 1505 -> "15.05").
+
+    Args:
+        cents (int): Amount in cents.
+
+    Returns:
+        str: Amount with exactly two decimal places.
+    """
+    sign = "-" if cents < 0 else ""
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{frac:02d}"
+
+
+def format_money(cents):
+    """Format integer cents for display, e.g. 150550 -> "$1505.50"."""
+    return f"${format_cents(int(cents))}"
+
+
+def to_units(cents):
+    """
+    Convert cents to a float amount in currency units.
+
+    Only for output that needs a number, such as chart values and Excel
+    cells; totals must be computed on the integer cents first.
+    """
+    return cents / 100
+
+
+def parse_cents_array(values):
+    """
+    Parse many amount strings to int64 cents at once.
+
+    Plain decimals (an optional sign, digits and at most one point) are
+    parsed with array arithmetic, rounding half-up on the third decimal
+    like ``parse_cents``. Anything else (exponents, non-ASCII digits, very
+    large values) falls back to ``parse_cents`` for those rows only, so the
+    results are identical to it, including the int64 range check.
+
+    Args:
+        values (sequence): Amount strings (list, numpy or pandas values).
+
+    Returns:
+        tuple: ``(cents, valid)`` numpy arrays; ``cents`` is 0 where
+        ``valid`` is False.
+    """
+    import numpy as np
+
+    try:
+        # Encoding straight to bytes skips an intermediate unicode array
+        text = raw = np.char.strip(np.array(values, dtype="S"))
+    except UnicodeEncodeError:
+        # Only the rows that are not ASCII leave the vectorized path
+        text = np.char.strip(np.asarray(values, dtype=str))
+        ascii_rows = np.fromiter((item.isascii() for item in text.tolist()), dtype=bool, count=len(text))
+        cents = np.zeros(len(text), dtype=np.int64)
+        valid = np.zeros(len(text), dtype=bool)
+        cents[ascii_rows], valid[ascii_rows] = parse_cents_array(text[ascii_rows].astype("S"))
+        return _parse_slow(text, cents, valid, np.flatnonzero(~ascii_rows))
+    width = raw.dtype.itemsize
+    if not len(raw) or width == 0:
+        return np.zeros(len(raw), dtype=np.int64), np.zeros(len(raw), dtype=bool)
+    chars = raw.view(np.uint8).reshape(len(raw), width)
+
+    negative = chars[:, 0] == ord("-")
+    signed = negative | (chars[:, 0] == ord("+"))
+    is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+    is_dot = chars == ord(".")
+    length = (chars != 0).sum(axis=1)
+    # Position of the decimal point, or the length when there is none
+    point = np.where(is_dot.any(axis=1), is_dot.argmax(axis=1), length)
+
+    columns = np.arange(width)
+    body = (columns >= signed[:, None]) & (columns < length[:, None])
+    whole = body & (columns < point[:, None])
+    frac = body & (columns > point[:, None])
+    valid = ((is_digit | ~body | (columns == point[:, None])).all(axis=1)
+             & (is_dot.sum(axis=1) <= 1) & ((is_digit & body).any(axis=1))
+             & (whole.sum(axis=1) <= MAX_FAST_DIGITS))
+
+    digits = np.where(is_digit, chars - ord("0"), 0).astype(np.int64)
+    # Each whole digit is weighted by its power of ten counted back from the point
+    exponent = np.clip(point[:, None] - 1 - columns, 0, MAX_FAST_DIGITS - 1)
+    units = (digits * np.where(whole, 10 ** exponent, 0)).sum(axis=1)
+
+    def frac_digit(offset):
+        index = point + offset
+        inside = index < length
+        return np.where(inside, digits[np.arange(len(raw)), np.minimum(index, width - 1)], 0)
+
+    cents = units * 100 + frac_digit(1) * 10 + frac_digit(2) + (frac_digit(3) >= 5)
+    cents = np.where(negative, -cents, cents)
+    cents[~valid] = 0
+
+    # Rows the fast path cannot vouch for get the exact scalar treatment
+    leftover = ~valid & (length > 0)
+    if leftover.any():
+        return _parse_slow(text, cents, valid, np.flatnonzero(leftover))
+    return cents, valid
+
+
+def _parse_slow(text, cents, valid, rows=None):
+    for row in range(len(text)) if rows is None else rows:
+        item = text[row]
+        try:
+            cents[row] = parse_cents(item.decode() if isinstance(item, bytes) else str(item))
+        except ValueError:
+            continue
+        valid[row] = True
+    return cents, valid
+
+
+def sum_cents(cents):
+    """Return the exact sum of an int64 cents array as a Python int."""
+    import numpy as np
+
+    return int(np.asarray(cents, dtype=np.int64).sum(dtype=np.int64))
+
+
+def group_totals(codes, cents, groups):
+    """
+    Sum cents per group code, exactly.
+
+    Args:
+        codes (array): Group index of each amount, in ``range(groups)``.
+        cents (array): Amounts in cents.
+        groups (int): Number of groups.
+
+    Returns:
+        ndarray: int64 totals, one per group.
+    """
+    import numpy as np
+
+    codes = np.asarray(codes, dtype=np.intp)
+    cents = np.asarray(cents, dtype=np.int64)
+    if not cents.size:
+        return np.zeros(groups, dtype=np.int64)
+    # bincount accumulates in float64, which is exact while every partial sum stays below 2**53
+    if int(np.abs(cents).sum(dtype=np.int64)) < 2**53:
+        return np.rint(np.bincount(codes, weights=cents, minlength=groups)).astype(np.int64)
+    totals = np.zeros(groups, dtype=np.int64)
+    np.add.at(totals, codes, cents)
+    return totals
+
+
+def monthly_totals(ordinals, cents):
+    """
+    Sum cents per calendar month.
+
+    Args:
+        ordinals (array): Date ordinals (``date.toordinal``).
+        cents (array): Amounts in cents.
+
+    Returns:
+        dict: "YYYY-MM" -> total in cents, sorted by month.
+    """
+    import numpy as np
+
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if not ordinals.size:
+        return {}
+    days, day_codes = np.unique(ordinals, return_inverse=True)
+    # Only the distinct days go through datetime; rows are grouped by array index
+    months = [date.fromordinal(int(day)).strftime("%Y-%m") for day in days]
+    month_names, month_of_day = np.unique(months, return_inverse=True)
+    totals = group_totals(month_of_day[day_codes], cents, len(month_names))
+    return {str(month): int(total) for month, total in zip(month_names, totals)}
@@ -0,0 +1,265 @@
+import contextlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from excel_exporter import HEADERS, export_expenses_streaming, iter_export_rows, write_styled_sheet
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+FRAME_COLUMNS = ("Date", "Expense Name", "Category", "AmountCents")
+
+
+def read_ledger(csv_path):
+    """
+    Read the valid rows of an expense CSV into a typed DataFrame.
+
+    Rows with an unparseable date or amount are dropped, like ``load_expenses``
+    does, and journal edits are applied. Amounts are kept as integer cents in
+    an ``AmountCents`` column, and the index holds the row ids.
+
+    Args:
+        csv_path (str): Path to the expense CSV.
+
+    Returns:
+        DataFrame: Date (datetime64), Expense Name, Category, AmountCents (int64),
+        indexed by row id.
+    """
+    from ledger_cache import cache
+
+    # The typed frame is cached per file version; callers get their own copy to modify
+    return cache.get(csv_path, "ledger_frame", lambda: _read_ledger(csv_path)).copy()
+
+
+def _read_ledger(csv_path):
+    from ledger_cache import cache
+
+    # Built from the shared table, so row ids, journal edits and the date and amount
+    # rules are exactly those of every other reader
+    table = cache.table(csv_path)
+    return _frame(_columns(table, FRAME_COLUMNS), index=np.frombuffer(table.row_ids, dtype=np.int64).copy())
+
+
+def _columns(table, names):
+    """Return the requested frame columns of a table as numpy arrays (names and categories as codes)."""
+    columns = {}
+    if "Date" in names:
+        columns["Date"] = np.frombuffer(table.dates, dtype=np.int64)
+    if "Expense Name" in names:
+        columns["Expense Name"] = (np.frombuffer(table.name_codes, dtype=np.int32), table.names)
+    if "Category" in names:
+        columns["Category"] = (np.frombuffer(table.category_codes, dtype=np.int32), table.categories)
+    if "AmountCents" in names:
+        columns["AmountCents"] = np.frombuffer(table.cents, dtype=np.int64)
+    return columns
+
+
+def _frame(columns, index=None):
+    data = {}
+    if "Date" in columns:
+        data["Date"] = (columns["Date"] - EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[ns]")
+    for name in ("Expense Name", "Category"):
+        if name in columns:
+            codes, values = columns[name]
+            data[name] = np.array(values, dtype=object)[codes]
+    if "AmountCents" in columns:
+        data["AmountCents"] = columns["AmountCents"].copy()
+    return pd.DataFrame(data, index=index)
+
+
+def category_breakdown(df):
+    """
+    Build the "By Category" sheet: count, total and share per category.
+
+    Args:
+        df (DataFrame): Ledger frame from ``read_ledger``; not modified.
+
+    Returns:
+        tuple: Sheet title, header row and data rows.
+    """
+    grouped = df.groupby("Category")["AmountCents"].agg(["count", "sum"]).sort_values("sum", ascending=False)
+    grand_total = int(grouped["sum"].sum()) or 1
+    rows = [[category, int(count), int(total) / 100, round(int(total) / grand_total, 4)]
+            for category, count, total in grouped.itertuples()]
+    return "By Category", ["Category", "Count", "Total", "Share"], rows
+
+
+def monthly_pivot(df):
+    """
+    Build the "Monthly Pivot" sheet: one row per month, one column per category.
+
+    Args:
+        df (DataFrame): Ledger frame from ``read_ledger``; not modified.
+
+    Returns:
+        tuple: Sheet title, header row and data rows.
+    """
+    # Truncating to months in numpy is far cheaper than formatting every row;
+    # only the distinct months are formatted
+    months = df["Date"].to_numpy().astype("datetime64[M]")
+    pivot = df.assign(Month=months).pivot_table(index="Month", columns="Category", values="AmountCents",
+                                                aggfunc="sum", fill_value=0).sort_index()
+    categories = list(pivot.columns)
+    rows = [[month.strftime("%Y-%m")] + [int(cents) / 100 for cents in values] + [int(sum(values)) / 100]
+            for month, *values in pivot.itertuples()]
+    return "Monthly Pivot", ["Month"] + categories + ["Total"], rows
+
+
+def top_expenses(df, top_n=10):
+    """
+    Build the "Top N" sheet with the largest individual expenses.
+
+    Args:
+        df (DataFrame): Ledger frame from ``read_ledger``; not modified.
+        top_n (int): Number of rows.
+
+    Returns:
+        tuple: Sheet title, header row and data rows.
+    """
+    df = df.nlargest(top_n, "AmountCents", keep="first")
+    rows = [[day.strftime("%Y-%m-%d"), name, category, int(cents) / 100]
+            for day, name, category, cents in df[["Date", "Expense Name", "Category", "AmountCents"]].itertuples(index=False)]
+    return f"Top {top_n}", HEADERS, rows
+
+
+def _build_sheet(func, columns, *args):
+    # Runs in a worker: the frame is rebuilt from the columns the parent parsed
+    return func(_frame(columns), *args)
+
+
+def _run_tasks(tasks, workers):
+    if workers == 1:
+        return [func(*args) for func, args in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(func, *args) for func, args in tasks]
+        return [future.result() for future in futures]
+
+
+@timed("export_report")
+def build_report(csv_path, file_path="expense_report.xlsx", workers=None, top_n=10, include_rows=True):
+    """
+    Build a multi-sheet expense report, computing each sheet in a process pool.
+
+    The ledger is parsed once, in this process. The category breakdown,
+    monthly pivot and top-N aggregations then run concurrently in worker
+    processes, each sent only the parsed columns it reads, while the main
+    process streams the "Expense Summary" row sheet from the same table and
+    finally assembles everything into one workbook.
+
+    Args:
+        csv_path (str): Path to the expense CSV.
+        file_path (str): The path to save the report workbook.
+        workers (int, optional): Worker processes; defaults to the CPU count.
+            1 computes every sheet in-process from the cached ``read_ledger`` frame.
+        top_n (int): Number of rows in the top expenses sheet.
+        include_rows (bool): Also write every expense to an "Expense Summary" sheet.
+
+    Returns:
+        list: Titles of the sheets written.
+    """
+    from ledger_cache import cache
+
+    workers = workers or os.cpu_count() or 1
+    sheets = [(category_breakdown, ("Category", "AmountCents"), ()),
+              (monthly_pivot, ("Date", "Category", "AmountCents"), ()),
+              (top_expenses, FRAME_COLUMNS, (top_n,))]
+    pool = None
+    try:
+        table = cache.table(csv_path)
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(sheets)))
+            futures = [pool.submit(_build_sheet, func, _columns(table, columns), *args)
+                       for func, columns, args in sheets]
+
+        # The row sheet streams in this process while the workers aggregate
+        wb = Workbook(write_only=True)
+        if include_rows:
+            write_styled_sheet(wb, "Expense Summary", HEADERS, iter_export_rows([table]))
+        if pool:
+            results = [future.result() for future in futures]
+        else:
+            df = read_ledger(csv_path)
+            results = [func(df, *args) for func, _, args in sheets]
+        for title, headers, rows in results:
+            write_styled_sheet(wb, title, headers, rows)
+        wb.save(file_path)
+        logger.info(f"Expense report built successfully at {file_path}.")
+        print(f"Expense report built successfully at {file_path}.")
+        return [ws.title for ws in wb.worksheets]
+
+    except Exception as e:
+        logger.exception(f"Failed to build expense report: {str(e)}")
+        print(f"Error: Failed to build expense report: {str(e)}")
+        return []
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def _export_month(month, columns, file_path):
+    # Workers run silently; the parent reports the overall result
+    from expense_table import ExpenseTable
+
+    with open(os.devnull, mode='w') as devnull, contextlib.redirect_stdout(devnull):
+        export_expenses_streaming([ExpenseTable.from_columns(*columns)], file_path)
+    return month, file_path
+
+
+def _month_columns(table, rows):
+    # Only this month's rows, with the names they use re-encoded, so each worker
+    # is sent compact arrays rather than one dict per expense
+    name_codes = np.frombuffer(table.name_codes, dtype=np.int32)[rows]
+    used, local_codes = np.unique(name_codes, return_inverse=True)
+    return (np.frombuffer(table.dates, dtype=np.int64)[rows], np.frombuffer(table.cents, dtype=np.int64)[rows],
+            np.frombuffer(table.category_codes, dtype=np.int32)[rows], local_codes.astype(np.int32),
+            table.categories, [table.names[code] for code in used])
+
+
+@timed("export_monthly")
+def export_monthly_workbooks(csv_path, output_dir, workers=None):
+    """
+    Write one expense workbook per month, in parallel.
+
+    Args:
+        csv_path (str): Path to the expense CSV.
+        output_dir (str): Directory for the ``expenses_YYYY-MM.xlsx`` files.
+        workers (int, optional): Worker processes; defaults to the CPU count.
+
+    Returns:
+        dict: Month -> path of the workbook written for it.
+    """
+    from ledger_cache import cache
+
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    table = cache.table(csv_path)
+    days = np.frombuffer(table.dates, dtype=np.int64) - EPOCH_ORDINAL
+    months, month_of_row = np.unique(days.astype("datetime64[D]").astype("datetime64[M]"), return_inverse=True)
+    # Rows grouped by month, in ledger order within each month
+    order = np.argsort(month_of_row, kind="stable")
+    bounds = np.searchsorted(month_of_row[order], np.arange(len(months) + 1))
+
+    tasks = []
+    for index, month in enumerate(str(month) for month in months):
+        columns = _month_columns(table, order[bounds[index]:bounds[index + 1]])
+        tasks.append((_export_month, (month, columns, os.path.join(output_dir, f"expenses_{month}.xlsx"))))
+    try:
+        written = dict(_run_tasks(tasks, workers))
+        logger.info(f"Exported {len(written)} monthly workbook(s) to {output_dir}.")
+        print(f"Exported {len(written)} monthly workbook(s) to {output_dir}.")
+        return written
+    except Exception as e:
+        logger.exception(f"Failed to export monthly workbooks: {str(e)}")
+        print(f"Error: Failed to export monthly workbooks: {str(e)}")
+        return {}
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(filename='report_builder.log', level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    build_report('expense.csv')
@@ -0,0 +1,212 @@
+import json
+import os
+from expense_table import iter_expense_chunks, parse_cents, summarize_chunks
+from metrics import timed
+
+ROLLUP_VERSION = 1
+
+
+def sidecar_path(file_path):
+    """Return the path of the rollup sidecar stored next to ``file_path``."""
+    return f"{file_path}.rollup.json"
+
+
+def file_stamp(file_path):
+    """
+    Return the (size, mtime_ns) stamp of a file, or None if it is missing.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class ExpenseRollup:
+    """
+    Pre-aggregated grand, per-category and per-month totals for a ledger.
+
+    The rollup is persisted in a JSON sidecar next to the CSV together with
+    the CSV's size and mtime. A sidecar whose stamp no longer matches the CSV
+    is considered stale and rebuilt from a streaming pass over the file.
+    All amounts are integer cents.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.rows = 0
+        self.total_cents = 0
+        self.category_totals = {}
+        self.monthly_totals = {}
+        self.stamp = None
+
+    @classmethod
+    @timed("build_rollup")
+    def build(cls, file_path):
+        """
+        Compute the rollup from scratch with one streaming pass over the CSV.
+
+        Args:
+            file_path (str): Path to the expense CSV.
+
+        Returns:
+            ExpenseRollup: The freshly computed rollup (not yet saved).
+        """
+        rollup = cls(file_path)
+        rollup.stamp = file_stamp(file_path)
+        if rollup.stamp is None:
+            return rollup
+        summary = summarize_chunks(iter_expense_chunks(file_path))
+        rollup.rows = summary["rows"]
+        rollup.total_cents = summary["total_cents"]
+        rollup.category_totals = summary["category_totals"]
+        rollup.monthly_totals = summary["monthly_totals"]
+        return rollup
+
+    @classmethod
+    def read(cls, file_path):
+        """
+        Read the sidecar without checking it against the CSV.
+
+        Returns:
+            ExpenseRollup: The stored rollup, or None if there is no usable sidecar.
+        """
+        try:
+            with open(sidecar_path(file_path), mode='r') as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get("version") != ROLLUP_VERSION:
+            return None
+        rollup = cls(file_path)
+        rollup.rows = data["rows"]
+        rollup.total_cents = data["total_cents"]
+        rollup.category_totals = data["category_totals"]
+        rollup.monthly_totals = data["monthly_totals"]
+        rollup.stamp = tuple(data["stamp"]) if data["stamp"] else None
+        return rollup
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load the sidecar if it matches the CSV, otherwise rebuild and save it.
+
+        Args:
+            file_path (str): Path to the expense CSV.
+
+        Returns:
+            ExpenseRollup: An up-to-date rollup.
+        """
+        rollup = cls.read(file_path)
+        if rollup is not None and rollup.stamp == file_stamp(file_path):
+            return rollup
+        rollup = cls.build(file_path)
+        if rollup.stamp is not None:
+            rollup.save()
+        return rollup
+
+    def save(self):
+        """Atomically write the rollup to its sidecar file."""
+        data = {
+            "version": ROLLUP_VERSION,
+            "stamp": list(self.stamp) if self.stamp else None,
+            "rows": self.rows,
+            "total_cents": self.total_cents,
+            "category_totals": self.category_totals,
+            "monthly_totals": dict(sorted(self.monthly_totals.items())),
+        }
+        path = sidecar_path(self.file_path)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, mode='w') as file:
+            json.dump(data, file)
+        os.replace(temp_path, path)
+
+    def restamp(self):
+        """Record the CSV's current size and mtime as the state this rollup describes."""
+        self.stamp = file_stamp(self.file_path)
+
+    def add(self, date, category, amount, count=1):
+        """
+        Add one expense to the totals in O(1).
+
+        Args:
+            date (str): Date in YYYY-MM-DD format.
+            category (str): Category of the expense.
+            amount (str | float): Amount of the expense.
+            count (int): 1 to add the expense, -1 to remove it.
+        """
+        cents = parse_cents(amount) * count
+        month = date[:7]
+        self.rows += count
+        self.total_cents += cents
+        self.category_totals[category] = self.category_totals.get(category, 0) + cents
+        self.monthly_totals[month] = self.monthly_totals.get(month, 0) + cents
+        for totals, key in ((self.category_totals, category), (self.monthly_totals, month)):
+            if totals[key] == 0 and count < 0:
+                del totals[key]
+
+    def remove(self, date, category, amount):
+        """Subtract one expense from the totals in O(1)."""
+        self.add(date, category, amount, count=-1)
+
+    def replace(self, old, new):
+        """
+        Apply an edit as a remove/add delta.
+
+        Args:
+            old (dict): Expense row before the edit.
+            new (dict): Expense row after the edit.
+        """
+        self.remove(old["Date"], old["Category"], old["Amount"])
+        self.add(new["Date"], new["Category"], new["Amount"])
+
+
+def record_append(file_path, stamp_before, date, category, amount):
+    """
+    Fold a row just appended to ``file_path`` into its rollup sidecar.
+
+    The sidecar is only updated if it described the file exactly as it was
+    before the append; otherwise it is removed so the next reader rebuilds it.
+
+    Args:
+        file_path (str): Path to the expense CSV.
+        stamp_before (tuple): ``file_stamp`` taken before the append.
+        date (str): Date of the appended expense.
+        category (str): Category of the appended expense.
+        amount (str | float): Amount of the appended expense.
+    """
+    record_appends(file_path, stamp_before, [(date, category, amount)])
+
+
+def record_appends(file_path, stamp_before, rows):
+    """
+    Fold a batch of rows just appended to ``file_path`` into its rollup sidecar.
+
+    Args:
+        file_path (str): Path to the expense CSV.
+        stamp_before (tuple): ``file_stamp`` taken before the append.
+        rows (iterable): ``(date, category, amount)`` tuples that were appended.
+    """
+    rollup = ExpenseRollup.read(file_path)
+    if rollup is None:
+        return
+    if rollup.stamp != stamp_before:
+        invalidate(file_path)
+        return
+    for date, category, amount in rows:
+        rollup.add(date, category, amount)
+    rollup.restamp()
+    rollup.save()
+
+
+def invalidate(file_path):
+    """
+    Remove the rollup sidecar of ``file_path`` so the next reader rebuilds it.
+
+    Args:
+        file_path (str): Path to the expense CSV.
+    """
+    try:
+        os.remove(sidecar_path(file_path))
+    except FileNotFoundError:
+        pass
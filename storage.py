@@ -0,0 +1,456 @@
+import csv
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from expense_table import ExpenseTable, format_cents, parse_cents
+from rollup import ExpenseRollup
+
+
+class StorageBackend:
+    """
+    Interface for expense persistence.
+
+    ``expense.load_expenses`` and ``expense.add_expense`` dispatch to a
+    backend chosen from the file extension (see ``get_backend``); plain
+    ``.csv`` paths keep using the built-in CSV code.
+    """
+
+    # Backends that hold an open connection set this; get_backend then
+    # returns one shared instance per file instead of a new one per call
+    shared = False
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def close(self):
+        """Release any resources held by the backend."""
+
+    def load(self):
+        """
+        Load every expense.
+
+        Returns:
+            ExpenseTable: All stored expenses.
+        """
+        raise NotImplementedError
+
+    def load_records(self):
+        """Return every expense as a list of row dictionaries."""
+        return self.load().to_records()
+
+    def append(self, date, name, category, amount):
+        """Append one expense."""
+        self.append_many([(date, name, category, amount)])
+
+    def append_many(self, rows):
+        """
+        Append several expenses.
+
+        Args:
+            rows (iterable): ``(date, name, category, amount)`` tuples.
+        """
+        raise NotImplementedError
+
+
+class CsvBackend(StorageBackend):
+    """The text CSV format used by ``expense.csv``."""
+
+    def load(self):
+        # Parsed once per file version; the shared table must not be modified
+        from ledger_cache import cache
+        return cache.table(self.file_path)
+
+    def append_many(self, rows):
+        from expense import locked_append
+
+        with locked_append(self.file_path) as file:
+            writer = csv.writer(file)
+            if os.fstat(file.fileno()).st_size == 0:
+                writer.writerow(["Date", "Expense Name", "Category", "Amount"])
+            writer.writerows(rows)
+
+
+class BinaryLedgerBackend(StorageBackend):
+    """
+    Append-only binary ledger with fixed-width records and a string table.
+
+    ``<path>`` holds a 16-byte header followed by 20-byte little-endian
+    records ``(cents int64, date ordinal int32, category id int32, name id
+    int32)``. ``<path>.strings`` holds one JSON ``[kind, text]`` pair per
+    line, where kind is ``"c"`` (category) or ``"n"`` (name) and ids count
+    up per kind. Strings are written before the records that reference
+    them, so a torn write never leaves a dangling id; a trailing partial
+    record is ignored on read. A ledger expects a single writer process.
+    """
+
+    MAGIC = b"EXPLEDG1"
+    HEADER = struct.Struct("<8sQ")
+    RECORD = struct.Struct("<qiii")
+    # numpy is imported on first use so CSV-only callers never pay for it
+    RECORD_FIELDS = [("cents", "<i8"), ("date", "<i4"), ("category", "<i4"), ("name", "<i4")]
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self.strings_path = f"{file_path}.strings"
+        self.categories = []
+        self.names = []
+        self._lookup = {"c": {}, "n": {}}
+        self._strings_size = 0
+
+    def _read_strings(self):
+        try:
+            size = os.path.getsize(self.strings_path)
+        except FileNotFoundError:
+            return
+        if size == self._strings_size:
+            return
+        with open(self.strings_path, mode='r', encoding='utf-8') as file:
+            file.seek(self._strings_size)
+            for line in file:
+                if not line.endswith("\n"):
+                    break
+                kind, text = json.loads(line)
+                values = self.categories if kind == "c" else self.names
+                self._lookup[kind][text] = len(values)
+                values.append(text)
+                self._strings_size += len(line.encode('utf-8'))
+
+    def view(self):
+        """
+        Map the record file into memory without copying it.
+
+        Returns:
+            numpy.ndarray: Structured array of records backed by an ``mmap``,
+            or an empty array if the ledger has no records.
+        """
+        import numpy as np
+        dtype = np.dtype(self.RECORD_FIELDS)
+        try:
+            size = os.path.getsize(self.file_path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=dtype)
+        count = (size - self.HEADER.size) // self.RECORD.size
+        if count <= 0:
+            return np.empty(0, dtype=dtype)
+        with open(self.file_path, mode='rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _ = self.HEADER.unpack_from(mapped)
+        if magic != self.MAGIC:
+            raise ValueError(f"{self.file_path} is not an expense ledger")
+        return np.frombuffer(mapped, dtype=dtype, count=count, offset=self.HEADER.size)
+
+    def load(self):
+        import numpy as np
+        self._read_strings()
+        records = self.view()
+        return ExpenseTable.from_columns(
+            records["date"].astype(np.int64), records["cents"].astype(np.int64),
+            records["category"].astype(np.int32), records["name"].astype(np.int32),
+            self.categories, self.names,
+        )
+
+    def _intern(self, kind, text, pending):
+        lookup = self._lookup[kind]
+        code = lookup.get(text)
+        if code is None:
+            values = self.categories if kind == "c" else self.names
+            code = len(values)
+            values.append(text)
+            lookup[text] = code
+            pending.append(json.dumps([kind, text]) + "\n")
+        return code
+
+    def append_table(self, table):
+        """
+        Append every row of an ExpenseTable, encoding whole columns at once.
+
+        Args:
+            table (ExpenseTable): Expenses to append.
+        """
+        import numpy as np
+        self._read_strings()
+        pending_strings = []
+        dtype = np.dtype(self.RECORD_FIELDS)
+        category_map = np.array([self._intern("c", text, pending_strings) for text in table.categories] or [0], dtype=np.int32)
+        name_map = np.array([self._intern("n", text, pending_strings) for text in table.names] or [0], dtype=np.int32)
+        records = np.empty(len(table), dtype=dtype)
+        records["cents"] = np.frombuffer(table.cents, dtype=np.int64)
+        records["date"] = np.frombuffer(table.dates, dtype=np.int64)
+        records["category"] = category_map[np.frombuffer(table.category_codes, dtype=np.int32)]
+        records["name"] = name_map[np.frombuffer(table.name_codes, dtype=np.int32)]
+        self._write(pending_strings, records.tobytes())
+
+    def append_many(self, rows):
+        self._read_strings()
+        pending_strings = []
+        records = bytearray()
+        # Parse dates and amounts the same way the CSV loader does
+        parsed = ExpenseTable()
+        for date, name, category, amount in rows:
+            parsed.append(date, name, category, amount)
+            records += self.RECORD.pack(parsed.cents[-1], parsed.dates[-1],
+                                        self._intern("c", category, pending_strings),
+                                        self._intern("n", name, pending_strings))
+        self._write(pending_strings, records)
+
+    def _write(self, pending_strings, records):
+        if pending_strings:
+            data = "".join(pending_strings).encode('utf-8')
+            with open(self.strings_path, mode='ab') as file:
+                file.write(data)
+            self._strings_size += len(data)
+
+        exists = os.path.exists(self.file_path) and os.path.getsize(self.file_path) >= self.HEADER.size
+        with open(self.file_path, mode='ab') as file:
+            if not exists:
+                file.write(self.HEADER.pack(self.MAGIC, 0))
+            file.write(records)
+
+
+class SqliteBackend(StorageBackend):
+    """
+    SQLite store with indexes on Date and Category.
+
+    Rows keep a stable integer ``id`` so edits and deletes touch a single
+    row. Dates are stored as YYYY-MM-DD text (which sorts chronologically)
+    and amounts as integer cents; filters and aggregates run inside SQLite.
+
+    Opening a connection sets WAL mode and applies the schema, so
+    ``get_backend`` keeps one instance (and connection) per database file.
+    """
+
+    shared = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount_cents INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date);
+        CREATE INDEX IF NOT EXISTS idx_expenses_category_date ON expenses (category, date);
+    """
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        # The GUI hands the store to a worker thread; callers serialize access
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+        self.stat = os.stat(file_path)
+
+    def close(self):
+        _forget_backend(self)
+        self.connection.close()
+
+    def load(self):
+        table = ExpenseTable()
+        for date, name, category, cents in self.connection.execute(
+                "SELECT date, name, category, amount_cents FROM expenses ORDER BY id"):
+            table.append(date, name, category, format_cents(cents))
+        return table
+
+    def rows(self):
+        """
+        Return every expense with its row id, in insertion order.
+
+        Returns:
+            list: ``(id, expense dict)`` pairs.
+        """
+        return [(row_id, self._record(date, name, category, cents)) for row_id, date, name, category, cents
+                in self.connection.execute("SELECT id, date, name, category, amount_cents FROM expenses ORDER BY id")]
+
+    def append_many(self, rows):
+        parsed = ExpenseTable()
+        values = []
+        for date, name, category, amount in rows:
+            parsed.append(date, name, category, amount)
+            values.append((parsed.date_text(-1), name, category, parsed.cents[-1]))
+        # One transaction per batch instead of one per row
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO expenses (date, name, category, amount_cents) VALUES (?, ?, ?, ?)", values)
+
+    def update(self, row_id, name, category, amount):
+        """Change the name, category and amount of one expense."""
+        with self.connection:
+            self.connection.execute("UPDATE expenses SET name = ?, category = ?, amount_cents = ? WHERE id = ?",
+                                    (name, category, parse_cents(amount), row_id))
+
+    def delete(self, row_id):
+        """Delete one expense."""
+        with self.connection:
+            self.connection.execute("DELETE FROM expenses WHERE id = ?", (row_id,))
+
+    @staticmethod
+    def _where(start, end, categories, name_contains=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(end)
+        if categories:
+            clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if name_contains:
+            clauses.append("instr(lower(name), ?) > 0")
+            params.append(name_contains.lower())
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @staticmethod
+    def _record(date, name, category, cents):
+        return {"Date": date, "Expense Name": name, "Category": category, "Amount": format_cents(cents)}
+
+    def query(self, start=None, end=None, categories=None, name_contains=None):
+        """
+        Return the expenses in a date range and/or set of categories.
+
+        Args:
+            start (str, optional): First date (inclusive), YYYY-MM-DD.
+            end (str, optional): Last date (inclusive), YYYY-MM-DD.
+            categories (list, optional): Categories to keep.
+            name_contains (str, optional): Case-insensitive substring of the name.
+
+        Returns:
+            list: ``(id, expense dict)`` pairs ordered by date.
+        """
+        where, params = self._where(start, end, categories, name_contains)
+        cursor = self.connection.execute(
+            f"SELECT id, date, name, category, amount_cents FROM expenses{where} ORDER BY date, id", params)
+        return [(row_id, self._record(date, name, category, cents)) for row_id, date, name, category, cents in cursor]
+
+    def total_cents(self, start=None, end=None, categories=None):
+        """Return the summed amount in cents of the matching expenses."""
+        where, params = self._where(start, end, categories)
+        return self.connection.execute(f"SELECT COALESCE(SUM(amount_cents), 0) FROM expenses{where}", params).fetchone()[0]
+
+    def category_totals(self, start=None, end=None):
+        """Return category -> total cents for the matching expenses."""
+        where, params = self._where(start, end, None)
+        return dict(self.connection.execute(
+            f"SELECT category, SUM(amount_cents) FROM expenses{where} GROUP BY category ORDER BY category", params))
+
+    def monthly_totals(self, start=None, end=None, categories=None):
+        """Return "YYYY-MM" -> total cents for the matching expenses."""
+        where, params = self._where(start, end, categories)
+        return dict(self.connection.execute(
+            f"SELECT substr(date, 1, 7) AS month, SUM(amount_cents) FROM expenses{where} GROUP BY month ORDER BY month",
+            params))
+
+    def summary(self):
+        """
+        Compute grand, category and monthly totals in SQL.
+
+        Returns:
+            ExpenseRollup: Totals in the same shape as the CSV rollup sidecar.
+        """
+        rollup = ExpenseRollup(self.file_path)
+        rollup.rows = self.connection.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+        rollup.total_cents = self.total_cents()
+        rollup.category_totals = self.category_totals()
+        rollup.monthly_totals = self.monthly_totals()
+        return rollup
+
+
+BACKENDS = {
+    ".csv": CsvBackend,
+    ".ledger": BinaryLedgerBackend,
+    ".db": SqliteBackend,
+    ".sqlite": SqliteBackend,
+    ".sqlite3": SqliteBackend,
+}
+
+
+def get_backend(file_path):
+    """
+    Return the storage backend for a path, chosen by file extension.
+
+    Unknown extensions fall back to CSV.
+
+    Args:
+        file_path (str): Path to the expense store.
+
+    Returns:
+        StorageBackend: Backend instance bound to ``file_path``.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    backend_class = BACKENDS.get(extension, CsvBackend)
+    if not backend_class.shared:
+        return backend_class(file_path)
+
+    key = os.path.abspath(file_path)
+    with _shared_lock:
+        backend = _shared_backends.get(key)
+        if backend is not None and not _same_file(backend, key):
+            # The file was deleted or replaced; the old connection points at the old one
+            del _shared_backends[key]
+            backend.connection.close()
+            backend = None
+        if backend is None:
+            backend = _shared_backends[key] = backend_class(file_path)
+    return backend
+
+
+_shared_backends = {}
+_shared_lock = threading.Lock()
+
+
+def _same_file(backend, path):
+    try:
+        return os.path.samestat(backend.stat, os.stat(path))
+    except FileNotFoundError:
+        return False
+
+
+def _forget_backend(backend):
+    with _shared_lock:
+        key = os.path.abspath(backend.file_path)
+        if _shared_backends.get(key) is backend:
+            del _shared_backends[key]
+
+
+def import_csv(csv_path, target_path):
+    """
+    Copy every valid expense of a CSV file into another store.
+
+    Args:
+        csv_path (str): Source CSV file.
+        target_path (str): Destination store, e.g. ``expense.ledger``.
+
+    Returns:
+        int: Number of expenses imported.
+    """
+    table = ExpenseTable.from_csv(csv_path)
+    backend = get_backend(target_path)
+    if isinstance(backend, BinaryLedgerBackend):
+        backend.append_table(table)
+    else:
+        backend.append_many((row["Date"], row["Expense Name"], row["Category"], row["Amount"]) for row in table)
+    return len(table)
+
+
+def export_csv(source_path, csv_path):
+    """
+    Write every expense of a store to a new CSV file.
+
+    Args:
+        source_path (str): Source store, e.g. ``expense.ledger``.
+        csv_path (str): Destination CSV file (overwritten).
+
+    Returns:
+        int: Number of expenses exported.
+    """
+    table = get_backend(source_path).load()
+    with open(csv_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["Date", "Expense Name", "Category", "Amount"])
+        for row in table:
+            writer.writerow([row["Date"], row["Expense Name"], row["Category"], row["Amount"]])
+    return len(table)
@@ -0,0 +1,100 @@
+import itertools
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskExecutor:
+    """
+    Run blocking work off the Tk main loop and deliver results back onto it.
+
+    Tasks run in a thread pool; their results, errors and progress reports
+    are queued and dispatched from a ``root.after`` poll, so callbacks
+    always run on the UI thread and may touch widgets.
+
+    Tasks submitted with a ``key`` coalesce: a newer task with the same key
+    cancels an older one that has not started yet, and the result of an
+    older one that is already running is dropped.
+    """
+
+    def __init__(self, root, max_workers=2, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="expense-task")
+        self._events = queue.Queue()
+        self._latest = {}
+        self._pending = {}
+        self._ids = itertools.count()
+        self._closed = False
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, func, *args, on_done=None, on_error=None, on_progress=None, key=None):
+        """
+        Run ``func(*args)`` in the background.
+
+        Args:
+            func (callable): Work to run on a worker thread.
+            *args: Positional arguments for ``func``.
+            on_done (callable, optional): Called on the UI thread with the result.
+            on_error (callable, optional): Called on the UI thread with the exception.
+            on_progress (callable, optional): When given, ``func`` also receives a
+                ``progress`` keyword callback; each call is forwarded to
+                ``on_progress`` on the UI thread.
+            key (str, optional): Coalescing key, e.g. ``"refresh"``.
+
+        Returns:
+            Future: The scheduled task.
+        """
+        task_id = next(self._ids)
+        if key is not None:
+            self._latest[key] = task_id
+            previous = self._pending.pop(key, None)
+            if previous is not None:
+                previous.cancel()
+
+        kwargs = {}
+        if on_progress is not None:
+            kwargs["progress"] = lambda *report: self._events.put(("progress", on_progress, report))
+
+        def run():
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._events.put(("error", (task_id, key, on_error), e))
+            else:
+                self._events.put(("done", (task_id, key, on_done), result))
+
+        future = self._pool.submit(run)
+        if key is not None:
+            self._pending[key] = future
+        return future
+
+    def is_stale(self, task_id, key):
+        return key is not None and self._latest.get(key) != task_id
+
+    def _poll(self):
+        if self._closed:
+            return
+        # Reschedule first so an exception in a callback does not stop delivery
+        self.root.after(self.poll_ms, self._poll)
+        while True:
+            try:
+                kind, target, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                target(*payload)
+                continue
+            task_id, key, callback = target
+            if self.is_stale(task_id, key):
+                continue
+            if key is not None:
+                self._pending.pop(key, None)
+            if callback is not None:
+                callback(payload)
+            elif kind == "error":
+                raise payload
+
+    def shutdown(self):
+        """Stop polling and let running tasks finish; queued tasks are cancelled."""
+        self._closed = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from expenseTracker import cli
+
+
+def _run(capsys, *argv):
+    status = cli(list(argv))
+    return status, json.loads(capsys.readouterr().out)
+
+
+@pytest.mark.parametrize("allow", [False, True])
+def test_import_and_validate_share_the_category_policy(tmp_path, capsys, allow):
+    source = tmp_path / "new.csv"
+    source.write_text("Date,Expense Name,Category,Amount\n2024-01-01,a,Food,1.00\n2024-01-02,b,Gifts,2.00\n")
+    ledger = str(tmp_path / "expense.csv")
+    flags = ["--allow-unknown-categories"] if allow else []
+
+    _, validated = _run(capsys, "validate", str(source), "--workers", "1", *flags)
+    _, imported = _run(capsys, "import", str(source), "--ledger", ledger, "--workers", "1", *flags)
+
+    assert validated["valid"] is allow
+    assert imported["written"] == (2 if allow else 1)
+    assert imported["skipped"] == (0 if allow else 1)
+    if not allow:
+        assert validated["files"][0]["reasons"] == {"unknown category": 1}
@@ -0,0 +1,74 @@
+import gc
+import os
+import weakref
+from collections import OrderedDict
+
+import pytest
+
+import expense
+from expense import add_expense, add_expenses
+from expense_table import ExpenseTable
+from rollup import ExpenseRollup, sidecar_path
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    file_path = str(tmp_path / "expense.csv")
+    with open(file_path, mode='w', newline='') as file:
+        file.write("Date,Expense Name,Category,Amount\n2024-01-01,a,Food,1.00\n")
+    ExpenseRollup.load(file_path)
+    return file_path
+
+
+def _fail(*args):
+    raise OSError("disk full")
+
+
+@pytest.mark.parametrize("append", [
+    lambda file_path: add_expense(file_path, "2024-01-02", "b", "Rent", "2.50"),
+    lambda file_path: add_expenses(file_path, [("2024-01-02", "b", "Rent", "2.50")]),
+])
+def test_rollup_failure_after_the_write_still_reports_success(ledger, monkeypatch, capsys, append):
+    monkeypatch.setattr(expense, "record_appends", _fail)
+    append(ledger)
+
+    output = capsys.readouterr().out
+    assert "added successfully" in output
+    assert "Could not write" not in output
+    assert len(ExpenseTable.from_csv(ledger)) == 2
+    # The sidecar was dropped and is rebuilt with the new row
+    assert not os.path.exists(sidecar_path(ledger))
+    assert ExpenseRollup.load(ledger).total_cents == 350
+
+
+def test_successful_append_keeps_the_rollup_current(ledger):
+    add_expense(ledger, "2024-01-02", "b", "Rent", "2.50")
+    rollup = ExpenseRollup.read(ledger)
+    assert rollup is not None and rollup.total_cents == 350
+
+
+def test_query_keeps_loaders_for_recent_ledgers_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(expense, "MAX_QUERY_LOADERS", 2)
+    monkeypatch.setattr(expense, "_query_loaders", OrderedDict())
+    paths = []
+    for name in ("a", "b", "c"):
+        file_path = str(tmp_path / f"{name}.csv")
+        with open(file_path, mode='w', newline='') as file:
+            file.write(f"Date,Expense Name,Category,Amount\n2024-01-01,{name},Food,1.00\n")
+        paths.append(file_path)
+
+    assert expense.query(paths[0]).total_cents() == 100
+    first = weakref.ref(expense._query_loaders[os.path.abspath(paths[0])])
+    expense.query(paths[1])
+    second = weakref.ref(expense._query_loaders[os.path.abspath(paths[1])].table)
+    expense.query(paths[0])
+    expense.query(paths[2])
+    # The least recently queried ledger is dropped, with its table
+    assert list(expense._query_loaders) == [os.path.abspath(paths[0]), os.path.abspath(paths[2])]
+    gc.collect()
+    assert second() is None
+    assert first() is expense._query_loaders[os.path.abspath(paths[0])]
+
+    add_expense(paths[0], "2024-01-02", "b", "Rent", "2.50")
+    assert expense.query(paths[0]).total_cents() == 350
+    assert first().last_refresh == "append"
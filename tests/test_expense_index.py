@@ -0,0 +1,129 @@
+import gc
+import random
+import weakref
+from datetime import date, timedelta
+
+import pytest
+
+import expense_index
+from expense_index import ExpenseIndex
+from expense_table import ExpenseTable
+
+CATEGORIES = ["Food", "Rent", "Utilities", "Transportation"]
+NAMES = ["Lunch", "Dinner", "Bus", "Power", "lunch box"]
+START = date(2024, 1, 1)
+
+
+def _append_random(table, rng, rows, days):
+    for _ in range(rows):
+        day = START + timedelta(days=rng.randrange(days))
+        table.append(day.isoformat(), rng.choice(NAMES), rng.choice(CATEGORIES), f"{rng.randrange(-500, 50_000) / 100:.2f}")
+
+
+def _scan(table, start=None, end=None, categories=None, name_contains=None):
+    # Brute force: every row checked, kept in date order then table order
+    positions = []
+    for position in range(len(table)):
+        row = table.row(position)
+        if start is not None and row["Date"] < start:
+            continue
+        if end is not None and row["Date"] > end:
+            continue
+        if categories is not None and row["Category"] not in categories:
+            continue
+        if name_contains and name_contains.lower() not in row["Expense Name"].lower():
+            continue
+        positions.append(position)
+    return sorted(positions, key=lambda position: (table.dates[position], position))
+
+
+def _summary(result):
+    return (list(result.positions), len(result), result.total_cents(), result.category_totals(),
+            result.monthly_totals())
+
+
+def _expected(table, positions):
+    category_totals, monthly = {}, {}
+    for position in positions:
+        category = table.categories[table.category_codes[position]]
+        category_totals[category] = category_totals.get(category, 0) + table.cents[position]
+        month = table.date_text(position)[:7]
+        monthly[month] = monthly.get(month, 0) + table.cents[position]
+    return (positions, len(positions), sum(table.cents[position] for position in positions),
+            dict(sorted(category_totals.items())), dict(sorted(monthly.items())))
+
+
+QUERIES = [
+    {},
+    {"start": "2024-02-10", "end": "2024-03-05"},
+    {"end": "2024-01-31"},
+    {"start": "2024-04-01"},
+    {"categories": ["Rent"]},
+    {"categories": ["Food", "Utilities", "Unknown"]},
+    {"start": "2024-01-15", "categories": ["Transportation", "Food"]},
+    {"name_contains": "LUNCH"},
+    {"start": "2024-02-01", "end": "2024-02-29", "categories": ["Food"], "name_contains": "lunch"},
+    {"start": "2024-03-01", "end": "2024-02-01"},
+]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merged_index_matches_a_fresh_index_and_a_scan(seed):
+    rng = random.Random(seed)
+    table = ExpenseTable()
+    _append_random(table, rng, 200, 60)
+    index = ExpenseIndex.for_table(table)
+    index.query()
+    for days in (60, 120, 30, 120):
+        # Batches spread over the whole range, so most of them are back-dated
+        _append_random(table, rng, rng.randrange(1, 80), days)
+        # The index only holds its table weakly, so the copy is kept alive here
+        snapshot = table.copy()
+        fresh = ExpenseIndex(snapshot)
+        for kwargs in QUERIES:
+            merged = _summary(index.query(**kwargs))
+            assert merged == _summary(fresh.query(**kwargs)), kwargs
+            assert merged == _expected(table, _scan(table, **kwargs)), kwargs
+    assert ExpenseIndex.for_table(table) is index
+
+
+def test_back_dated_rows_sort_after_rows_of_the_same_date():
+    table = ExpenseTable()
+    for day in ("2024-01-01", "2024-01-02", "2024-01-03"):
+        table.append(day, "old", "Food", "1.00")
+    index = ExpenseIndex.for_table(table)
+    table.append("2024-01-02", "new", "Food", "2.00")
+    table.append("2023-12-31", "earliest", "Rent", "3.00")
+    result = index.query()
+    assert [row["Expense Name"] for row in result] == ["earliest", "old", "old", "new", "old"]
+    assert list(result.positions) == [4, 0, 1, 3, 2]
+    assert index.query(start="2024-01-02", end="2024-01-02").total_cents() == 300
+
+
+def test_edits_rebuild_the_index():
+    table = ExpenseTable()
+    for day in ("2024-01-01", "2024-01-02", "2024-01-03"):
+        table.append(day, "x", "Food", "1.00")
+    index = ExpenseIndex.for_table(table)
+    assert index.query(categories=["Food"]).total_cents() == 300
+
+    table.replace_row(1, "2024-02-01", "y", "Rent", "5.00")
+    assert index.query(categories=["Rent"]).total_cents() == 500
+    assert index.query().monthly_totals() == {"2024-01": 200, "2024-02": 500}
+    table.remove_row(0)
+    result = index.query()
+    assert list(result.positions) == [1, 0]
+    assert result.total_cents() == 600
+
+
+def test_cached_index_does_not_keep_its_table_alive():
+    table = ExpenseTable()
+    table.append("2024-01-01", "x", "Food", "1.00")
+    index = ExpenseIndex.for_table(table)
+    assert expense_index._indexes.get(table) is index
+    table_ref, index_ref = weakref.ref(table), weakref.ref(index)
+
+    del table, index
+    gc.collect()
+    assert table_ref() is None
+    assert index_ref() is None
@@ -0,0 +1,152 @@
+import os
+
+import pytest
+
+from expense_table import ExpenseTable, IncrementalExpenseLoader
+from journal import EditJournal
+
+HEADER = "Date,Expense Name,Category,Amount\n"
+
+
+def _line(day, name="x", category="Food", amount="1.00"):
+    return f"2024-01-{day:02d},{name},{category},{amount}\n"
+
+
+def _write(path, text, mode="w"):
+    with open(path, mode=mode, newline='') as file:
+        file.write(text)
+
+
+def _names(table):
+    return [record["Expense Name"] for record in table]
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    file_path = str(tmp_path / "expense.csv")
+    _write(file_path, HEADER + _line(1, "a") + _line(2, "b"))
+    return file_path
+
+
+def test_appends_are_tailed_from_the_last_offset(ledger):
+    loader = IncrementalExpenseLoader(ledger)
+    assert len(loader.refresh()) == 2
+    assert loader.last_refresh == "reload"
+    assert loader._offset == os.path.getsize(ledger)
+
+    _write(ledger, _line(3, "c") + _line(4, "d"), mode="a")
+    table = loader.refresh()
+    assert loader.last_refresh == "append"
+    assert loader.appended_from == 2
+    assert _names(table) == ["a", "b", "c", "d"]
+    assert loader._offset == os.path.getsize(ledger)
+
+    loader.refresh()
+    assert loader.last_refresh == "unchanged"
+    assert loader.appended_from == 4
+
+
+def test_partial_last_line_waits_for_its_line_break(ledger):
+    loader = IncrementalExpenseLoader(ledger)
+    loader.refresh()
+    _write(ledger, "2024-01-03,c,Fo", mode="a")
+    assert _names(loader.refresh()) == ["a", "b"]
+    assert loader._offset < os.path.getsize(ledger)
+
+    _write(ledger, "od,3.00\n", mode="a")
+    assert _names(loader.refresh()) == ["a", "b", "c"]
+    assert loader.last_refresh == "append"
+
+
+def test_blank_lines_are_skipped_and_take_no_row_id(ledger):
+    loader = IncrementalExpenseLoader(ledger)
+    loader.refresh()
+    # The empty line is no record; the whitespace-only one is an invalid record and uses an id
+    _write(ledger, "\n" + _line(3, "c") + "   \n" + _line(4, "d"), mode="a")
+    table = loader.refresh()
+    assert loader.last_refresh == "append"
+    assert _names(table) == ["a", "b", "c", "d"]
+    assert list(table.row_ids) == [0, 1, 2, 4]
+    assert table.invalid_rows == 1
+    # A full parse numbers the rows the same way
+    assert list(ExpenseTable.from_csv(ledger).row_ids) == [0, 1, 2, 4]
+
+
+def test_truncation_reloads(ledger):
+    loader = IncrementalExpenseLoader(ledger)
+    loader.refresh()
+    _write(ledger, HEADER + _line(9, "z"))
+    assert _names(loader.refresh()) == ["z"]
+    assert loader.last_refresh == "reload"
+
+
+def test_rewrite_of_the_tail_is_detected_by_its_signature(ledger):
+    loader = IncrementalExpenseLoader(ledger)
+    loader.refresh()
+    # Same prefix length but different bytes before the old offset, then the file grows
+    with open(ledger, mode="r+", newline='') as file:
+        file.seek(os.path.getsize(ledger) - len(_line(2, "b")))
+        file.write(_line(2, "B") + _line(3, "c"))
+    assert _names(loader.refresh()) == ["a", "B", "c"]
+    assert loader.last_refresh == "reload"
+
+
+def test_same_size_rewrite_reloads(ledger):
+    loader = IncrementalExpenseLoader(ledger)
+    loader.refresh()
+    stat = os.stat(ledger)
+    _write(ledger, HEADER + _line(1, "a") + _line(2, "c"))
+    os.utime(ledger, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert _names(loader.refresh()) == ["a", "c"]
+    assert loader.last_refresh == "reload"
+
+
+def test_rotation_to_a_new_inode_reloads(ledger, tmp_path):
+    loader = IncrementalExpenseLoader(ledger)
+    loader.refresh()
+    # Identical bytes up to the old offset, so only the inode check can tell
+    rotated = str(tmp_path / "rotated.csv")
+    with open(ledger, mode="rb") as file:
+        _write(rotated, file.read().decode() + _line(3, "c"))
+    os.replace(rotated, ledger)
+
+    assert _names(loader.refresh()) == ["a", "b", "c"]
+    assert loader.last_refresh == "reload"
+
+
+def test_missing_file_resets(ledger):
+    loader = IncrementalExpenseLoader(ledger)
+    loader.refresh()
+    os.remove(ledger)
+    assert len(loader.refresh()) == 0
+    _write(ledger, HEADER + _line(5, "e"))
+    assert _names(loader.refresh()) == ["e"]
+
+
+def test_snapshots_stay_fixed_and_appends_copy_only_new_rows(ledger):
+    loader = IncrementalExpenseLoader(ledger)
+    loader.refresh()
+    first = loader.snapshot()
+
+    _write(ledger, _line(3, "c", "Travel"), mode="a")
+    loader.refresh()
+    second = loader.snapshot()
+    # The append grew the shared copy; the earlier snapshot still ends where it did
+    assert second._table is first._table
+    assert _names(first) == ["a", "b"] and len(first) == 2
+    assert _names(second) == ["a", "b", "c"] and second[2]["Category"] == "Travel"
+    assert second.find(2) == 2
+    with pytest.raises(KeyError):
+        first.find(2)
+    with pytest.raises(IndexError):
+        first[2]
+
+    table = loader.table
+    EditJournal(ledger).amend(table.row_ids[0], table[0], {**table[0], "Expense Name": "A"}, table.base)
+    loader.refresh()
+    third = loader.snapshot()
+    # An in-place edit starts a new copy, leaving the snapshots already handed out alone
+    assert third._table is not second._table
+    assert _names(third) == ["A", "b", "c"]
+    assert _names(second) == ["a", "b", "c"]
+    assert third.base == second.base == table.base
@@ -0,0 +1,69 @@
+import csv
+import io
+
+import pytest
+
+from expense_table import ExpenseTable, summarize_chunks
+from ingest import count_records, load_files, summarize_files
+from journal import EditJournal
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"a,b\n",
+    b"a,b\n\nc,d\n",
+    b"\n\n\na,b\n\n",
+    b"a,b\r\n\r\n   \r\nc,d",
+    b"a,b\n   \n\t\n",
+])
+def test_count_records_matches_csv_reader(data):
+    records = [row for row in csv.reader(io.StringIO(data.decode(), newline='')) if row]
+    assert count_records(data) == len(records)
+
+
+def _ledger(tmp_path, rows):
+    file_path = str(tmp_path / "expense.csv")
+    with open(file_path, mode='w', newline='') as file:
+        file.write("Date,Expense Name,Category,Amount\n" + "".join(rows))
+    return file_path
+
+
+def test_a_deleted_row_is_left_out(tmp_path):
+    file_path = _ledger(tmp_path, ["2024-01-01,a,Food,1.00\n", "2024-01-02,b,Food,2.00\n"])
+    table = ExpenseTable.from_csv(file_path)
+    EditJournal(file_path).delete(0, table[0], table.base)
+
+    assert [record["Expense Name"] for record in load_files([file_path], workers=1)] == ["b"]
+    summary = summarize_files([file_path], workers=1)
+    assert summary["rows"] == 1 and summary["total_cents"] == 200
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_edits_apply_in_every_range_as_in_from_csv(tmp_path, workers):
+    rows = []
+    for day in range(1, 29):
+        rows.append(f"2024-02-{day:02d},row{day},Food,{day}.00\n")
+        if day % 5 == 0:
+            rows.append("\n")
+        if day % 7 == 0:
+            # Whitespace-only and invalid records take a row id too
+            rows.append("   \n" if day % 2 else "2024-02-30,bad,Food,1.00\n")
+    file_path = _ledger(tmp_path, rows)
+    table = ExpenseTable.from_csv(file_path)
+    journal = EditJournal(file_path)
+    for position in (0, 6, 13, len(table) - 1):
+        journal.delete(table.row_ids[position], table[position], table.base)
+    for position in (3, 20):
+        journal.amend(table.row_ids[position], table[position],
+                      {**table[position], "Category": "Rent", "Amount": "99.99"}, table.base)
+    # An invalid record made valid by an amendment
+    invalid_id = next(row_id for row_id in range(table.next_row_id) if row_id not in set(table.row_ids))
+    journal.amend(invalid_id, {"Date": "", "Category": "", "Amount": ""},
+                  {"Date": "2024-03-01", "Expense Name": "fixed", "Category": "Other", "Amount": "5.00"}, table.base)
+
+    expected = ExpenseTable.from_csv(file_path)
+    # Small ranges, so edits fall in many of them
+    loaded = load_files([file_path], workers=workers, chunk_bytes=64)
+    assert loaded.to_records() == expected.to_records()
+    assert loaded.invalid_rows == expected.invalid_rows
+    assert summarize_files([file_path], workers=workers, chunk_bytes=64) == summarize_chunks([expected])
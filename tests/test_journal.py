@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+
+import pytest
+
+from expense import add_expenses
+from expense_table import ExpenseTable
+from journal import EditJournal, StaleRowError
+
+
+def _write_ledger(path, rows):
+    path.write_text("Date,Expense Name,Category,Amount\n"
+                    + "".join(f"2024-01-{day:02d},row{day},Food,{day}.00\n" for day in range(1, rows + 1)))
+    return str(path)
+
+
+def _base(file_path):
+    return ExpenseTable.from_csv(file_path).base
+
+
+def _names(file_path):
+    return [record["Expense Name"] for record in ExpenseTable.from_csv(file_path).to_records()]
+
+
+def test_append_during_compaction_lands_in_the_compacted_file(tmp_path, monkeypatch):
+    file_path = _write_ledger(tmp_path / "expense.csv", 3)
+    journal = EditJournal(file_path)
+    journal.delete(0, {"Date": "2024-01-01", "Category": "Food", "Amount": "1.00"}, _base(file_path))
+
+    rewrite = EditJournal._rewrite
+    appender = threading.Thread(target=add_expenses, args=(file_path, [("2024-01-09", "late", "Food", "9.00")]),
+                                kwargs={"validated": True})
+
+    def slow_rewrite(self, temp_path):
+        rewrite(self, temp_path)
+        # The append starts while the CSV is locked for compaction and must wait for the new file
+        appender.start()
+        time.sleep(0.2)
+
+    monkeypatch.setattr(EditJournal, "_rewrite", slow_rewrite)
+    assert journal.compact() == 1
+    appender.join()
+    assert _names(file_path) == ["row2", "row3", "late"]
+
+
+def test_report_frame_applies_edits_by_the_readers_row_ids(tmp_path):
+    from report_builder import read_ledger
+
+    # csv.reader counts the whitespace-only line as a (short, invalid) record; pandas skips it
+    file_path = str(tmp_path / "expense.csv")
+    with open(file_path, mode='w', newline='') as file:
+        file.write("Date,Expense Name,Category,Amount\n2024-01-01,a,Food,1.00\n   \n\n2024-01-02,b,Food,2.00\n"
+                   "2024-01-03,c,Food,3.00\n")
+    table = ExpenseTable.from_csv(file_path)
+    EditJournal(file_path).amend(table.row_ids[1], {"Date": "2024-01-02", "Category": "Food", "Amount": "2.00"},
+                                 {"Date": "2024-01-02", "Expense Name": "b2", "Category": "Rent", "Amount": "20.00"},
+                                 table.base)
+
+    df = read_ledger(file_path)
+    assert df["Expense Name"].tolist() == ["a", "b2", "c"]
+    assert df["AmountCents"].tolist() == [100, 2000, 300]
+    assert df.index.tolist() == list(ExpenseTable.from_csv(file_path).row_ids)
+    assert [record["Expense Name"] for record in ExpenseTable.from_csv(file_path).to_records()] == ["a", "b2", "c"]
+
+
+def _expense(date_value, name, category, amount):
+    return {"Date": date_value, "Expense Name": name, "Category": category, "Amount": amount}
+
+
+def test_row_ids_skip_blank_lines_and_survive_appends(tmp_path):
+    from expense_table import IncrementalExpenseLoader
+
+    file_path = str(tmp_path / "expense.csv")
+    with open(file_path, mode='w', newline='') as file:
+        file.write("Date,Expense Name,Category,Amount\n2024-01-01,a,Food,1.00\n\n2024-01-02,b,Food,2.00\n"
+                   "2024-01-03,c,Food,3.00\n")
+    loader = IncrementalExpenseLoader(file_path)
+    table = loader.refresh()
+    assert list(table.row_ids) == [0, 1, 2]
+
+    journal = EditJournal(file_path)
+    journal.amend(2, table[2], _expense("2024-01-03", "c2", "Rent", "30.00"), table.base)
+    journal.delete(0, table[0], table.base)
+    add_expenses(file_path, [("2024-01-04", "d", "Food", "4.00")], validated=True)
+
+    table = loader.refresh()
+    assert _names(file_path) == ["b", "c2", "d"]
+    assert [record["Expense Name"] for record in table] == ["b", "c2", "d"]
+    assert list(table.row_ids) == [1, 2, 3]
+    assert EditJournal.load(file_path).changes == {2: ("2024-01-03", "c2", "Rent", "30.00"), 0: None}
+
+
+def test_compaction_folds_edits_and_renumbers_rows(tmp_path):
+    from expense_table import IncrementalExpenseLoader
+    from rollup import ExpenseRollup
+
+    file_path = _write_ledger(tmp_path / "expense.csv", 4)
+    ExpenseRollup.load(file_path)
+    loader = IncrementalExpenseLoader(file_path)
+    table = loader.refresh()
+    journal = EditJournal(file_path)
+    journal.delete(1, table[1], table.base)
+    journal.amend(3, table[3], _expense("2024-01-04", "four", "Food", "40.00"), table.base)
+    assert ExpenseRollup.load(file_path).total_cents == 100 + 300 + 4000
+
+    assert journal.compact() == 2
+    assert EditJournal.load(file_path).changes == {}
+    with open(file_path, newline='') as file:
+        assert file.read().splitlines()[1:] == ["2024-01-01,row1,Food,1.00", "2024-01-03,row3,Food,3.00",
+                                                "2024-01-04,four,Food,40.00"]
+    table = loader.refresh()
+    assert loader.last_refresh == "reload"
+    assert list(table.row_ids) == [0, 1, 2]
+    assert ExpenseRollup.load(file_path).total_cents == 100 + 300 + 4000
+
+    # Row ids now refer to the compacted file
+    journal.delete(1, table[1], table.base)
+    assert _names(file_path) == ["row1", "four"]
+
+
+def test_journal_of_a_replaced_file_is_ignored(tmp_path):
+    file_path = _write_ledger(tmp_path / "expense.csv", 2)
+    EditJournal(file_path).delete(0, {"Date": "2024-01-01", "Category": "Food", "Amount": "1.00"}, _base(file_path))
+    assert _names(file_path) == ["row2"]
+
+    # A new file at the path (new inode) does not inherit the old journal
+    replacement = tmp_path / "new.csv"
+    _write_ledger(replacement, 2)
+    os.replace(replacement, file_path)
+    assert _names(file_path) == ["row1", "row2"]
+
+
+def test_edits_with_ids_from_before_a_compaction_are_rejected(tmp_path):
+    from rollup import ExpenseRollup
+
+    file_path = _write_ledger(tmp_path / "expense.csv", 4)
+    ExpenseRollup.load(file_path)
+    before = ExpenseTable.from_csv(file_path)
+    EditJournal(file_path).delete(0, before[0], before.base)
+    assert EditJournal(file_path).compact() == 1
+
+    # Id 1 was row2 when the table was read; it is row3 now
+    after = ExpenseTable.from_csv(file_path)
+    assert after.base[1] == before.base[1] + 1
+    with pytest.raises(StaleRowError):
+        EditJournal(file_path).delete(1, before[1], before.base)
+    # Even if the new file reused the old inode, the generation differs
+    with pytest.raises(StaleRowError):
+        EditJournal(file_path).delete(1, after[1], (after.base[0], before.base[1]))
+    assert _names(file_path) == ["row2", "row3", "row4"]
+    assert ExpenseRollup.load(file_path).total_cents == 200 + 300 + 400
+
+    EditJournal(file_path).delete(1, after[1], after.base)
+    assert _names(file_path) == ["row2", "row4"]
+
+
+def test_edits_based_on_outdated_values_are_rejected(tmp_path):
+    from rollup import ExpenseRollup
+
+    file_path = _write_ledger(tmp_path / "expense.csv", 3)
+    ExpenseRollup.load(file_path)
+    # Two readers of the same version, e.g. two open windows
+    first, second = ExpenseTable.from_csv(file_path), ExpenseTable.from_csv(file_path)
+    EditJournal(file_path).amend(1, first[1], _expense("2024-01-02", "two", "Rent", "20.00"), first.base)
+
+    # The second reader still sees the old values; removing them would skew the rollup
+    with pytest.raises(StaleRowError):
+        EditJournal(file_path).delete(1, second[1], second.base)
+    with pytest.raises(StaleRowError):
+        EditJournal(file_path).amend(1, second[1], _expense("2024-01-02", "2b", "Food", "5.00"), second.base)
+    assert ExpenseRollup.load(file_path).total_cents == 100 + 2000 + 300
+
+    # Once it has the current values (an unformatted amount is the same amount), it can go ahead
+    EditJournal(file_path).delete(1, {**second[1], "Category": "Rent", "Amount": "20"}, second.base)
+    with pytest.raises(StaleRowError):
+        EditJournal(file_path).delete(1, first[1], first.base)
+    assert _names(file_path) == ["row1", "row3"]
+    rollup = ExpenseRollup.load(file_path)
+    assert rollup.total_cents == 100 + 300
+    assert rollup.category_totals == {"Food": 400}
+
+
+def test_loaders_and_cached_tables_follow_the_base(tmp_path):
+    from expense_table import IncrementalExpenseLoader
+    from ledger_cache import LedgerCache
+
+    file_path = _write_ledger(tmp_path / "expense.csv", 3)
+    loader = IncrementalExpenseLoader(file_path)
+    cache = LedgerCache(disk_dir=str(tmp_path / "cache"))
+    table = loader.refresh()
+    assert table.base == cache.table(file_path).base == _base(file_path)
+    assert table.copy().base == table.base
+
+    EditJournal(file_path).delete(0, table[0], table.base)
+    assert loader.refresh().base == table.base
+    EditJournal(file_path).compact()
+    assert loader.refresh().base == cache.table(file_path).base == _base(file_path) != table.base
+    # A new process reads the table from the disk cache, base included
+    restarted = LedgerCache(disk_dir=str(tmp_path / "cache"))
+    assert restarted.table(file_path).base == _base(file_path)
+    assert restarted.disk_hits == 1
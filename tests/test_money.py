@@ -0,0 +1,97 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import money
+from money import (MAX_CENTS, format_cents, group_totals, monthly_totals, parse_cents, parse_cents_array,
+                   sum_cents)
+
+
+@pytest.mark.parametrize("value, cents", [
+    ("0.005", 1),
+    ("0.004", 0),
+    ("0.015", 2),
+    ("2.675", 268),
+    ("1.005", 101),
+    ("-0.005", -1),
+    ("-2.675", -268),
+    ("12.3449", 1234),
+    ("12.345", 1235),
+    ("7", 700),
+    ("7.5", 750),
+    (" 7.50 ", 750),
+    ("+3", 300),
+    ("1e2", 10000),
+    ("1.5E-2", 2),
+    (7, 700),
+    (Decimal("0.125"), 13),
+])
+def test_parse_cents_rounds_half_up(value, cents):
+    assert parse_cents(value) == cents
+
+
+@pytest.mark.parametrize("value", ["", "abc", "1.2.3", "-", "nan", "inf", "-Infinity", "1e400", "1,000",
+                                   str(MAX_CENTS // 100 + 1), True, False])
+def test_parse_cents_rejects(value):
+    with pytest.raises(ValueError):
+        parse_cents(value)
+
+
+# Fast-path forms, forms only the Decimal fallback handles, and invalid values mixed together
+MIXED = ["12.34", "0.005", "-2.675", "+3", " 7 ", ".5", "5.", "1e2", "1.5E-2", "12345678901234567.891",
+         "92233720368547758.07", "92233720368547758.08", "abc", "", "nan", "inf", "1.2.3", "-", "0012.10"]
+
+
+@pytest.mark.parametrize("values", [MIXED, MIXED + ["٣.٥"]], ids=["bytes", "unicode"])
+def test_parse_cents_array_matches_parse_cents(values):
+    cents, valid = parse_cents_array(values)
+    for value, got, ok in zip(values, cents.tolist(), valid.tolist()):
+        try:
+            expected = parse_cents(value)
+        except ValueError:
+            assert not ok and got == 0, value
+        else:
+            assert ok and got == expected, value
+
+
+def test_non_ascii_rows_alone_take_the_slow_path(monkeypatch):
+    calls = []
+
+    def counting_parse_cents(value):
+        calls.append(value)
+        return parse_cents(value)
+
+    monkeypatch.setattr(money, "parse_cents", counting_parse_cents)
+    cents, valid = parse_cents_array(["1.25"] * 1000 + ["٣"] + ["2.50", "x"])
+    assert sorted(calls) == sorted(["٣", "x"])
+    assert cents[[0, 999, 1000, 1001, 1002]].tolist() == [125, 125, 300, 250, 0]
+    assert valid[[1000, 1001, 1002]].tolist() == [True, True, False]
+
+
+def test_parse_cents_array_of_nothing():
+    cents, valid = parse_cents_array([])
+    assert cents.size == 0 and valid.size == 0
+    cents, valid = parse_cents_array(["", ""])
+    assert cents.tolist() == [0, 0] and valid.tolist() == [False, False]
+
+
+def test_format_round_trip():
+    for cents in (0, 5, 100, 1505, -1, -150550, MAX_CENTS):
+        assert parse_cents(format_cents(cents)) == cents
+    assert format_cents(-5) == "-0.05"
+
+
+def test_totals_are_exact_beyond_float_precision():
+    cents = np.array([2**53, 1, 1, -(2**52)], dtype=np.int64)
+    assert sum_cents(cents) == 2**53 + 2 - 2**52
+    # Partial sums above 2**53 take the integer path instead of bincount's float64
+    assert group_totals([0, 0, 0, 1], cents, 2).tolist() == [2**53 + 2, -(2**52)]
+    assert group_totals([], np.array([], dtype=np.int64), 3).tolist() == [0, 0, 0]
+
+
+def test_float_drift_does_not_reach_the_totals():
+    cents, _ = parse_cents_array(["0.10"] * 10 + ["0.20"] * 10)
+    assert sum_cents(cents) == 300
+    ordinals = [738886, 738886, 738917]  # 2024-01-01, 2024-01-01, 2024-02-01
+    assert monthly_totals(ordinals, [10, 20, 30]) == {"2024-01": 30, "2024-02": 30}
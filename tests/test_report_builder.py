@@ -0,0 +1,52 @@
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+from expense_table import ExpenseTable
+from journal import EditJournal
+from ledger_cache import cache
+from report_builder import build_report, export_monthly_workbooks
+
+ROWS = ["2024-01-05,Lunch,Food,12.50\n", "2024-02-01,Rent,Rent,900.00\n", "not-a-date,bad,Food,1.00\n",
+        "2024-01-20,Bus,Transportation,2.75\n", "2024-02-14,Dinner,Food,40.10\n", "2024-03-03,Power,Utilities,60.00\n"]
+
+
+def _sheets(file_path):
+    workbook = load_workbook(file_path)
+    return {sheet.title: [[cell.value for cell in row] for row in sheet.iter_rows()] for sheet in workbook.worksheets}
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    file_path = str(tmp_path / "expense.csv")
+    with open(file_path, mode='w', newline='') as file:
+        file.write("Date,Expense Name,Category,Amount\n" + "".join(ROWS))
+    table = ExpenseTable.from_csv(file_path)
+    EditJournal(file_path).amend(table.row_ids[1], table[1], {**table[1], "Category": "Housing"}, table.base)
+    cache.clear()
+    yield file_path
+    cache.clear()
+
+
+def test_worker_count_does_not_change_the_report(tmp_path, ledger):
+    sheets = []
+    for workers in (1, 2):
+        file_path = str(tmp_path / f"report_{workers}.xlsx")
+        assert build_report(ledger, file_path, workers=workers, top_n=3)
+        sheets.append(_sheets(file_path))
+    assert sheets[0] == sheets[1]
+    # The journal edit reaches every sheet
+    assert ["Housing", 1, 900.0] in [row[:3] for row in sheets[0]["By Category"]]
+    assert len(sheets[0]["Expense Summary"]) == len(ROWS)
+
+
+def test_monthly_workbooks_hold_each_months_rows(tmp_path, ledger):
+    for workers in (1, 2):
+        output_dir = str(tmp_path / f"monthly_{workers}")
+        export_monthly_workbooks(ledger, output_dir, workers=workers)
+        assert sorted(os.listdir(output_dir)) == [f"expenses_2024-0{month}.xlsx" for month in (1, 2, 3)]
+        february = _sheets(os.path.join(output_dir, "expenses_2024-02.xlsx"))
+        rows = next(iter(february.values()))[1:]
+        assert [row[:4] for row in rows] == [["2024-02-01", "Rent", "Housing", 900.0],
+                                             ["2024-02-14", "Dinner", "Food", 40.1]]
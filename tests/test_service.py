@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from expense_service import ExpenseService, route_name
+from metrics import metrics
+
+
+@pytest.mark.parametrize("path, route", [
+    ("/health", "health"),
+    ("/ledgers", "ledgers"),
+    ("/ledgers/home/expenses", "expenses"),
+    ("/ledgers/2024-q1/summary", "summary"),
+    ("/ledgers/home/export", "export"),
+    ("/", "not_found"),
+    ("/ledgers/home", "not_found"),
+    ("/ledgers/home/summary/extra", "not_found"),
+    ("/some/random-4711", "not_found"),
+])
+def test_route_names_are_fixed(path, route):
+    assert route_name([part for part in path.strip("/").split("/") if part]) == route
+
+
+def test_metric_labels_do_not_grow_with_request_paths(tmp_path):
+    async def requests():
+        service = ExpenseService(str(tmp_path))
+        try:
+            for index in range(20):
+                await service._respond("GET", f"/unknown-{index}", b"")
+                await service._respond(f"M{index}", f"/ledgers/l{index}/summary", b"")
+        finally:
+            await service.close()
+
+    metrics.reset()
+    asyncio.run(requests())
+    snapshot = metrics.snapshot()
+    assert sorted(snapshot["timers"]) == ["service_get_not_found", "service_other_summary"]
+    assert sorted(snapshot["counters"]) == [
+        'service_requests{method="GET",route="not_found",status="404"}',
+        'service_requests{method="other",route="summary",status="405"}',
+    ]
+
+
+def test_appends_do_not_print(tmp_path, capsys):
+    async def append():
+        service = ExpenseService(str(tmp_path))
+        try:
+            return await service._respond("POST", "/ledgers/home/expenses",
+                                          b'{"Date": "2024-01-05", "Expense Name": "x", "Category": "Food", "Amount": "1.50"}')
+        finally:
+            await service.close()
+
+    assert asyncio.run(append()) == (201, {"ledger": "home", "added": 1})
+    assert capsys.readouterr().out == ""
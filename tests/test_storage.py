@@ -0,0 +1,39 @@
+import os
+
+from expense import add_expense
+from storage import SqliteBackend, get_backend
+
+
+def test_sqlite_backend_is_shared_per_file(tmp_path):
+    db_path = str(tmp_path / "expense.db")
+    backend = get_backend(db_path)
+    try:
+        assert isinstance(backend, SqliteBackend)
+        assert get_backend(db_path) is backend
+        assert get_backend(os.path.join(str(tmp_path), ".", "expense.db")) is backend
+
+        for day in range(1, 4):
+            add_expense(db_path, f"2024-01-0{day}", "x", "Food", "1.50")
+        assert get_backend(db_path) is backend
+        assert get_backend(db_path).load().total_cents() == 450
+    finally:
+        backend.close()
+
+
+def test_closed_or_replaced_backends_are_reopened(tmp_path):
+    db_path = str(tmp_path / "expense.db")
+    backend = get_backend(db_path)
+    backend.append("2024-01-01", "x", "Food", "1.00")
+    backend.close()
+
+    reopened = get_backend(db_path)
+    assert reopened is not backend
+    assert reopened.total_cents() == 100
+
+    os.remove(db_path)
+    replaced = get_backend(db_path)
+    try:
+        assert replaced is not reopened
+        assert replaced.total_cents() == 0
+    finally:
+        replaced.close()
@@ -0,0 +1,97 @@
+from datetime import date
+
+import pytest
+
+from expense import add_expenses, validate_expense
+from expense_table import ExpenseTable, parse_date
+from expense_validator import validate_file, validate_records
+
+# (date, amount) pairs around the edges of the date and amount rules
+CASES = [
+    ("2024-01-05", "12.50"),
+    ("2024-01-05", "12.505"),
+    ("2024-01-05", " 12.50 "),
+    ("2024-01-05", "-3"),
+    ("2024-01-05", "+3"),
+    ("2024-01-05", "1e3"),
+    ("2024-01-05", "1_000"),
+    ("2024-01-05", "٣"),
+    ("2024-01-05", "inf"),
+    ("2024-01-05", "-Infinity"),
+    ("2024-01-05", "nan"),
+    ("2024-01-05", "1e400"),
+    ("2024-01-05", "92233720368547758.07"),
+    ("2024-01-05", "92233720368547758.08"),
+    ("2024-01-05", "abc"),
+    ("2024-01-05", ""),
+    (" 2024-01-05", "1"),
+    ("2024-01-05 ", "1"),
+    ("2024-1-5", "1"),
+    ("2024-02-30", "1"),
+    ("05/01/2024", "1"),
+    ("", "1"),
+    ("   ", "1"),
+]
+
+
+def _table_accepts(date_value, amount):
+    try:
+        ExpenseTable().append(date_value, "x", "Food", amount)
+    except ValueError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("date_value, amount", CASES)
+def test_single_and_batch_validation_agree(date_value, amount):
+    record = {"Date": date_value, "Expense Name": "x", "Category": "Food", "Amount": amount}
+    single = validate_expense(record)
+    batch = validate_records([record], categories=None).is_valid
+    assert single == batch == _table_accepts(date_value, amount)
+
+
+@pytest.mark.parametrize("amount", [30.5, 0.1 + 0.2, 7, float("inf"), float("nan")])
+def test_non_string_amounts_agree(amount):
+    record = {"Date": "2024-01-05", "Expense Name": "x", "Category": "Food", "Amount": amount}
+    assert validate_expense(record) == validate_records([record], categories=None).is_valid
+
+
+def test_add_expenses_writes_exactly_the_rows_validate_expense_accepts(tmp_path):
+    file_path = str(tmp_path / "expense.csv")
+    rows = [(date_value, f"row{index}", "Food", amount) for index, (date_value, amount) in enumerate(CASES)]
+    expected = [name for date_value, name, _, amount in rows
+                if validate_expense({"Date": date_value, "Expense Name": name, "Category": "Food", "Amount": amount})]
+
+    assert add_expenses(file_path, rows) == len(expected)
+    table = ExpenseTable.from_csv(file_path)
+    assert [row["Expense Name"] for row in table.to_records()] == expected
+    assert table.invalid_rows == 0
+
+
+def test_validate_file_uses_the_same_amount_rule(tmp_path):
+    file_path = tmp_path / "expense.csv"
+    lines = ["Date,Expense Name,Category,Amount"]
+    lines += [f"2024-01-05,row{index},Food,{amount}" for index, (_, amount) in enumerate(CASES) if "," not in amount]
+    file_path.write_text("\n".join(lines) + "\n")
+    report = validate_file(str(file_path))
+
+    invalid = {line - 2 for line in report.invalid_lines.tolist()}
+    expected = {index for index, (_, amount) in enumerate(CASES)
+                if not _table_accepts("2024-01-05", amount)}
+    assert invalid == expected
+
+
+@pytest.mark.parametrize("date_value, expected", [
+    ("2024-01-05", date(2024, 1, 5)),
+    ("2024-1-5", date(2024, 1, 5)),
+    ("2024-12-31", date(2024, 12, 31)),
+])
+def test_parse_date_accepts_unpadded_month_and_day(date_value, expected):
+    assert parse_date(date_value) == expected.toordinal()
+
+
+@pytest.mark.parametrize("date_value", ["", "   ", " 2024-01-05", "2024-01-05 ", "2024-02-30", "05/01/2024",
+                                        "2024/01/05", "24-01-05"])
+def test_parse_date_rejects(date_value):
+    with pytest.raises(ValueError):
+        parse_date(date_value)
@@ -0,0 +1,114 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTreeview:
+    """
+    Treeview that only materializes the rows currently on screen.
+
+    The widget holds at most one page of rows plus a small buffer; a
+    separate scrollbar drives which slice of the data source is shown.
+    Refreshing compares the wanted window with the items already in the
+    tree and only inserts, updates, moves or deletes the iids that differ,
+    so the cost of a refresh depends on the page size, not the row count.
+
+    The data source is set with ``set_source(count, fetch)`` where
+    ``fetch(index)`` returns ``(iid, values)`` for a row.
+    """
+
+    def __init__(self, master, columns, buffer_rows=10, **tree_options):
+        self.frame = ttk.Frame(master)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", **tree_options)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.buffer_rows = buffer_rows
+        self.first = 0
+        self.page_rows = 20
+        self.count = 0
+        self._fetch = None
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(3))
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def set_source(self, count, fetch):
+        """
+        Point the view at a data source and refresh the visible window.
+
+        Args:
+            count (int): Number of rows in the source.
+            fetch (callable): ``fetch(index)`` -> ``(iid, values)``.
+        """
+        self.count = count
+        self._fetch = fetch
+        self.first = max(0, min(self.first, count - self.page_rows))
+        self.refresh()
+
+    def scroll_to_end(self):
+        """Show the last page of rows."""
+        self.first = max(0, self.count - self.page_rows)
+        self.refresh()
+
+    def scroll_rows(self, delta):
+        """Scroll the window by ``delta`` rows."""
+        first = max(0, min(self.first + delta, self.count - self.page_rows))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def refresh(self):
+        """Bring the materialized rows in line with the current window, applying only diffs."""
+        wanted = []
+        if self._fetch is not None:
+            stop = min(self.count, self.first + self.page_rows + self.buffer_rows)
+            wanted = [self._fetch(index) for index in range(self.first, stop)]
+
+        wanted_iids = {str(iid) for iid, _ in wanted}
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted_iids]
+        if stale:
+            self.tree.delete(*stale)
+
+        for position, (iid, values) in enumerate(wanted):
+            iid = str(iid)
+            values = tuple(str(value) for value in values)
+            if not self.tree.exists(iid):
+                self.tree.insert('', position, iid=iid, values=values)
+                continue
+            if tuple(str(value) for value in self.tree.item(iid, "values")) != values:
+                self.tree.item(iid, values=values)
+            if self.tree.index(iid) != position:
+                self.tree.move(iid, '', position)
+
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self.count <= self.page_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.first / self.count, (self.first + self.page_rows) / self.count)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.first = max(0, min(int(float(amount) * self.count), self.count - self.page_rows))
+            self.refresh()
+        elif action == "scroll":
+            step = self.page_rows if unit == "pages" else 1
+            self.scroll_rows(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        page_rows = max(1, event.height // row_height)
+        if page_rows != self.page_rows:
+            self.page_rows = page_rows
+            self.first = max(0, min(self.first, self.count - self.page_rows))
+            self.refresh()